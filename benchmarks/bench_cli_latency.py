@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+End-to-end CLI latency by transport.
+
+Runs one-shot shelley-bio commands as subprocesses, the way scripts call them,
+with SHELLEY_BIO_TRANSPORT forced to each transport, and reports wall-clock
+latency. The index snapshot is built first so every transport starts warm.
+
+Usage:
+    python3 benchmarks/bench_cli_latency.py [--runs N] [--daemon]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SHELLEY_BIO = REPO_ROOT / "bin" / "shelley-bio"
+
+COMMANDS = [
+    ["find", "fastqc"],
+    ["search", "quality", "control"],
+    ["versions", "samtools"],
+]
+
+
+def run(args, transport=None):
+    """Run shelley-bio once and return elapsed seconds."""
+    env = dict(os.environ)
+    if transport:
+        env["SHELLEY_BIO_TRANSPORT"] = transport
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(SHELLEY_BIO), *args],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command and transport")
+    parser.add_argument("--daemon", action="store_true", help="Also measure a running daemon")
+    args = parser.parse_args()
+
+    run(["index", "build"])
+    transports = ["stdio", "local"]
+    if args.daemon:
+        run(["daemon", "start"])
+        transports.append("daemon")
+
+    try:
+        print(f"{'command':<28} {'transport':<10} {'median':>9} {'min':>9}")
+        for command in COMMANDS:
+            for transport in transports:
+                times = [run(command, transport) for _ in range(args.runs)]
+                print(
+                    f"{' '.join(command):<28} {transport:<10} "
+                    f"{statistics.median(times) * 1000:>7.0f}ms {min(times) * 1000:>7.0f}ms"
+                )
+    finally:
+        if args.daemon:
+            run(["daemon", "stop"])
+
+
+if __name__ == "__main__":
+    main()
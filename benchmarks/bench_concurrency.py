@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Server throughput and responsiveness under concurrent load.
+
+Starts a daemon for each executor kind (inline, thread, process), then drives
+it with many simultaneous client connections issuing a mix of tool calls.
+A separate connection pings the daemon throughout; ping latency shows whether
+the event loop stays free to answer while tool calls are running.
+
+The daemons' query cache is off by default: the calls repeat, so with it on
+every call after the first of each kind would be a cache hit.
+
+Usage:
+    python3 benchmarks/bench_concurrency.py [--clients N] [--requests N] [--workers N] [--query-cache N]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from shelley_bio.server.daemon import connect_daemon, ping, shutdown  # noqa: E402
+
+SERVER = REPO_ROOT / "shelley_bio" / "server" / "mcp_server.py"
+
+CALLS = [
+    ("search_by_function", {"description": "quality control"}),
+    ("search_by_function", {"description": "What can I use to generate count data?"}),
+    ("find_tool", {"tool_name": "fastqc"}),
+    ("get_container_versions", {"tool_name": "samtools"}),
+    ("find_tool", {"tool_name": "align"}),
+]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def start_daemon(socket, executor, workers, query_cache):
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER), "--daemon", "--socket", str(socket),
+         "--executor", executor, "--workers", str(workers), "--reload-interval", "0"],
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "SHELLEY_BIO_QUERY_CACHE": str(query_cache)},
+    )
+    for _ in range(600):
+        if await ping(socket) is not None:
+            return process
+        await asyncio.sleep(0.1)
+    process.kill()
+    raise RuntimeError("daemon did not start")
+
+
+async def client(socket, requests, offset, latencies):
+    session = await connect_daemon(socket)
+    async with session:
+        for i in range(requests):
+            name, arguments = CALLS[(offset + i) % len(CALLS)]
+            start = time.perf_counter()
+            await session.call_tool(name, arguments)
+            latencies.append(time.perf_counter() - start)
+
+
+async def pinger(socket, stop, latencies):
+    session = await connect_daemon(socket)
+    async with session:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await session.request("ping")
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+
+async def measure(executor, clients, requests, workers, query_cache):
+    with tempfile.TemporaryDirectory() as tmp:
+        socket = Path(tmp) / "bench.sock"
+        process = await start_daemon(socket, executor, workers, query_cache)
+        try:
+            call_latencies, ping_latencies = [], []
+            stop = asyncio.Event()
+            ping_task = asyncio.create_task(pinger(socket, stop, ping_latencies))
+
+            start = time.perf_counter()
+            await asyncio.gather(*(client(socket, requests, i, call_latencies) for i in range(clients)))
+            elapsed = time.perf_counter() - start
+
+            stop.set()
+            await ping_task
+        finally:
+            await shutdown(socket)
+            process.wait(timeout=10)
+
+    print(
+        f"{executor:<8} {len(call_latencies) / elapsed:>8.1f}/s "
+        f"{statistics.median(call_latencies) * 1000:>8.0f}ms {percentile(call_latencies, 0.95) * 1000:>8.0f}ms "
+        f"{statistics.median(ping_latencies) * 1000:>8.1f}ms {percentile(ping_latencies, 0.95) * 1000:>8.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client connections")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Executor pool size")
+    parser.add_argument("--executors", default="inline,thread,process", help="Comma-separated executor kinds")
+    parser.add_argument("--query-cache", type=int, default=0, help="Daemon query cache size (0 disables it)")
+    args = parser.parse_args()
+
+    # Make sure the index snapshot exists so each daemon starts quickly
+    subprocess.run([sys.executable, str(REPO_ROOT / "bin" / "shelley-bio"), "index", "build"],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.workers} workers, "
+          f"query cache {args.query_cache or 'off'}")
+    print(f"{'executor':<8} {'calls':>10} {'call p50':>10} {'call p95':>10} {'ping p50':>10} {'ping p95':>10}")
+    for executor in args.executors.split(","):
+        await measure(executor, args.clients, args.requests, args.workers, args.query_cache)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
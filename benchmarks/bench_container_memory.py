@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Resident memory of the container cache: dict-of-lists vs ContainerTable.
+
+Loads galaxy_singularity_cache.json.gz and reports, with tracemalloc, the memory
+still held once the index is built, for:
+
+- the former layout: a list of 118k entry dicts plus a tool -> [entry] index
+- ContainerTable: interned tool names and tags, array columns for size and
+  mtime, and per-tool ContainerList row arrays
+
+Usage:
+    python3 benchmarks/bench_container_memory.py
+"""
+
+import gc
+import gzip
+import json
+import sys
+import tracemalloc
+from array import array
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from shelley_bio.server.containers import ContainerList, ContainerTable
+
+CACHE_FILE = REPO_ROOT / "galaxy_singularity_cache.json.gz"
+
+
+def load_cache():
+    with gzip.open(CACHE_FILE, "rt") as f:
+        return json.load(f)
+
+
+def build_dicts():
+    """Former layout: entry dicts plus a tool -> entries index."""
+    entries = load_cache()["entries"]
+    container_index = defaultdict(list)
+    for entry in entries:
+        container_index[entry["tool_name"].lower()].append(entry)
+    return entries, container_index
+
+
+def build_table():
+    """ContainerTable plus tool -> ContainerList index."""
+    cache = load_cache()
+    table = ContainerTable.from_entries(cache["entries"], cache["cvmfs_root"])
+    del cache
+    table.__setstate__(table.__getstate__())  # as loaded from a snapshot
+
+    rows_by_tool = defaultdict(list)
+    for row, tool_id in enumerate(table.tool_ids):
+        rows_by_tool[table.tool_names[tool_id].lower()].append(row)
+    container_index = {
+        tool: ContainerList(table, array("I", rows)) for tool, rows in rows_by_tool.items()
+    }
+    return table, container_index
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return current, peak
+
+
+def main():
+    mb = 1024 * 1024
+    dict_current, dict_peak = measure(build_dicts)
+    table_current, table_peak = measure(build_table)
+
+    print(f"{'layout':<28} {'resident':>10} {'peak':>10}")
+    print(f"{'list of dicts + index':<28} {dict_current / mb:>8.1f}MB {dict_peak / mb:>8.1f}MB")
+    print(f"{'ContainerTable + index':<28} {table_current / mb:>8.1f}MB {table_peak / mb:>8.1f}MB")
+    print(f"\nresident reduction: {(1 - table_current / dict_current) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
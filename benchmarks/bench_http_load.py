@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Load test for the streamable HTTP transport.
+
+Starts one HTTP MCP server and drives it with N concurrent MCP client sessions
+(each its own connection, as separate AI assistants would be), reporting
+throughput and latency per concurrency level, plus the server's resident
+memory: one shared index instead of one per client.
+
+The server's query cache is off by default: the calls repeat, so with it on
+every call after the first of each kind would be a cache hit.
+
+Usage:
+    python3 benchmarks/bench_http_load.py [--clients 1,4,16,32] [--requests N] [--query-cache N]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SERVER = REPO_ROOT / "shelley_bio" / "server" / "mcp_server.py"
+
+CALLS = [
+    ("search_by_function", {"description": "quality control"}),
+    ("find_tool", {"tool_name": "fastqc"}),
+    ("get_container_versions", {"tool_name": "samtools"}),
+    ("search_by_function", {"description": "variant calling"}),
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid):
+    """Resident memory of a process in MB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def wait_for_server(url):
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        for _ in range(600):
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def client(url, requests, offset, latencies):
+    async with streamablehttp_client(url) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            for i in range(requests):
+                name, arguments = CALLS[(offset + i) % len(CALLS)]
+                start = time.perf_counter()
+                await session.call_tool(name, arguments)
+                latencies.append(time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", default="1,4,16,32", help="Comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--executor", default="thread", help="Server executor kind")
+    parser.add_argument("--query-cache", type=int, default=0, help="Server query cache size (0 disables it)")
+    args = parser.parse_args()
+
+    subprocess.run([sys.executable, str(REPO_ROOT / "bin" / "shelley-bio"), "index", "build"],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    server = subprocess.Popen(
+        [sys.executable, str(SERVER), "--http", "--port", str(port),
+         "--executor", args.executor, "--reload-interval", "0"],
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "SHELLEY_BIO_QUERY_CACHE": str(args.query_cache)},
+    )
+    try:
+        await wait_for_server(url)
+        print(f"server pid {server.pid}, {args.executor} executor, {args.requests} requests per client, "
+              f"query cache {args.query_cache or 'off'}")
+        print(f"{'clients':>7} {'calls/s':>9} {'p50':>8} {'p95':>8} {'server RSS':>11}")
+        for clients in (int(n) for n in args.clients.split(",")):
+            latencies = []
+            start = time.perf_counter()
+            await asyncio.gather(*(client(url, args.requests, i, latencies) for i in range(clients)))
+            elapsed = time.perf_counter() - start
+            print(
+                f"{clients:>7} {len(latencies) / elapsed:>9.1f} "
+                f"{statistics.median(latencies) * 1000:>6.0f}ms {percentile(latencies, 0.95) * 1000:>6.0f}ms "
+                f"{rss_mb(server.pid):>9.0f}MB"
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
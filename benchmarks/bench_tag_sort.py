@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Sort every container tag in the Galaxy Singularity cache by version.
+
+Compares shelley_bio.utils.versions.parse_tag, cold (empty memo) and warm, with
+the two regex parsers the server and builder used before it was shared.
+
+Usage:
+    python3 benchmarks/bench_tag_sort.py [--repeat N]
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from shelley_bio.utils.versions import parse_tag
+
+
+def legacy_server_key(tag):
+    """Former BioFinderIndex._parse_version."""
+    match = re.match(r'^(\d+(?:\.\d+)*)', tag)
+    if match:
+        return ([int(x) for x in match.group(1).split('.')], tag)
+    return ([0], tag)
+
+
+def legacy_builder_key(tag):
+    """Former CVMFSModuleBuilder._parse_version."""
+    parts = []
+    for part in tag.split("--")[0].split("."):
+        numbers = re.findall(r'\d+', part)
+        if numbers:
+            parts.extend(int(num) for num in numbers)
+        else:
+            parts.append(ord(part[0]) if part else 0)
+    return tuple(parts)
+
+
+def timed(label, tags, key, repeat, before=None):
+    best = float("inf")
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        sorted(tags, key=key, reverse=True)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32} {best * 1000:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    with gzip.open(REPO_ROOT / "galaxy_singularity_cache.json.gz", "rt") as f:
+        tags = [entry["tag"] for entry in json.load(f)["entries"] if entry["tag"]]
+    print(f"{len(tags)} tags, {len(set(tags))} distinct\n")
+
+    timed("legacy server regex", tags, legacy_server_key, args.repeat)
+    timed("legacy builder regex", tags, legacy_builder_key, args.repeat)
+    timed("parse_tag (cold memo)", tags, parse_tag, args.repeat, before=parse_tag.cache_clear)
+    timed("parse_tag (warm memo)", tags, parse_tag, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
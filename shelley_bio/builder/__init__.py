@@ -3,5 +3,7 @@ Builder module for CVMFS module creation.
 """
 
 from .cvmfs_builder import CVMFSModuleBuilder, format_versions_list, format_build_output
+from .manifest import BuildManifest
+from .spider_cache import SpiderCache
 
-__all__ = ["CVMFSModuleBuilder", "format_versions_list", "format_build_output"]
\ No newline at end of file
+__all__ = ["CVMFSModuleBuilder", "BuildManifest", "SpiderCache", "format_versions_list", "format_build_output"]
\ No newline at end of file
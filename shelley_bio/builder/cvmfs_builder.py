@@ -6,12 +6,67 @@ Builds Lmod module files for tools available in CVMFS.
 """
 
 import os
-import subprocess
 from pathlib import Path
-from typing import List, Optional, Tuple
-import re
+from typing import Callable, Dict, List, Optional, Tuple
 
 from ..utils.style import console, ShelleyStyle
+from .manifest import BUILT, STALE, UNCHANGED, BuildManifest, content_hash
+from .spider_cache import SpiderCache
+from ..utils.versions import TagKey, parse_tag
+
+
+# Lmod module file template, filled in by CVMFSModuleBuilder._render_module()
+MODULE_TEMPLATE = '''help([[{title} {version} from CVMFS
+
+This module provides access to {tool_name} version {version} via Singularity container.
+All executables from the container are available in your PATH.
+
+Usage examples:
+  For BLAST: blastn, blastp, blastx, tblastn, tblastx
+  For other tools: see container documentation
+
+Container path: {container_path}
+]])
+
+load("singularity")
+
+local containerPath = "{container_path}"
+
+-- Function to execute commands in container
+local function container_exec(cmd)
+    return "singularity exec " .. containerPath .. " " .. cmd
+end
+
+-- Add container executables to PATH via wrapper functions
+prepend_path("PATH", pathJoin(os.getenv("MODULEPATH") or "", "..", "wrappers", "{tool_name}", "{version}"))
+
+-- Create primary alias for the tool name (if executable exists)
+set_alias("{tool_name}", container_exec("{tool_name}"))
+
+-- For tools with known multiple executables, create additional aliases
+if "{tool_name}" == "blast" then
+    set_alias("blastn", container_exec("blastn"))
+    set_alias("blastp", container_exec("blastp"))
+    set_alias("blastx", container_exec("blastx"))
+    set_alias("tblastn", container_exec("tblastn"))
+    set_alias("tblastx", container_exec("tblastx"))
+    set_alias("makeblastdb", container_exec("makeblastdb"))
+    set_alias("blast_formatter", container_exec("blast_formatter"))
+end
+
+if "{tool_name}" == "samtools" then
+    set_alias("samtools", container_exec("samtools"))
+end
+
+if "{tool_name}" == "fastqc" then
+    set_alias("fastqc", container_exec("fastqc"))
+end
+
+-- Generic function to run any command in the container
+set_alias("{tool_name}_exec", container_exec("$*"))
+'''
+
+TEMPLATE_HASH = content_hash(MODULE_TEMPLATE)
 
 
 class CVMFSModuleBuilder:
@@ -19,18 +74,90 @@ class CVMFSModuleBuilder:
     
     CVMFS_SINGULARITY_PATH = Path("/cvmfs/singularity.galaxyproject.org/all")
     LMOD_MODULES_PATH = Path("/apps/Modules/modulefiles")
+    LMOD_CACHE_PATH = Path(os.environ.get("SHELLEY_BIO_LMOD_CACHE", "/apps/Modules/cacheDir"))
     
-    def __init__(self):
-        """Initialize the module builder."""
-        pass
+    def __init__(self, live_scan: Optional[bool] = None, index=None):
+        """
+        Initialize the module builder.
+        
+        Args:
+            live_scan: Find versions by scanning the CVMFS directory instead of
+                using the container index. Defaults to the SHELLEY_BIO_LIVE_SCAN
+                environment variable.
+            index: Loaded BioFinderIndex to resolve versions from. Loaded from
+                the index snapshot on first use if not given.
+        """
+        if live_scan is None:
+            live_scan = os.environ.get("SHELLEY_BIO_LIVE_SCAN", "").lower() in ("1", "true", "yes")
+        self.live_scan = live_scan
+        self._index = index
+        self._versions_cache: Dict[str, List[Tuple[str, str]]] = {}
+        self._cvmfs_listing: Optional[Dict[str, List[Tuple[str, str]]]] = None
+        # Modules written since the spider cache was last updated
+        self._pending_cache: List[Tuple[str, str, Path]] = []
+        self._spider_cache: Optional[SpiderCache] = None
+        self._manifest: Optional[BuildManifest] = None
     
     def _is_cvmfs_available(self) -> bool:
         """Check if CVMFS is mounted and accessible."""
         return self.CVMFS_SINGULARITY_PATH.exists() and self.CVMFS_SINGULARITY_PATH.is_dir()
     
+    def _get_index(self):
+        """Return the container index, loading it on first use."""
+        if self._index is None:
+            from ..server.index import BioFinderIndex
+            
+            index = BioFinderIndex()
+            index.load_data()
+            self._index = index
+        return self._index
+    
     def _get_available_tools(self, tool_name: str) -> List[Tuple[str, str]]:
         """
-        Get available versions of a tool from CVMFS.
+        Get available versions of a tool.
+        
+        Versions come from the container index (newest first) unless live_scan
+        is set. Results are cached per tool for the lifetime of the builder.
+        
+        Args:
+            tool_name: Name of the tool to search for
+            
+        Returns:
+            List of (tool_name, version) tuples
+        """
+        key = tool_name.lower()
+        if key not in self._versions_cache:
+            if self.live_scan:
+                self._versions_cache[key] = self._scan_cvmfs(tool_name)
+            else:
+                self._versions_cache[key] = self._lookup_index(tool_name)
+        return self._versions_cache[key]
+    
+    def _lookup_index(self, tool_name: str) -> List[Tuple[str, str]]:
+        """
+        Get available versions of a tool from the container index.
+        
+        Args:
+            tool_name: Name of the tool to search for
+            
+        Returns:
+            List of (tool_name, version) tuples, newest first
+        """
+        containers = self._get_index().container_index.get(tool_name.lower(), [])
+        return [
+            (container['tool_name'], container['tag'])
+            for container in containers
+            if container['tag']
+        ]
+    
+    def _scan_cvmfs(self, tool_name: str) -> List[Tuple[str, str]]:
+        """
+        Get available versions of a tool by scanning the CVMFS directory.
+        
+        Reads every entry in the repository, so this is slow on a cold CVMFS
+        client, but it sees images added since the container cache was built.
+        The directory is only read once per builder; later tools are looked up
+        in the same listing.
         
         Args:
             tool_name: Name of the tool to search for
@@ -38,26 +165,66 @@ class CVMFSModuleBuilder:
         Returns:
             List of (tool_name, version) tuples
         """
+        if self._cvmfs_listing is None:
+            self._cvmfs_listing = self._read_cvmfs_listing()
+        return self._cvmfs_listing.get(tool_name.lower(), [])
+    
+    def _read_cvmfs_listing(self) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Read every container in the CVMFS directory, grouped by lowercase tool name.
+        
+        Returns:
+            Dict mapping tool name to a list of (tool_name, version) tuples
+        """
         if not self._is_cvmfs_available():
             raise RuntimeError("CVMFS not available at /cvmfs/singularity.galaxyproject.org/all")
         
-        # Search for containers matching the tool name
+        listing: Dict[str, List[Tuple[str, str]]] = {}
         try:
-            containers = []
-            for item in self.CVMFS_SINGULARITY_PATH.iterdir():
-                if item.is_file() or item.is_symlink():
-                    # Container names are like "samtools:1.22" 
+            with os.scandir(self.CVMFS_SINGULARITY_PATH) as entries:
+                for item in entries:
+                    # Container names are like "samtools:1.22"
                     name = item.name
-                    if ":" in name:
+                    if ":" not in name:
+                        continue
+                    if item.is_file() or item.is_symlink():
                         container_tool, version = name.split(":", 1)
-                        if container_tool.lower() == tool_name.lower():
-                            containers.append((container_tool, version))
-            
-            return containers
+                        listing.setdefault(container_tool.lower(), []).append((container_tool, version))
         except (OSError, PermissionError) as e:
             raise RuntimeError(f"Failed to read CVMFS directory: {e}")
+        
+        return listing
     
-    def _parse_version(self, version_str: str) -> Tuple[int, ...]:
+    def _verify_container(self, tool_name: str, version: str) -> Path:
+        """
+        Confirm that a container from the index exists on CVMFS with one stat().
+        
+        Args:
+            tool_name: Name of the tool
+            version: Container tag
+            
+        Returns:
+            Path to the container image
+            
+        Raises:
+            RuntimeError: If CVMFS is not mounted
+            ValueError: If the image is not on CVMFS
+        """
+        container_path = self.CVMFS_SINGULARITY_PATH / f"{tool_name}:{version}"
+        try:
+            os.stat(container_path)
+        except FileNotFoundError:
+            if not self._is_cvmfs_available():
+                raise RuntimeError("CVMFS not available at /cvmfs/singularity.galaxyproject.org/all")
+            raise ValueError(
+                f"Container {container_path} is listed in the container index but not found on CVMFS. "
+                f"The index may be out of date; retry with --live-scan."
+            )
+        except OSError as e:
+            raise RuntimeError(f"Failed to access {container_path}: {e}")
+        return container_path
+    
+    def _parse_version(self, version_str: str) -> TagKey:
         """
         Parse version string for semantic sorting.
         
@@ -65,23 +232,9 @@ class CVMFSModuleBuilder:
             version_str: Version string like "1.21" or "1.22--hdfd78af_0"
             
         Returns:
-            Tuple of version numbers for sorting
-        """
-        # Extract the main version number before any build suffix
-        version_part = version_str.split("--")[0]
-        
-        # Split on dots and convert to integers where possible
-        parts = []
-        for part in version_part.split("."):
-            # Try to extract numbers from the part
-            numbers = re.findall(r'\d+', part)
-            if numbers:
-                parts.extend(int(num) for num in numbers)
-            else:
-                # For non-numeric parts, use ASCII value of first char
-                parts.append(ord(part[0]) if part else 0)
-        
-        return tuple(parts)
+            Comparable key shared with the MCP server (see shelley_bio.utils.versions)
+        """
+        return parse_tag(version_str)
     
     def _get_latest_version(self, versions: List[Tuple[str, str]]) -> Tuple[str, str]:
         """
@@ -100,115 +253,125 @@ class CVMFSModuleBuilder:
         sorted_versions = sorted(versions, key=lambda x: self._parse_version(x[1]), reverse=True)
         return sorted_versions[0]
     
-    def _create_module_file(self, tool_name: str, version: str) -> Path:
+    def _render_module(self, tool_name: str, version: str) -> str:
+        """Render the Lmod module file content for a tool and version."""
+        container_path = f"/cvmfs/singularity.galaxyproject.org/all/{tool_name}:{version}"
+        return MODULE_TEMPLATE.format(
+            title=tool_name.title(),
+            tool_name=tool_name,
+            version=version,
+            container_path=container_path,
+        )
+    
+    def _get_manifest(self) -> BuildManifest:
+        """
+        Return the build manifest for the modulefile tree, loading it on first use.
+
+        Not thread-safe: build_modules() loads it before starting its workers.
+        """
+        if self._manifest is None:
+            self._manifest = BuildManifest(self.LMOD_MODULES_PATH)
+        return self._manifest
+    
+    def _create_module_file(self, tool_name: str, version: str) -> Tuple[Path, str]:
         """
         Create an Lmod module file for the specified tool and version.
         
+        The file is only written if its rendered content differs from what is
+        already on disk, so repeat builds leave unchanged modules (and their
+        mtimes) alone.
+        
         Args:
             tool_name: Name of the tool
             version: Version of the tool
             
         Returns:
-            Path to the created module file
+            Tuple of (module_file_path, status), where status is "built" for a
+            new file, "unchanged" if it was skipped, or "stale" if it was rewritten
             
         Raises:
             PermissionError: If unable to write to module directory
         """
-        # Create module directory
         module_dir = self.LMOD_MODULES_PATH / tool_name
         module_file = module_dir / f"{version}.lua"
-        
-        try:
-            module_dir.mkdir(parents=True, exist_ok=True)
-        except PermissionError:
-            raise PermissionError(
-                f"Permission denied creating module directory: {module_dir}\n"
-                f"You must run this command with sudo privileges."
-            )
-        
-        # Container path
         container_path = f"/cvmfs/singularity.galaxyproject.org/all/{tool_name}:{version}"
         
-        # Module content
-        module_content = f'''help([[{tool_name.title()} {version} from CVMFS
-
-This module provides access to {tool_name} version {version} via Singularity container.
-All executables from the container are available in your PATH.
-
-Usage examples:
-  For BLAST: blastn, blastp, blastx, tblastn, tblastx
-  For other tools: see container documentation
-
-Container path: {container_path}
-]])
-
-load("singularity")
-
-local containerPath = "{container_path}"
-
--- Function to execute commands in container
-local function container_exec(cmd)
-    return "singularity exec " .. containerPath .. " " .. cmd
-end
-
--- Add container executables to PATH via wrapper functions
-prepend_path("PATH", pathJoin(os.getenv("MODULEPATH") or "", "..", "wrappers", "{tool_name}", "{version}"))
-
--- Create primary alias for the tool name (if executable exists)
-set_alias("{tool_name}", container_exec("{tool_name}"))
-
--- For tools with known multiple executables, create additional aliases
-if "{tool_name}" == "blast" then
-    set_alias("blastn", container_exec("blastn"))
-    set_alias("blastp", container_exec("blastp"))
-    set_alias("blastx", container_exec("blastx"))
-    set_alias("tblastn", container_exec("tblastn"))
-    set_alias("tblastx", container_exec("tblastx"))
-    set_alias("makeblastdb", container_exec("makeblastdb"))
-    set_alias("blast_formatter", container_exec("blast_formatter"))
-end
-
-if "{tool_name}" == "samtools" then
-    set_alias("samtools", container_exec("samtools"))
-end
-
-if "{tool_name}" == "fastqc" then
-    set_alias("fastqc", container_exec("fastqc"))
-end
-
--- Generic function to run any command in the container
-set_alias("{tool_name}_exec", container_exec("$*"))
-'''
+        module_content = self._render_module(tool_name, version)
+        rendered_hash = content_hash(module_content)
+        manifest = self._get_manifest()
+        
+        if manifest.matches(module_file, tool_name, version, rendered_hash):
+            return module_file, UNCHANGED
         
         try:
-            module_file.write_text(module_content)
-        except PermissionError:
-            raise PermissionError(
-                f"Permission denied writing module file: {module_file}\n"
-                f"You must run this command with sudo privileges."
-            )
+            existing = module_file.read_text()
+        except FileNotFoundError:
+            existing = None
+        except OSError:
+            existing = ""
         
-        return module_file
+        if existing == module_content:
+            status = UNCHANGED
+        else:
+            status = BUILT if existing is None else STALE
+            # Create module directory
+            try:
+                module_dir.mkdir(parents=True, exist_ok=True)
+            except PermissionError:
+                raise PermissionError(
+                    f"Permission denied creating module directory: {module_dir}\n"
+                    f"You must run this command with sudo privileges."
+                )
+            
+            try:
+                module_file.write_text(module_content)
+            except PermissionError:
+                raise PermissionError(
+                    f"Permission denied writing module file: {module_file}\n"
+                    f"You must run this command with sudo privileges."
+                )
+        
+        manifest.record(module_file, tool_name, version, container_path, TEMPLATE_HASH, rendered_hash)
+        return module_file, status
+    
+    def _get_spider_cache(self) -> SpiderCache:
+        """Return the Lmod spider cache for the modulefile tree."""
+        if self._spider_cache is None:
+            self._spider_cache = SpiderCache(self.LMOD_MODULES_PATH, self.LMOD_CACHE_PATH)
+        return self._spider_cache
     
     def _refresh_module_cache(self) -> Tuple[bool, str]:
         """
-        Refresh the Lmod module cache.
+        Save the build manifest and update the Lmod spider cache with the
+        modules written since the last refresh.
+        
+        Only the new modules' entries are added or replaced; the modulefile tree
+        is walked just once, the first time the cache is created.
         
         Returns:
             Tuple of (success, output)
         """
+        if self._manifest is not None:
+            try:
+                self._manifest.save()
+            except OSError as e:
+                return False, f"Failed to save build manifest {self._manifest.path}: {e}"
+        
+        modules, self._pending_cache = self._pending_cache, []
+        if not modules:
+            return True, "Module cache already up to date"
         try:
-            result = subprocess.run(
-                ["module", "--ignore_cache", "avail"],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            return True, result.stderr  # module avail outputs to stderr
-        except FileNotFoundError:
-            return False, "Lmod not available (module command not found)"
-        except Exception as e:
-            return False, f"Error running module command: {e}"
+            count = self._get_spider_cache().update(modules)
+        except OSError as e:
+            self._pending_cache = modules + self._pending_cache
+            return False, f"Failed to update Lmod spider cache in {self.LMOD_CACHE_PATH}: {e}"
+        return True, f"Updated Lmod spider cache ({count} modules)"
+    
+    def can_write_modules(self) -> bool:
+        """Check whether module files can be written without elevated privileges."""
+        if self.LMOD_MODULES_PATH.exists():
+            return os.access(self.LMOD_MODULES_PATH, os.W_OK)
+        return False
     
     def list_versions(self, tool_name: str) -> List[str]:
         """
@@ -247,7 +410,7 @@ set_alias("{tool_name}_exec", container_exec("$*"))
         return [(version, str(self.CVMFS_SINGULARITY_PATH / f"{tool_name}:{version}")) 
                 for _, version in sorted_versions]
     
-    def build_module(self, tool_spec: str, force_version: Optional[str] = None) -> Tuple[str, str, Path]:
+    def build_module(self, tool_spec: str, force_version: Optional[str] = None) -> Tuple[str, str, Path, str]:
         """
         Build an Lmod module for a tool.
         
@@ -256,7 +419,8 @@ set_alias("{tool_name}_exec", container_exec("$*"))
             force_version: Force a specific version (overrides tool_spec version)
             
         Returns:
-            Tuple of (tool_name, version, module_file_path)
+            Tuple of (tool_name, version, module_file_path, status), where status
+            is "built", "unchanged" or "stale" (see _create_module_file)
             
         Raises:
             ValueError: If tool not found or version not available
@@ -294,10 +458,86 @@ set_alias("{tool_name}_exec", container_exec("$*"))
             # Use latest version
             final_tool, final_version = self._get_latest_version(available_versions)
         
+        # Confirm the chosen image exists (a live scan has already seen it)
+        if not self.live_scan:
+            self._verify_container(final_tool, final_version)
+        
         # Create module file
-        module_file = self._create_module_file(final_tool, final_version)
+        module_file, status = self._create_module_file(final_tool, final_version)
+        if status != UNCHANGED:
+            self._pending_cache.append((final_tool, final_version, module_file))
         
-        return final_tool, final_version, module_file
+        return final_tool, final_version, module_file, status
+    
+    def _prepare_lookup(self):
+        """
+        Load the container index (or read the CVMFS listing) and the build
+        manifest up front, so concurrent builds share one copy instead of each
+        loading their own. Errors are left for the individual builds to report.
+        """
+        self._get_manifest()
+        try:
+            if self.live_scan:
+                self._scan_cvmfs("")
+            else:
+                self._get_index()
+        except (RuntimeError, OSError):
+            pass
+    
+    def build_modules(
+        self,
+        tool_specs: List[str],
+        workers: int = 1,
+        on_start: Optional[Callable[[str], None]] = None,
+        on_result: Optional[Callable[[str, Optional[Tuple[str, str, Path, str]], Optional[Exception]], None]] = None,
+    ) -> Tuple[List[Tuple[str, Optional[Tuple[str, str, Path, str]], Optional[Exception]]], Tuple[bool, str]]:
+        """
+        Build modules for several tools in one pass.
+        
+        All specs are resolved against the same container listing, and the Lmod
+        cache is refreshed once after the last module file is written rather
+        than after each one. A failing spec does not stop the others, and the
+        modules already written are recorded even if the batch is interrupted.
+        
+        Args:
+            tool_specs: Tool specifications like "samtools" or "samtools/1.21"
+            workers: Number of modules to resolve and write concurrently
+            on_start: Optional callback called as on_start(spec) when a build starts
+            on_result: Optional callback called as on_result(spec, built, error)
+                when a build finishes
+            
+        Returns:
+            Tuple of (results, refresh): results is a list of (tool_spec,
+            (tool_name, version, module_file, status) or None, error or None),
+            in the same order as tool_specs, and refresh is the (success,
+            output) of saving the manifest and updating the Lmod cache
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        def build_one(tool_spec: str):
+            if on_start is not None:
+                on_start(tool_spec)
+            try:
+                built, error = self.build_module(tool_spec), None
+            except (ValueError, RuntimeError, OSError) as e:
+                built, error = None, e
+            if on_result is not None:
+                on_result(tool_spec, built, error)
+            return tool_spec, built, error
+        
+        self._prepare_lookup()
+        workers = max(1, min(workers, len(tool_specs)))
+        try:
+            if workers == 1:
+                results = [build_one(tool_spec) for tool_spec in tool_specs]
+            else:
+                # Builds are dominated by CVMFS stat() and module file writes, which
+                # release the GIL, so threads are enough
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shelley-bio-build") as pool:
+                    results = list(pool.map(build_one, tool_specs))
+        finally:
+            refresh = self._refresh_module_cache()
+        return results, refresh
 
 
 def format_versions_list(versions: List[str]) -> None:
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Module Build Manifest
+
+Records what the builder last wrote for each generated modulefile, so re-running
+a build can tell whether a module would actually change before touching it.
+
+The manifest is a JSON file at the root of the modulefile tree:
+
+    {
+      "version": 1,
+      "modules": {
+        "samtools/1.21--h50ea8bc_0": {
+          "tool": "samtools",
+          "version": "1.21--h50ea8bc_0",
+          "container": "/cvmfs/singularity.galaxyproject.org/all/samtools:1.21--h50ea8bc_0",
+          "template_hash": "...",   # sha256 of the module template
+          "content_hash": "...",    # sha256 of the rendered modulefile
+          "size": 1503,
+          "mtime_ns": 1718000000000000000
+        }
+      }
+    }
+
+Size and mtime let an unchanged module be confirmed with a stat() instead of
+re-reading it.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Bump when the manifest layout changes; an unrecognised manifest is ignored.
+MANIFEST_VERSION = 1
+
+# Build outcomes for one module
+BUILT = "built"          # new modulefile
+UNCHANGED = "unchanged"  # existing modulefile already had the rendered content
+STALE = "stale"          # existing modulefile differed and was rewritten
+
+
+def content_hash(content: str) -> str:
+    """sha256 of rendered modulefile content."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class BuildManifest:
+    """Per-module record of the last build, stored under the modulefiles root."""
+
+    FILE_NAME = ".shelley-bio-manifest.json"
+
+    def __init__(self, modules_path: Path):
+        self.path = Path(modules_path) / self.FILE_NAME
+        self.modules: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk, starting empty if it is missing or unusable."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") == MANIFEST_VERSION:
+            self.modules = data.get("modules", {})
+        else:
+            self.modules = {}
+        self._dirty = False
+
+    def get(self, tool_name: str, version: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.modules.get(f"{tool_name}/{version}")
+
+    def matches(self, module_file: Path, tool_name: str, version: str, rendered_hash: str) -> bool:
+        """
+        Check whether module_file is known to hold content with rendered_hash,
+        using only the manifest and a stat() of the file.
+        """
+        recorded = self.get(tool_name, version)
+        if recorded is None or recorded.get("content_hash") != rendered_hash:
+            return False
+        try:
+            stat = module_file.stat()
+        except OSError:
+            return False
+        return stat.st_size == recorded.get("size") and stat.st_mtime_ns == recorded.get("mtime_ns")
+
+    def record(self, module_file: Path, tool_name: str, version: str, container: str,
+               template_hash: str, rendered_hash: str):
+        """Record the current state of a modulefile after a build."""
+        stat = module_file.stat()
+        entry = {
+            "tool": tool_name,
+            "version": version,
+            "container": container,
+            "template_hash": template_hash,
+            "content_hash": rendered_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        with self._lock:
+            key = f"{tool_name}/{version}"
+            if self.modules.get(key) != entry:
+                self.modules[key] = entry
+                self._dirty = True
+
+    def save(self):
+        """Write the manifest if anything changed, replacing it atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": MANIFEST_VERSION, "modules": self.modules}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=".shelley-bio-manifest-", dir=self.path.parent)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f, indent=1, sort_keys=True)
+                os.chmod(tmp_name, 0o644)
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+            self._dirty = False
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Lmod Spider Cache
+
+Maintains the Lmod system spider cache for the generated modulefile tree, so
+`module avail` and `module spider` read one precomputed file instead of walking
+every modulefile.
+
+Lmod reads the cache from `spiderT.lua` in its cache directory and trusts it
+while it is newer than the configured timestamp file. Rebuilding that file
+normally means running `update_lmod_system_cache_files`, which walks the whole
+tree. Here the cache contents are kept in a JSON sidecar (`spiderT.json`) next
+to it instead: building a module adds or replaces just that module's entry in
+the sidecar, and `spiderT.lua` is re-rendered from it. The tree is only walked
+to seed the sidecar the first time.
+
+Point Lmod at the cache directory in `lmodrc.lua`:
+
+    scDescriptT = {
+      { dir = "/apps/Modules/cacheDir", timestamp = "/apps/Modules/cacheDir/timestamp" },
+    }
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..utils.versions import parse_tag
+
+# Entry fields: fn, Version, canonical, pV, wV, help
+Entry = Dict[str, str]
+
+# Bump when the sidecar layout changes; an unrecognised sidecar is re-seeded.
+STATE_VERSION = 1
+
+_HELP_RE = re.compile(r"help\(\[\[(.*?)\]\]\)", re.DOTALL)
+
+# Lmod version-string markers for each parse_tag() phase. '*' sorts before
+# digits, so "1.2" < "1.2.1" and pre-releases sort before the final release.
+_PHASE_MARKERS = {0: "*@", 1: "*a", 2: "*b", 3: "*c", 4: "*zfinal", 5: "*zfinal.*zpost"}
+
+
+def lmod_version_key(version: str) -> str:
+    """
+    Lmod-style sortable version string (the pV/wV spider cache fields).
+
+    Numeric parts are zero-padded to 9 digits so plain string comparison
+    orders versions the same way parse_tag() does, e.g.
+    "1.21--h50ea8bc_0" -> "000000001.000000021.*zfinal-000000000".
+    A release part written with leading zeros gets a '*' per zero ("2.01" <
+    "2.1"), and a "v"-prefixed tag a '*' before its build number.
+    """
+    key = parse_tag(version)
+    parts = [_lmod_number(number) + "*" * -padding for number, padding in key.release]
+    parts.append(_PHASE_MARKERS[key.phase])
+    parts.extend(_lmod_number(number) for number in key.phase_number)
+    return ".".join(parts) + ("-" if key.unprefixed else "-*") + _lmod_number(key.build)
+
+
+def _lmod_number(number: int) -> str:
+    """
+    A number as a fixed-width sortable string: zero-padded to 9 digits, and
+    one '~' per digit beyond that in front ("20240101123456" ->
+    "~~~~~20240101123456"), so longer numbers sort after shorter ones.
+    """
+    digits = f"{number:09d}"
+    return "~" * (len(digits) - 9) + digits
+
+
+def _lua_string(value: str) -> str:
+    """Quote a string as a Lua string literal."""
+    escaped = (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    return f'"{escaped}"'
+
+
+def _module_help(module_file: Path) -> str:
+    """Read the help([[...]]) text of a modulefile, or "" if it has none."""
+    try:
+        match = _HELP_RE.search(module_file.read_text(errors="replace"))
+    except OSError:
+        return ""
+    return match.group(1).strip() if match else ""
+
+
+def make_entry(module_file: Path, version: str, help_text: Optional[str] = None) -> Entry:
+    """Build the spider cache entry for one modulefile."""
+    key = lmod_version_key(version)
+    return {
+        "fn": str(module_file),
+        "Version": version,
+        "canonical": version,
+        "pV": key,
+        "wV": key,
+        "help": _module_help(module_file) if help_text is None else help_text,
+    }
+
+
+class SpiderCache:
+    """Incrementally maintained Lmod system spider cache for one modulefile tree."""
+
+    SPIDER_FILE = "spiderT.lua"
+    STATE_FILE = "spiderT.json"
+    TIMESTAMP_FILE = "timestamp"
+
+    def __init__(self, modules_path: Path, cache_dir: Path):
+        """
+        Args:
+            modules_path: Root of the modulefile tree (one MODULEPATH entry)
+            cache_dir: Lmod system cache directory
+        """
+        self.modules_path = Path(modules_path)
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+
+    @property
+    def spider_file(self) -> Path:
+        return self.cache_dir / self.SPIDER_FILE
+
+    @property
+    def state_file(self) -> Path:
+        return self.cache_dir / self.STATE_FILE
+
+    @property
+    def timestamp_file(self) -> Path:
+        return self.cache_dir / self.TIMESTAMP_FILE
+
+    def scan_tree(self) -> Dict[str, Dict[str, Entry]]:
+        """
+        Walk the modulefile tree and build entries for every <tool>/<version>.lua.
+
+        Returns:
+            Dict mapping tool name to {"tool/version": entry}
+        """
+        modules: Dict[str, Dict[str, Entry]] = {}
+        if not self.modules_path.is_dir():
+            return modules
+
+        for tool_dir in sorted(self.modules_path.iterdir()):
+            if not tool_dir.is_dir() or tool_dir.name.startswith("."):
+                continue
+            for module_file in sorted(tool_dir.glob("*.lua")):
+                version = module_file.name[:-len(".lua")]
+                modules.setdefault(tool_dir.name, {})[f"{tool_dir.name}/{version}"] = make_entry(module_file, version)
+        return modules
+
+    def load_state(self) -> Optional[Dict[str, Dict[str, Entry]]]:
+        """Load the sidecar state, or None if it is missing or unusable."""
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != STATE_VERSION or state.get("modules_path") != str(self.modules_path):
+            return None
+        return state.get("modules", {})
+
+    def update(self, modules: Iterable[Tuple[str, str, Path]]) -> int:
+        """
+        Add or replace cache entries for modules that were just written.
+
+        Seeds the cache from the modulefile tree if there is no usable sidecar
+        yet; otherwise only the given modules are read, and entries whose
+        modulefile has since been deleted are dropped.
+
+        Args:
+            modules: (tool_name, version, module_file) for each written module
+
+        Returns:
+            Number of modules in the cache
+        """
+        with self._lock:
+            state = self.load_state()
+            if state is None:
+                state = self.scan_tree()
+            else:
+                state = self._prune(state)
+            for tool_name, version, module_file in modules:
+                state.setdefault(tool_name, {})[f"{tool_name}/{version}"] = make_entry(Path(module_file), version)
+            self._write(state)
+            return sum(len(files) for files in state.values())
+
+    def rebuild(self) -> int:
+        """Re-seed the cache from the modulefile tree. Returns the module count."""
+        with self._lock:
+            state = self.scan_tree()
+            self._write(state)
+            return sum(len(files) for files in state.values())
+
+    @staticmethod
+    def _prune(state: Dict[str, Dict[str, Entry]]) -> Dict[str, Dict[str, Entry]]:
+        """Drop entries whose modulefile no longer exists, and tools left without any."""
+        pruned = {}
+        for tool_name, files in state.items():
+            kept = {name: entry for name, entry in files.items() if os.path.exists(entry.get("fn", ""))}
+            if kept:
+                pruned[tool_name] = kept
+        return pruned
+
+    def render(self, state: Dict[str, Dict[str, Entry]]) -> str:
+        """Render cache state as the contents of spiderT.lua."""
+        mpath = _lua_string(str(self.modules_path))
+        lines = [
+            f"timestampFn = {{ {_lua_string(str(self.timestamp_file))}, }}",
+            "mrcT = {}",
+            "mrcMpathT = {}",
+            "spiderT = {",
+            f"  [{mpath}] = {{",
+        ]
+        for tool_name in sorted(state):
+            lines.append(f"    [{_lua_string(tool_name)}] = {{")
+            lines.append("      fileT = {")
+            for full_name, entry in sorted(state[tool_name].items(), key=lambda item: item[1]["pV"]):
+                lines.append(f"        [{_lua_string(full_name)}] = {{")
+                for field in ("Version", "canonical", "fn", "help", "pV", "wV"):
+                    lines.append(f"          {field} = {_lua_string(entry.get(field, ''))},")
+                lines.append(f"          mpath = {mpath},")
+                lines.append("        },")
+            lines.append("      },")
+            lines.append("    },")
+        lines.extend(["  },", "}", "mpathMapT = {}", ""])
+        return "\n".join(lines)
+
+    def _write(self, state: Dict[str, Dict[str, Entry]]):
+        """Write the sidecar and spiderT.lua, each atomically."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Lmod ignores a cache older than its timestamp file, so make sure one
+        # exists before the cache is (re)written.
+        if not self.timestamp_file.exists():
+            self.timestamp_file.touch()
+
+        sidecar: Dict[str, Any] = {
+            "version": STATE_VERSION,
+            "modules_path": str(self.modules_path),
+            "modules": state,
+        }
+        self._replace(self.state_file, json.dumps(sidecar, indent=1, sort_keys=True))
+        self._replace(self.spider_file, self.render(state))
+
+    def _replace(self, path: Path, content: str):
+        """Write a file to a temporary name and rename it into place."""
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
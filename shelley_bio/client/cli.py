@@ -6,6 +6,7 @@ Command-line client for querying the CVMFS-MCP server and building modules.
 """
 
 import asyncio
+import os
 import sys
 import json
 from pathlib import Path
@@ -13,12 +14,30 @@ from pathlib import Path
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from .local import LocalSession
+from ..server.daemon import (
+    connect_daemon, ping as daemon_ping, shutdown as daemon_shutdown,
+    socket_path as daemon_socket_path, log_path as daemon_log_path
+)
 from ..builder.cvmfs_builder import CVMFSModuleBuilder, format_versions_list, format_build_output
 from ..utils.style import (
     console, ShelleyStyle, print_banner, print_header, print_success, 
     print_warning, print_error, print_info, print_rule, print_command
 )
 
+SERVER_SCRIPT = Path(__file__).parent.parent / "server" / "mcp_server.py"
+
+# Seconds to wait for a background daemon to load the index and start listening
+DAEMON_START_TIMEOUT = 60
+
+# How query commands reach the index (SHELLEY_BIO_TRANSPORT):
+#   auto   - daemon if running, else in-process for one-shot commands, else stdio
+#   daemon - running daemon only
+#   local  - in-process only
+#   stdio  - always start an MCP server subprocess
+TRANSPORTS = ("auto", "daemon", "local", "stdio")
+ONE_SHOT_COMMANDS = ("find", "find-batch", "search", "versions")
+
 
 async def query_tool(session: ClientSession, tool_name: str):
     """Query for a specific tool."""
@@ -66,9 +85,24 @@ async def get_versions(session: ClientSession, tool_name: str):
             console.print(content.text)
 
 
-def build_module(tool_spec: str) -> bool:
+async def find_batch(session: ClientSession, tool_specs: list):
+    """Find containers for many tools (names or tool/version) in one request."""
+    specs = [spec for arg in tool_specs for spec in arg.replace(",", " ").split()]
+    with ShelleyStyle.create_status(f"Finding containers for {len(specs)} tools") as status:
+        result = await session.call_tool("find_tools_batch", {"tools": specs})
+    
+    for content in result.content:
+        if hasattr(content, 'text'):
+            console.print(content.text)
+
+
+def build_module(tool_spec: str, live_scan: bool = False) -> bool:
     """Build an Lmod module for a tool from CVMFS.
     
+    Args:
+        tool_spec: Tool specification like "samtools" or "samtools/1.21"
+        live_scan: Scan the CVMFS directory instead of using the container index
+    
     Returns:
         bool: True if build was successful, False otherwise
     """
@@ -88,6 +122,8 @@ def build_module(tool_spec: str) -> bool:
             "sudo", "-E", "env", f"PATH={os.environ['PATH']}", 
             str(shelley_bio_path), "build", tool_spec
         ]
+        if live_scan:
+            cmd.append("--live-scan")
         
         try:
             print_info(f"Running with elevated privileges: build {tool_spec}")
@@ -104,7 +140,7 @@ def build_module(tool_spec: str) -> bool:
             return False
     
     # Original build logic for when we already have permissions
-    builder = CVMFSModuleBuilder()
+    builder = CVMFSModuleBuilder(live_scan=live_scan or None)
     
     try:
         # Get available versions first for display
@@ -122,14 +158,14 @@ def build_module(tool_spec: str) -> bool:
             error_panel = ShelleyStyle.create_error_panel(
                 "Tool Not Found",
                 f"Tool '{tool_name}' not found in CVMFS",
-                f"Try: shelley-bio versions {tool_name}"
+                f"Try: shelley-bio versions {tool_name}, or add --live-scan to search CVMFS directly"
             )
             console.print(error_panel)
             return False
         
         # Build the module
         with ShelleyStyle.create_status(f"Building module for {tool_spec}") as status:
-            final_tool, final_version, module_file = builder.build_module(tool_spec)
+            final_tool, final_version, module_file, build_status = builder.build_module(tool_spec)
         
         # Refresh module cache
         with ShelleyStyle.create_status("Refreshing module cache") as status:
@@ -143,6 +179,10 @@ def build_module(tool_spec: str) -> bool:
             console.print(info_panel)
             print_rule()
         
+        if build_status == "unchanged":
+            print_info(f"Module file {module_file} is already up to date")
+            return True
+        
         success_panel = ShelleyStyle.create_build_success(
             final_tool, final_version, module_file
         )
@@ -187,6 +227,127 @@ def list_cvmfs_versions(tool_name: str) -> None:
         console.print(error_panel)
 
 
+def manage_index(action: str) -> bool:
+    """Build or inspect the compiled index snapshot.
+    
+    Returns:
+        bool: True if the action succeeded, False otherwise
+    """
+    from ..server.index import BioFinderIndex, snapshot_file
+    
+    index = BioFinderIndex()
+    
+    if action == "build":
+        try:
+            with ShelleyStyle.create_status("Building index snapshot from data files") as status:
+                index.load_data(use_snapshot=False)
+                path = index.save_snapshot()
+        except OSError as e:
+            error_panel = ShelleyStyle.create_error_panel(
+                "Index Build Failed",
+                str(e),
+                "Set SHELLEY_BIO_INDEX to a writable location"
+            )
+            console.print(error_panel)
+            return False
+        print_success(f"Index snapshot written to [path]{path}[/path]")
+        return True
+    
+    if action == "status":
+        valid, reason = index.snapshot_status()
+        if valid:
+            print_success(f"Index snapshot [path]{snapshot_file()}[/path] is {reason}")
+        else:
+            print_warning(f"Index snapshot [path]{snapshot_file()}[/path] is stale: {reason}")
+            print_info("Rebuild it with: [command]shelley-bio index build[/command]")
+        return valid
+    
+    error_panel = ShelleyStyle.create_error_panel(
+        "Unknown Index Action",
+        f"Unknown index action: {action}",
+        "Use 'shelley-bio index build' or 'shelley-bio index status'"
+    )
+    console.print(error_panel)
+    return False
+
+
+async def manage_daemon(action: str) -> bool:
+    """Start, stop or check the background server daemon.
+    
+    Returns:
+        bool: True if the action succeeded, False otherwise
+    """
+    import subprocess
+    
+    path = daemon_socket_path()
+    
+    if action == "status":
+        pid = await daemon_ping()
+        if pid is None:
+            print_info(f"No shelley-bio daemon listening on [path]{path}[/path]")
+            return False
+        print_success(f"shelley-bio daemon running (pid {pid}) on [path]{path}[/path]")
+        return True
+    
+    if action == "stop":
+        if not await daemon_shutdown():
+            print_info("No shelley-bio daemon running")
+            return True
+        print_success("shelley-bio daemon stopped")
+        return True
+    
+    if action == "run":
+        # Foreground, e.g. under systemd
+        from ..server.mcp_server import main as server_main
+        await server_main(["--daemon"])
+        return True
+    
+    if action == "start":
+        pid = await daemon_ping()
+        if pid is not None:
+            print_info(f"shelley-bio daemon already running (pid {pid})")
+            return True
+        
+        log_file = daemon_log_path()
+        log_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with open(log_file, "ab") as log:
+            process = subprocess.Popen(
+                [sys.executable, str(SERVER_SCRIPT), "--daemon"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=log,
+                start_new_session=True
+            )
+        
+        with ShelleyStyle.create_status("Starting shelley-bio daemon") as status:
+            for _ in range(DAEMON_START_TIMEOUT * 10):
+                if process.poll() is not None:
+                    break
+                pid = await daemon_ping()
+                if pid is not None:
+                    break
+                await asyncio.sleep(0.1)
+        
+        if pid is None:
+            error_panel = ShelleyStyle.create_error_panel(
+                "Daemon Failed to Start",
+                f"No daemon listening on {path}",
+                f"Check the daemon log at {log_file}"
+            )
+            console.print(error_panel)
+            return False
+        print_success(f"shelley-bio daemon running (pid {pid}) on [path]{path}[/path]")
+        return True
+    
+    error_panel = ShelleyStyle.create_error_panel(
+        "Unknown Daemon Action",
+        f"Unknown daemon action: {action}",
+        "Use 'shelley-bio daemon start', 'stop', 'status' or 'run'"
+    )
+    console.print(error_panel)
+    return False
+
+
 async def interactive_mode(session: ClientSession):
     """Run in interactive mode."""
     console.clear()
@@ -195,6 +356,7 @@ async def interactive_mode(session: ClientSession):
     # Create help table
     commands = [
         {"command": "find <tool>", "description": "Find information about a specific tool", "example": "find fastqc"},
+        {"command": "find-batch <tool\\[/ver]> ...", "description": "Find containers for many tools at once", "example": "find-batch fastqc bwa samtools/1.21"},
         {"command": "search <description>", "description": "Search for tools by function", "example": "search quality control"},
         {"command": "versions <tool>", "description": "Get available container versions", "example": "versions samtools"},
         {"command": "build <tool\[/ver]>", "description": "Build Lmod module for tool", "example": "build samtools/1.21"},
@@ -233,14 +395,23 @@ async def interactive_mode(session: ClientSession):
                 print_info("Example: [command]find fastqc[/command]")
                 
             elif command == "search" and len(parts) > 1:
-                description = " ".join(parts[1:])
-                await search_function(session, description)
+                words, limit = parse_limit(parts[1:])
+                description = " ".join(words)
+                await search_function(session, description, limit)
                 
             elif command == "search":
                 print_warning("Missing search terms")
                 print_info("Usage: [command]search <description>[/command]")
                 print_info("Example: [command]search quality control[/command]")
                 
+            elif command == "find-batch" and len(parts) > 1:
+                await find_batch(session, parts[1:])
+                
+            elif command == "find-batch":
+                print_warning("Missing tool names")
+                print_info("Usage: [command]find-batch <tool_name>\\[/version] ...[/command]")
+                print_info("Example: [command]find-batch fastqc bwa samtools/1.21[/command]")
+                
             elif command == "versions" and len(parts) > 1:
                 await get_versions(session, parts[1])
                 
@@ -275,6 +446,59 @@ async def interactive_mode(session: ClientSession):
             print_error(f"Error: {e}")
 
 
+def parse_limit(args: list, default: int = 10) -> tuple:
+    """Split a '--limit N' option out of command arguments.
+    
+    Returns:
+        Tuple of (remaining arguments, limit)
+    """
+    remaining = []
+    limit = default
+    args = iter(args)
+    for arg in args:
+        if arg == "--limit":
+            value = next(args, "")
+        elif arg.startswith("--limit="):
+            value = arg.split("=", 1)[1]
+        else:
+            remaining.append(arg)
+            continue
+        try:
+            limit = max(1, int(value))
+        except ValueError:
+            print_warning(f"Ignoring invalid --limit value: {value!r}")
+    return remaining, limit
+
+
+async def run_command(session, command: str):
+    """Run a query command against a connected server session."""
+    if command == "find" and len(sys.argv) > 2:
+        await query_tool(session, sys.argv[2])
+    
+    elif command == "find-batch" and len(sys.argv) > 2:
+        await find_batch(session, sys.argv[2:])
+    
+    elif command == "search" and len(sys.argv) > 2:
+        words, limit = parse_limit(sys.argv[2:])
+        description = " ".join(words)
+        await search_function(session, description, limit)
+    
+    elif command == "versions" and len(sys.argv) > 2:
+        await get_versions(session, sys.argv[2])
+    
+    elif command == "interactive":
+        await interactive_mode(session)
+    
+    else:
+        error_panel = ShelleyStyle.create_error_panel(
+            "Unknown Command",
+            f"Unknown command: {command}",
+            "Use 'shelley-bio' with no arguments to see available commands"
+        )
+        console.print(error_panel)
+        sys.exit(1)
+
+
 async def main():
     """Main entry point."""
     if len(sys.argv) < 2:
@@ -285,9 +509,12 @@ async def main():
         # Usage information
         usage_commands = [
             {"command": "find <tool_name>", "description": "Find information about a specific tool", "example": "shelley-bio find fastqc"},
-            {"command": "search <description>", "description": "Search for tools by function", "example": "shelley-bio search 'quality control'"},
+            {"command": "find-batch <tool\\[/version]> ...", "description": "Find containers for many tools at once", "example": "shelley-bio find-batch fastqc bwa samtools/1.21"},
+            {"command": "search <description> [--limit N]", "description": "Search for tools by function", "example": "shelley-bio search 'quality control'"},
             {"command": "versions <tool_name>", "description": "Get available container versions", "example": "shelley-bio versions samtools"},
-            {"command": "build <tool\[/version\]>", "description": "Build Lmod module for tool", "example": "shelley-bio build samtools/1.21"},
+            {"command": "build <tool\[/version\]> [--live-scan]", "description": "Build Lmod module for tool", "example": "shelley-bio build samtools/1.21"},
+            {"command": "index build|status", "description": "Build or check the compiled search index", "example": "shelley-bio index build"},
+            {"command": "daemon start|stop|status", "description": "Keep a server running for faster queries", "example": "shelley-bio daemon start"},
             {"command": "interactive", "description": "Start interactive mode", "example": "shelley-bio interactive"}
         ]
         
@@ -305,12 +532,76 @@ async def main():
     
     # Handle CVMFS commands that don't need the MCP server
     if command == "build" and len(sys.argv) > 2:
-        build_module(sys.argv[2])
+        build_module(sys.argv[2], live_scan="--live-scan" in sys.argv[3:])
+        return
+    
+    if command == "index":
+        action = sys.argv[2].lower() if len(sys.argv) > 2 else "status"
+        if not manage_index(action):
+            sys.exit(1)
+        return
+    
+    if command == "daemon":
+        action = sys.argv[2].lower() if len(sys.argv) > 2 else "status"
+        if not await manage_daemon(action):
+            sys.exit(1)
         return
     
     # Handle commands that need the MCP server
+    transport = os.environ.get("SHELLEY_BIO_TRANSPORT", "auto").lower()
+    if transport not in TRANSPORTS:
+        error_panel = ShelleyStyle.create_error_panel(
+            "Configuration Error",
+            f"Unknown SHELLEY_BIO_TRANSPORT: {transport}",
+            f"Use one of: {', '.join(TRANSPORTS)}"
+        )
+        console.print(error_panel)
+        sys.exit(1)
+    
+    # Use a running daemon if there is one
+    daemon_session = await connect_daemon() if transport in ("auto", "daemon") else None
+    if transport == "daemon" and daemon_session is None:
+        error_panel = ShelleyStyle.create_error_panel(
+            "Daemon Not Running",
+            f"No shelley-bio daemon listening on {daemon_socket_path()}",
+            "Start it with 'shelley-bio daemon start'"
+        )
+        console.print(error_panel)
+        sys.exit(1)
+    
+    if daemon_session is not None:
+        try:
+            async with daemon_session as session:
+                await run_command(session, command)
+        except Exception as e:
+            error_panel = ShelleyStyle.create_error_panel(
+                "Daemon Error",
+                f"Failed to run shelley-bio via daemon: {e}",
+                "Restart it with 'shelley-bio daemon stop' and 'shelley-bio daemon start'"
+            )
+            console.print(error_panel)
+            sys.exit(1)
+        return
+    
+    # One-shot queries run in-process: loading the index snapshot here is
+    # much cheaper than starting a server and talking JSON-RPC to it
+    if transport == "local" or (transport == "auto" and command in ONE_SHOT_COMMANDS):
+        try:
+            async with LocalSession() as session:
+                await run_command(session, command)
+        except Exception as e:
+            error_panel = ShelleyStyle.create_error_panel(
+                "Query Error",
+                f"Failed to run shelley-bio: {e}",
+                "Check that the data files are present, or try SHELLEY_BIO_TRANSPORT=stdio"
+            )
+            console.print(error_panel)
+            sys.exit(1)
+        return
+    
+    # Otherwise start a server for this command
     # Locate server script
-    server_script = Path(__file__).parent.parent / "server" / "mcp_server.py"
+    server_script = SERVER_SCRIPT
     
     if not server_script.exists():
         error_panel = ShelleyStyle.create_error_panel(
@@ -334,28 +625,7 @@ async def main():
             async with ClientSession(read, write) as session:
                 # Initialize
                 await session.initialize()
-                
-                if command == "find" and len(sys.argv) > 2:
-                    await query_tool(session, sys.argv[2])
-                
-                elif command == "search" and len(sys.argv) > 2:
-                    description = " ".join(sys.argv[2:])
-                    await search_function(session, description)
-                
-                elif command == "versions" and len(sys.argv) > 2:
-                    await get_versions(session, sys.argv[2])
-                
-                elif command == "interactive":
-                    await interactive_mode(session)
-                
-                else:
-                    error_panel = ShelleyStyle.create_error_panel(
-                        "Unknown Command",
-                        f"Unknown command: {command}",
-                        "Use 'shelley-bio' with no arguments to see available commands"
-                    )
-                    console.print(error_panel)
-                    sys.exit(1)
+                await run_command(session, command)
                     
     except Exception as e:
         error_panel = ShelleyStyle.create_error_panel(
@@ -366,6 +636,5 @@ async def main():
         console.print(error_panel)
         sys.exit(1)
 
-
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
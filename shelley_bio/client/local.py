@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+In-process execution for the Shelley Bio CLI.
+
+Runs tool calls directly against a BioFinderIndex loaded in the CLI process,
+using the same call_tool handler (and therefore the same formatting) as the
+MCP server, without starting a server or going through JSON-RPC.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from mcp.types import CallToolResult
+
+
+class LocalSession:
+    """
+    In-process stand-in for mcp.ClientSession.
+
+    Provides the call_tool() subset used by the CLI query functions.
+    """
+
+    def __init__(self, quiet: bool = True):
+        self.quiet = quiet
+        self._server = None
+
+    async def __aenter__(self) -> "LocalSession":
+        # Imported here so the server module (and its logging setup) is only
+        # loaded when in-process mode is actually used
+        from ..server import mcp_server
+
+        if self.quiet:
+            logging.getLogger("shelley-bio").setLevel(logging.WARNING)
+
+        # One call per CLI run: a pool would only add startup cost
+        mcp_server.configure_executor("inline")
+
+        if not mcp_server.index.metadata:
+            mcp_server.index.load_data()
+        self._server = mcp_server
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> CallToolResult:
+        content = await self._server.call_tool(name, arguments or {})
+        return CallToolResult(content=content)
@@ -8,44 +8,70 @@ Builds multiple Lmod modules for automated environments.
 import sys
 import subprocess
 import os
+import threading
 from pathlib import Path
+from typing import Optional
 
+from ..builder.cvmfs_builder import CVMFSModuleBuilder
 from ..utils.style import (
     console, ShelleyStyle, print_banner, print_header, print_success, 
     print_warning, print_error, print_info, print_rule, print_command
 )
 
 
-def build_module_with_sudo(tool: str, shelley_bio_path: Path) -> bool:
-    """Build a single module using sudo if needed."""
-    with ShelleyStyle.create_status(f"Building module for: {tool}") as status:
-        # Use the command we know works from testing
-        cmd = [
-            "sudo", "-E", "env", f"PATH={os.environ['PATH']}", 
-            str(shelley_bio_path), "build", tool
-        ]
-        
+def rerun_with_sudo(tools: list[str], live_scan: bool = False, workers: Optional[int] = None) -> int:
+    """
+    Re-run the whole batch once under sudo.
+
+    Elevating once, rather than once per tool, means a single process loads the
+    container index and writes every module file.
+    """
+    shelley_bio_batch_path = Path(__file__).parent.parent.parent / "bin" / "shelley-bio-batch"
+    if not shelley_bio_batch_path.exists():
+        error_panel = ShelleyStyle.create_error_panel(
+            "Configuration Error",
+            f"shelley-bio-batch not found at {shelley_bio_batch_path}",
+            "Check Shelley Bio installation"
+        )
+        console.print(error_panel)
+        return 1
+
+    cmd = [
+        "sudo", "-E", "env", f"PATH={os.environ['PATH']}",
+        str(shelley_bio_batch_path), *tools
+    ]
+    if live_scan:
+        cmd.append("--live-scan")
+    if workers is not None:
+        cmd.extend(["--workers", str(workers)])
+
+    try:
+        print_info(f"Running with elevated privileges: build {len(tools)} modules")
+        return subprocess.run(cmd, check=False).returncode
+    except KeyboardInterrupt:
+        print_warning("Build cancelled by user")
+        return 1
+
+
+def default_workers() -> int:
+    """Default number of concurrent builds: SHELLEY_BIO_BUILD_WORKERS, else up to 8."""
+    value = os.environ.get("SHELLEY_BIO_BUILD_WORKERS")
+    if value:
         try:
-            result = subprocess.run(cmd, check=False, capture_output=True, text=True)
-            if result.returncode == 0:
-                print_success(f"Successfully built module for [tool]{tool}[/tool]")
-                return True
-            else:
-                print_error(f"Failed to build module for [tool]{tool}[/tool]")
-                if result.stderr:
-                    console.print(f"[muted]{result.stderr.strip()}[/muted]")
-                return False
-        except Exception as e:
-            print_error(f"Error building module for [tool]{tool}[/tool]: {e}")
-            return False
-
-
-def batch_build_modules(tools: list[str]) -> int:
+            return max(1, int(value))
+        except ValueError:
+            print_warning(f"Ignoring invalid SHELLEY_BIO_BUILD_WORKERS={value!r}")
+    return min(8, os.cpu_count() or 1)
+
+
+def batch_build_modules(tools: list[str], live_scan: bool = False, workers: Optional[int] = None) -> int:
     """
     Build modules for multiple tools.
     
     Args:
         tools: List of tool names/specifications
+        live_scan: Scan the CVMFS directory instead of using the container index
+        workers: Number of modules to build concurrently (defaults to default_workers())
         
     Returns:
         Exit code (0 for success, 1 for failure)
@@ -59,7 +85,9 @@ def batch_build_modules(tools: list[str]) -> int:
         usage_commands = [
             {"command": "shelley-bio-batch [tools...]", "description": "Build modules for multiple tools", "example": "shelley-bio-batch samtools"},
             {"command": "shelley-bio-batch tool1 tool2", "description": "Build modules for multiple tools", "example": "shelley-bio-batch samtools fastqc bowtie2"},
-            {"command": "shelley-bio-batch tool/version", "description": "Build module for specific version", "example": "shelley-bio-batch samtools/1.22"}
+            {"command": "shelley-bio-batch tool/version", "description": "Build module for specific version", "example": "shelley-bio-batch samtools/1.22"},
+            {"command": "shelley-bio-batch tools... --live-scan", "description": "Scan CVMFS instead of using the container index", "example": "shelley-bio-batch samtools --live-scan"},
+            {"command": "shelley-bio-batch tools... --workers N", "description": "Build up to N modules at once (default: CPUs, max 8)", "example": "shelley-bio-batch samtools fastqc -j 4"}
         ]
         
         usage_table = ShelleyStyle.create_help_table(usage_commands)
@@ -67,63 +95,90 @@ def batch_build_modules(tools: list[str]) -> int:
         
         info_panel = ShelleyStyle.create_info_panel(
             "Batch Builder Features",
-            "• Build Lmod module files in /apps/Modules/modulefiles/\n• Use the latest version if no version specified\n• Handle sudo permissions automatically\n• Preserve Python environment for MCP dependencies"
+            "• Build Lmod module files in /apps/Modules/modulefiles/\n• Use the latest version if no version specified\n• Handle sudo permissions automatically, elevating once per batch\n• Preserve Python environment for MCP dependencies"
         )
         console.print(info_panel)
         return 0
 
+    builder = CVMFSModuleBuilder(live_scan=live_scan or None)
+    if workers is None:
+        workers = default_workers()
+    if not builder.can_write_modules() and os.geteuid() != 0:
+        return rerun_with_sudo(tools, live_scan, workers)
+
     console.clear()
     print_banner()
     print_header("Batch Module Builder", f"Building modules for {len(tools)} tools")
-    
-    # Create tools table
-    from rich.table import Table
-    tools_table = Table(
-        title="[header]Tools to Build[/header]",
-        box="rounded", 
-        border_style="border",
-        header_style="table.header"
-    )
-    tools_table.add_column("#", style="muted", width=4)
-    tools_table.add_column("Tool", style="tool")
-    tools_table.add_column("Status", style="muted")
-    
-    for i, tool in enumerate(tools, 1):
-        tools_table.add_row(str(i), tool, "Pending")
-    
-    console.print(tools_table)
     print_rule()
 
-    # Find shelley-bio executable
-    shelley_bio_path = Path(__file__).parent.parent.parent / "bin" / "shelley-bio"
-    if not shelley_bio_path.exists():
-        error_panel = ShelleyStyle.create_error_panel(
-            "Configuration Error",
-            f"shelley-bio not found at {shelley_bio_path}",
-            "Check Shelley Bio installation"
-        )
-        console.print(error_panel)
-        return 1
+    from rich.box import ROUNDED
+    from rich.live import Live
+    from rich.table import Table
 
-    # Build modules for each tool specified
-    success_count = 0
     total_count = len(tools)
-    results = []
+    workers = max(1, min(workers, total_count))
+    status_lock = threading.Lock()
+    statuses = ["[muted]Pending[/muted]"] * total_count
+    positions = {}
+    for i, tool in enumerate(tools):
+        positions.setdefault(tool, []).append(i)
+
+    def tools_table() -> Table:
+        table = Table(
+            title=f"[header]Tools to Build[/header] [muted]({workers} workers)[/muted]",
+            box=ROUNDED, 
+            border_style="border",
+            header_style="table.header"
+        )
+        table.add_column("#", style="muted", width=4)
+        table.add_column("Tool", style="tool")
+        table.add_column("Status")
+        with status_lock:
+            for i, (tool, status) in enumerate(zip(tools, statuses), 1):
+                table.add_row(str(i), tool, status)
+        return table
+
+    def set_status(tool: str, status: str):
+        with status_lock:
+            for i in positions[tool]:
+                statuses[i] = status
+
+    def on_start(tool):
+        set_status(tool, "[info]Building...[/info]")
+
+    def on_result(tool, built, error):
+        if built is not None:
+            tool_name, version, _, build_status = built
+            set_status(tool, f"[status.success]✓ {tool_name}/{version}[/status.success] [muted]({build_status})[/muted]")
+        else:
+            set_status(tool, "[status.error]✗ Failed[/status.error]")
 
-    for i, tool in enumerate(tools, 1):
-        console.print(f"\n[header]Building {i}/{total_count}:[/header] [tool]{tool}[/tool]")
-        
-        if build_module_with_sudo(tool, shelley_bio_path):
-            success_count += 1
-            results.append((tool, True, "Success"))
+    # Build all modules in this process, refreshing the Lmod cache once at the end
+    with Live(get_renderable=tools_table, console=console, refresh_per_second=8, transient=False):
+        build_results, (cache_updated, cache_output) = builder.build_modules(
+            tools, workers=workers, on_start=on_start, on_result=on_result
+        )
+
+    results = []
+    counts = {"built": 0, "unchanged": 0, "stale": 0}
+    for tool, built, error in build_results:
+        if built is not None:
+            tool_name, version, _, build_status = built
+            counts[build_status] += 1
+            results.append((tool, True, f"{tool_name}/{version} ({build_status})"))
         else:
-            results.append((tool, False, "Failed"))
+            results.append((tool, False, str(error).splitlines()[0]))
+    success_count = sum(1 for _, success, _ in results if success)
+    counts_line = (
+        f"Built {counts['built']} new, rewrote {counts['stale']} stale, "
+        f"left {counts['unchanged']} unchanged."
+    )
 
     # Results summary
     print_rule("Build Results")
     results_table = Table(
         title="[header]Build Summary[/header]",
-        box="rounded",
+        box=ROUNDED,
         border_style="border", 
         header_style="table.header"
     )
@@ -138,26 +193,58 @@ def batch_build_modules(tools: list[str]) -> int:
     
     console.print(results_table)
 
+    if not cache_updated:
+        error_panel = ShelleyStyle.create_error_panel(
+            "Module Cache Not Updated",
+            cache_output,
+            "Fix the error and re-run the batch; unchanged modules are skipped"
+        )
+        console.print(error_panel)
+        return 1
+    print_info(cache_output)
+
     if success_count == total_count:
         success_panel = ShelleyStyle.create_info_panel(
             "All Modules Built Successfully! 🎉",
-            f"Successfully built {success_count}/{total_count} modules.\n\nNext steps:\n• [command]module avail[/command] - See available modules\n• [command]module load <tool>/<version>[/command] - Load a module"
+            f"Successfully built {success_count}/{total_count} modules.\n{counts_line}\n\nNext steps:\n• [command]module avail[/command] - See available modules\n• [command]module load <tool>/<version>[/command] - Load a module"
         )
         console.print(success_panel)
         return 0
     else:
         warning_panel = ShelleyStyle.create_warning_panel(
             "Some Modules Failed",
-            f"Successfully built {success_count}/{total_count} modules. Check errors above for failed builds."
+            f"Successfully built {success_count}/{total_count} modules. Check errors above for failed builds.\n{counts_line}"
         )
         console.print(warning_panel)
         return 1
 
 
+def parse_args(args: list[str]) -> tuple[list[str], bool, Optional[int]]:
+    """Split batch arguments into (tools, live_scan, workers)."""
+    tools = []
+    live_scan = False
+    workers = None
+    args = iter(args)
+    for arg in args:
+        if arg == "--live-scan":
+            live_scan = True
+        elif arg in ("--workers", "-j"):
+            workers = int(next(args, "1"))
+        elif arg.startswith("--workers="):
+            workers = int(arg.split("=", 1)[1])
+        else:
+            tools.append(arg)
+    return tools, live_scan, workers
+
+
 def main():
     """Entry point for the batch builder script."""
-    tools = sys.argv[1:] if len(sys.argv) > 1 else []
-    sys.exit(batch_build_modules(tools))
+    try:
+        tools, live_scan, workers = parse_args(sys.argv[1:])
+    except ValueError:
+        print_error("--workers expects a number")
+        sys.exit(2)
+    sys.exit(batch_build_modules(tools, live_scan=live_scan, workers=workers))
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 MCP Server module for bioinformatics tool discovery.
 """
 
+from .index import BioFinderIndex
 from .mcp_server import main as server_main
 
-__all__ = ["server_main"]
\ No newline at end of file
+__all__ = ["BioFinderIndex", "server_main"]
\ No newline at end of file
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Compact storage for the CVMFS container cache.
+
+The cache holds ~118k entries. Keeping each as a dict of six fields costs far
+more memory than the data itself, and two of the fields (entry_name and path)
+are derived from the others. ContainerTable stores the entries column-wise
+instead: interned tool names and tags, and typed arrays for sizes and mtimes.
+Entry dicts are only built when a row is actually read.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+# Row dicts have the same keys as the entries in galaxy_singularity_cache.json.gz:
+# entry_name, tool_name, tag, path, size_bytes, mtime
+Row = Dict[str, Any]
+
+
+class ContainerTable(Sequence):
+    """
+    Column-oriented table of container cache entries.
+
+    Behaves as a read-only sequence of entry dicts; each dict is materialised
+    on access, with entry_name and path derived from cvmfs_root, tool and tag.
+    """
+
+    def __init__(self, cvmfs_root: str):
+        self.cvmfs_root = cvmfs_root.rstrip("/")
+        self.tool_names: List[str] = []     # tool ID -> tool_name
+        self.tags: List[Optional[str]] = []  # tag ID -> tag (None for non-image entries)
+        self.tool_ids = array('I')          # row -> tool ID
+        self.tag_ids = array('I')           # row -> tag ID
+        self.sizes = array('q')             # row -> size_bytes
+        self.mtimes = array('d')            # row -> mtime
+        self._tool_lookup: Dict[str, int] = {}
+        self._tag_lookup: Dict[Optional[str], int] = {}
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Row], cvmfs_root: str) -> "ContainerTable":
+        """Build a table from container cache entry dicts."""
+        table = cls(cvmfs_root)
+        for entry in entries:
+            table.append(entry['tool_name'], entry['tag'], entry['size_bytes'], entry['mtime'])
+        return table
+
+    def append(self, tool_name: str, tag: Optional[str], size_bytes: int, mtime: float) -> int:
+        """Add an entry and return its row number."""
+        tool_id = self._tool_lookup.get(tool_name)
+        if tool_id is None:
+            tool_id = self._tool_lookup[tool_name] = len(self.tool_names)
+            self.tool_names.append(tool_name)
+
+        tag_id = self._tag_lookup.get(tag)
+        if tag_id is None:
+            tag_id = self._tag_lookup[tag] = len(self.tags)
+            self.tags.append(tag)
+
+        self.tool_ids.append(tool_id)
+        self.tag_ids.append(tag_id)
+        self.sizes.append(int(size_bytes or 0))
+        self.mtimes.append(float(mtime or 0.0))
+        return len(self.tool_ids) - 1
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The lookup dicts are only needed while appending
+        state = dict(self.__dict__)
+        state['_tool_lookup'] = None
+        state['_tag_lookup'] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._tool_lookup = {name: i for i, name in enumerate(self.tool_names)}
+        self._tag_lookup = {tag: i for i, tag in enumerate(self.tags)}
+
+    def __len__(self) -> int:
+        return len(self.tool_ids)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return ContainerList(self, array('I', range(*row.indices(len(self)))))
+        return self.row(row)
+
+    def tool_name(self, row: int) -> str:
+        return self.tool_names[self.tool_ids[row]]
+
+    def tag(self, row: int) -> Optional[str]:
+        return self.tags[self.tag_ids[row]]
+
+    def entry_name(self, row: int) -> str:
+        tag = self.tag(row)
+        tool_name = self.tool_name(row)
+        return tool_name if tag is None else f"{tool_name}:{tag}"
+
+    def path(self, row: int) -> str:
+        return f"{self.cvmfs_root}/{self.entry_name(row)}"
+
+    def row(self, row: int) -> Row:
+        """Materialise one entry as a dict."""
+        if row < 0:
+            row += len(self)
+        tool_name = self.tool_names[self.tool_ids[row]]
+        tag = self.tags[self.tag_ids[row]]
+        entry_name = tool_name if tag is None else f"{tool_name}:{tag}"
+        return {
+            'entry_name': entry_name,
+            'tool_name': tool_name,
+            'tag': tag,
+            'path': f"{self.cvmfs_root}/{entry_name}",
+            'size_bytes': self.sizes[row],
+            'mtime': self.mtimes[row],
+        }
+
+
+class ContainerList(Sequence):
+    """
+    An ordered selection of rows from a ContainerTable, e.g. one tool's
+    containers sorted newest-first. Indexing and iteration yield entry dicts;
+    slicing yields another ContainerList without materialising anything.
+    """
+
+    __slots__ = ('table', 'rows')
+
+    def __init__(self, table: ContainerTable, rows: array):
+        self.table = table
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return ContainerList(self.table, self.rows[index])
+        return self.table.row(self.rows[index])
+
+    def __iter__(self) -> Iterator[Row]:
+        row = self.table.row
+        for r in self.rows:
+            yield row(r)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ContainerList):
+            return self.table is other.table and self.rows == other.rows
+        return list(self) == other
+
+    def __repr__(self) -> str:
+        return f"ContainerList({len(self)} containers)"
+
+    def __getstate__(self):
+        return (self.table, self.rows)
+
+    def __setstate__(self, state):
+        self.table, self.rows = state
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Shelley Bio Daemon
+
+Long-lived server mode that keeps one loaded BioFinderIndex and answers tool
+calls over a per-user Unix domain socket, so one-shot CLI commands do not have
+to start a new server process each time.
+
+The protocol is newline-delimited JSON, one request per line, mirroring the
+JSON-RPC messages the MCP stdio transport uses:
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "call_tool",
+        "params": {"name": "find_tool", "arguments": {"tool_name": "fastqc"}}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", ...}]}}
+
+Other methods are "ping" and "shutdown".
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp.types import CallToolResult, TextContent
+
+log = logging.getLogger("shelley-bio")
+
+# Tool responses (e.g. every snakemake version) can exceed asyncio's 64 KiB
+# default line limit.
+STREAM_LIMIT = 16 * 1024 * 1024
+
+ToolHandler = Callable[[str, Dict[str, Any]], Awaitable[List[TextContent]]]
+
+
+def socket_path() -> Path:
+    """
+    Per-user daemon socket path.
+
+    Uses SHELLEY_BIO_SOCKET if set, otherwise $XDG_RUNTIME_DIR/shelley-bio.sock,
+    falling back to a private directory under the system temp dir.
+    """
+    if os.environ.get("SHELLEY_BIO_SOCKET"):
+        return Path(os.environ["SHELLEY_BIO_SOCKET"])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "shelley-bio.sock"
+    return Path(tempfile.gettempdir()) / f"shelley-bio-{os.getuid()}" / "shelley-bio.sock"
+
+
+def log_path() -> Path:
+    """Log file used by a daemon started in the background."""
+    return socket_path().with_suffix(".log")
+
+
+def _prepare_socket_dir(path: Path):
+    """Create the socket directory, refusing one owned by another user."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if path.parent.stat().st_uid != os.getuid():
+        raise PermissionError(f"Socket directory {path.parent} is owned by another user")
+
+
+async def _handle_request(request: Dict[str, Any], handler: ToolHandler) -> Dict[str, Any]:
+    """Dispatch one request and build its response."""
+    method = request.get("method")
+    params = request.get("params") or {}
+
+    if method == "call_tool":
+        contents = await handler(params["name"], params.get("arguments") or {})
+        return {"content": [content.model_dump() for content in contents]}
+    if method == "ping":
+        return {"pid": os.getpid()}
+    raise ValueError(f"Unknown method: {method}")
+
+
+async def serve_daemon(handler: ToolHandler, path: Optional[Path] = None):
+    """
+    Serve tool calls on a Unix domain socket until a shutdown request arrives.
+
+    Args:
+        handler: Coroutine called as handler(tool_name, arguments)
+        path: Socket path (defaults to socket_path())
+    """
+    path = path or socket_path()
+    _prepare_socket_dir(path)
+
+    if path.exists():
+        if await ping(path) is not None:
+            raise RuntimeError(f"A shelley-bio daemon is already listening on {path}")
+        path.unlink()
+
+    stop = asyncio.Event()
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while not reader.at_eof():
+                line = await reader.readline()
+                if not line.strip():
+                    continue
+
+                response: Dict[str, Any] = {"jsonrpc": "2.0", "id": None}
+                try:
+                    request = json.loads(line)
+                    response["id"] = request.get("id")
+                    if request.get("method") == "shutdown":
+                        response["result"] = {}
+                        stop.set()
+                    else:
+                        response["result"] = await _handle_request(request, handler)
+                except Exception as e:
+                    log.exception("Daemon request failed")
+                    response["error"] = {"message": str(e)}
+
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+                if stop.is_set():
+                    # Finish this handler before the server shuts down, rather
+                    # than leaving it to be cancelled mid-read
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(on_connect, path=str(path), limit=STREAM_LIMIT)
+    os.chmod(path, 0o600)
+    log.info(f"shelley-bio daemon listening on {path} (pid {os.getpid()})")
+
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        log.info("shelley-bio daemon stopped")
+
+
+class DaemonSession:
+    """
+    Client connection to a running daemon.
+
+    Provides the call_tool() subset of mcp.ClientSession used by the CLI, so
+    the same query functions work over either transport.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+
+    async def __aenter__(self) -> "DaemonSession":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Send one request and wait for its response."""
+        self._next_id += 1
+        message = {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params or {}}
+        self._writer.write(json.dumps(message).encode() + b"\n")
+        await self._writer.drain()
+
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("shelley-bio daemon closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"].get("message", "daemon request failed"))
+        return response.get("result", {})
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> CallToolResult:
+        result = await self.request("call_tool", {"name": name, "arguments": arguments or {}})
+        return CallToolResult(content=[TextContent(**content) for content in result["content"]])
+
+
+async def connect_daemon(path: Optional[Path] = None) -> Optional[DaemonSession]:
+    """Connect to a running daemon, or return None if none is listening."""
+    path = path or socket_path()
+    if not path.exists():
+        return None
+    try:
+        reader, writer = await asyncio.open_unix_connection(str(path), limit=STREAM_LIMIT)
+    except OSError:
+        return None
+    return DaemonSession(reader, writer)
+
+
+async def ping(path: Optional[Path] = None) -> Optional[int]:
+    """Return the pid of the running daemon, or None if none is listening."""
+    session = await connect_daemon(path)
+    if session is None:
+        return None
+    async with session:
+        try:
+            return (await session.request("ping")).get("pid")
+        except (ConnectionError, RuntimeError, ValueError):
+            return None
+
+
+async def shutdown(path: Optional[Path] = None) -> bool:
+    """Ask the running daemon to stop. Returns False if none is listening."""
+    session = await connect_daemon(path)
+    if session is None:
+        return False
+    async with session:
+        await session.request("shutdown")
+    return True
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Shelley Bio Tool Executor
+
+Runs tool calls off the asyncio event loop, so one slow search does not stop
+the server from reading, cancelling or answering other requests.
+
+Three kinds of executor are supported, selected with SHELLEY_BIO_EXECUTOR or
+the server's --executor option:
+
+- "thread" (default): a thread pool sharing the loaded index. Searches hold the
+  GIL, so this keeps the server responsive rather than adding CPU parallelism.
+- "process": a process pool. Workers are forked after the index is loaded and
+  share it copy-on-write, so searches run in parallel across cores. The pool is
+  re-forked when the index is replaced.
+- "inline": run on the event loop, as before (used for in-process CLI calls).
+
+Each call can be given a timeout (SHELLEY_BIO_CALL_TIMEOUT, seconds). A call
+that has not started when it times out or is cancelled never runs; one that is
+already running in a thread finishes in the background and its result is
+discarded.
+
+SessionLimits caps how many calls one client session may have running at once
+(SHELLEY_BIO_SESSION_LIMIT), so a single busy client on a shared HTTP server
+cannot occupy the whole pool.
+"""
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Optional
+
+log = logging.getLogger("shelley-bio")
+
+EXECUTOR_KINDS = ("thread", "process", "inline")
+DEFAULT_CALL_TIMEOUT = 30.0
+DEFAULT_SESSION_LIMIT = 4
+
+
+def default_workers() -> int:
+    """Worker count from SHELLEY_BIO_WORKERS, else the CPU count capped at 4."""
+    value = os.environ.get("SHELLEY_BIO_WORKERS")
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            log.warning(f"Ignoring invalid SHELLEY_BIO_WORKERS={value!r}")
+    return min(4, os.cpu_count() or 1)
+
+
+def default_timeout() -> Optional[float]:
+    """Per-call timeout from SHELLEY_BIO_CALL_TIMEOUT (0 means no timeout)."""
+    value = os.environ.get("SHELLEY_BIO_CALL_TIMEOUT")
+    timeout = DEFAULT_CALL_TIMEOUT
+    if value:
+        try:
+            timeout = float(value)
+        except ValueError:
+            log.warning(f"Ignoring invalid SHELLEY_BIO_CALL_TIMEOUT={value!r}")
+    return timeout if timeout > 0 else None
+
+
+def default_session_limit() -> int:
+    """Per-session concurrent call limit from SHELLEY_BIO_SESSION_LIMIT (0 means no limit)."""
+    value = os.environ.get("SHELLEY_BIO_SESSION_LIMIT")
+    if not value:
+        return DEFAULT_SESSION_LIMIT
+    try:
+        return max(0, int(value))
+    except ValueError:
+        log.warning(f"Ignoring invalid SHELLEY_BIO_SESSION_LIMIT={value!r}")
+        return DEFAULT_SESSION_LIMIT
+
+
+class ToolExecutor:
+    """
+    Runs blocking tool-call functions for the async handlers.
+
+    Args:
+        kind: "thread", "process" or "inline"
+        workers: Pool size (defaults to default_workers())
+        timeout: Seconds before a call fails with TimeoutError; None for no limit
+    """
+
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None, timeout: Optional[float] = None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor '{kind}' (expected one of: {', '.join(EXECUTOR_KINDS)})")
+        self.kind = kind
+        self.workers = workers or default_workers()
+        self.timeout = timeout
+        self._pool: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> "ToolExecutor":
+        """
+        Build an executor from SHELLEY_BIO_EXECUTOR, _WORKERS and _CALL_TIMEOUT.
+
+        Invalid values are logged and replaced by the defaults.
+        """
+        kind = os.environ.get("SHELLEY_BIO_EXECUTOR") or "thread"
+        if kind not in EXECUTOR_KINDS:
+            log.warning(f"Ignoring invalid SHELLEY_BIO_EXECUTOR={kind!r} (expected one of: {', '.join(EXECUTOR_KINDS)})")
+            kind = "thread"
+        return cls(kind=kind, timeout=default_timeout())
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                # Fork where available so workers inherit the loaded index
+                # instead of each loading their own
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("fork" if "fork" in methods else None)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shelley-bio-tool")
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(*args) on the executor and return its result.
+
+        For the process executor, func and its arguments must be picklable.
+
+        Raises:
+            TimeoutError: If the call takes longer than the timeout
+        """
+        if self.kind == "inline":
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_pool(), func, *args)
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Tool call timed out after {self.timeout:g}s") from None
+
+    def reset(self):
+        """
+        Replace the process pool so new workers see the current index.
+
+        Calls already running on the old pool finish there. Thread pools share
+        the index with the server, so they are left alone.
+        """
+        if self.kind == "process" and self._pool is not None:
+            old_pool, self._pool = self._pool, None
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        """Stop the pool without waiting for running calls."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class SessionLimits:
+    """
+    Caps concurrent tool calls per client session.
+
+    Sessions are tracked weakly, so a semaphore goes away with its session.
+
+    Args:
+        limit: Calls one session may run at once; 0 for no limit
+    """
+
+    def __init__(self, limit: int = DEFAULT_SESSION_LIMIT):
+        self.limit = limit
+        self._semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    @contextlib.asynccontextmanager
+    async def hold(self, session: Any) -> AsyncIterator[None]:
+        """Wait for a free slot for session (if it has a limit) and hold it."""
+        if session is None or self.limit <= 0:
+            yield
+            return
+        semaphore = self._semaphores.get(session)
+        if semaphore is None:
+            semaphore = self._semaphores[session] = asyncio.Semaphore(self.limit)
+        async with semaphore:
+            yield
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Faceted filtering for search.
+
+FacetIndex keeps, for every value of every facet, the set of search documents
+having it as a bitset: a Python int whose bit n is set when document n (a doc
+ID as used by BioFinderIndex's search postings) has the value. Filtering is
+then one OR per requested value and one AND per facet, and facet counts for a
+result set are one AND and popcount per value, whatever the number of
+documents.
+
+Facets:
+
+- available_on: HPC systems and services listing the tool (bunya, nci-gadi,
+  nci-if89, pawsey, galaxy)
+- license: SPDX license of the tool, as in its metadata
+- has_container: "true" if a CVMFS container exists for the tool, else "false"
+
+Filters can be written into a search query as key=value words
+("alignment available_on=pawsey license=MIT"); split_facet_filters() takes
+them out.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+FACETS = ("available_on", "license", "has_container")
+
+# Metadata fields behind the available_on facet
+AVAILABILITY_FIELDS = ("bunya", "nci-gadi", "nci-if89", "pawsey", "galaxy")
+
+_FILTER_WORD = re.compile(r"^([a-z_]+)=(\S+)$", re.IGNORECASE)
+_BOOLEAN_VALUES = {"true": "true", "yes": "true", "1": "true", "false": "false", "no": "false", "0": "false"}
+
+Filters = Dict[str, List[str]]
+
+
+def bitset(doc_ids: Iterable[int]) -> int:
+    """Bitset with the bits of doc_ids set."""
+    buffer = bytearray()
+    for doc_id in doc_ids:
+        byte = doc_id >> 3
+        if byte >= len(buffer):
+            buffer.extend(bytes(byte + 1 - len(buffer)))
+        buffer[byte] |= 1 << (doc_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Set bits of a bitset (doc IDs), ascending."""
+    for byte_index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, "little")):
+        while byte:
+            low = byte & -byte
+            yield byte_index * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+def popcount(bits: int) -> int:
+    """Number of set bits (int.bit_count() needs Python 3.10)."""
+    return bin(bits).count("1")
+
+
+def split_facet_filters(query: str) -> Tuple[str, Filters]:
+    """
+    Take key=value facet filters out of a search query.
+
+    Words whose key is not a facet are left in the query. A facet given more
+    than once matches any of its values.
+
+    Returns:
+        (remaining query, {facet: [values]})
+    """
+    words = []
+    filters: Filters = {}
+    for word in query.split():
+        match = _FILTER_WORD.match(word)
+        if match and match.group(1).lower() in FACETS:
+            filters.setdefault(match.group(1).lower(), []).extend(
+                value for value in match.group(2).split(",") if value
+            )
+        else:
+            words.append(word)
+    return " ".join(words), filters
+
+
+def filters_key(filters: Optional[Filters]) -> Tuple:
+    """Hashable, order-independent form of filters, for cache keys."""
+    if not filters:
+        return ()
+    return tuple(sorted((facet, tuple(sorted(v.lower() for v in values))) for facet, values in filters.items()))
+
+
+class FacetIndex:
+    """Bitsets per facet value over search doc IDs."""
+
+    def __init__(self):
+        self.bitsets: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+
+    @classmethod
+    def build(cls, doc_values: Iterable[Dict[str, Iterable[str]]]) -> "FacetIndex":
+        """
+        Build from each document's facet values, in doc ID order.
+
+        Args:
+            doc_values: Per document, {facet: values}
+        """
+        doc_ids: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+        for doc_id, values_by_facet in enumerate(doc_values):
+            for facet, values in values_by_facet.items():
+                for value in values:
+                    doc_ids[facet].setdefault(value, []).append(doc_id)
+
+        index = cls()
+        for facet, by_value in doc_ids.items():
+            index.bitsets[facet] = {value: bitset(ids) for value, ids in by_value.items()}
+        return index
+
+    def _value_bits(self, facet: str, value: str) -> int:
+        """Bitset of one facet value, matched case-insensitively."""
+        values = self.bitsets[facet]
+        if facet == "has_container":
+            value = _BOOLEAN_VALUES.get(value.lower(), value)
+        if value in values:
+            return values[value]
+        folded = value.lower()
+        return next((bits for name, bits in values.items() if name.lower() == folded), 0)
+
+    def select(self, filters: Filters) -> int:
+        """
+        Documents matching every filtered facet (any of its values).
+
+        Raises:
+            ValueError: For an unknown facet
+        """
+        selected = -1
+        for facet, values in filters.items():
+            if facet not in self.bitsets:
+                raise ValueError(f"Unknown facet '{facet}' (expected one of: {', '.join(FACETS)})")
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self._value_bits(facet, value)
+            selected &= facet_bits
+        return selected
+
+    def counts(self, bits: int) -> Dict[str, Dict[str, int]]:
+        """Per facet, the number of documents in bits having each value (most first, zeros left out)."""
+        counts = {}
+        for facet, values in self.bitsets.items():
+            facet_counts = ((value, popcount(bits & value_bits)) for value, value_bits in values.items())
+            counts[facet] = dict(sorted(
+                ((value, count) for value, count in facet_counts if count),
+                key=lambda item: (-item[1], item[0]),
+            ))
+        return counts
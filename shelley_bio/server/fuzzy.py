@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant tool name lookup.
+
+TrigramIndex maps every character trigram of every known tool name (metadata
+aliases and container tool names) to the names containing it. A misspelled
+query is split into trigrams the same way, candidate names are counted from the
+posting lists of the query's trigrams only, and ranked by trigram similarity
+(as in PostgreSQL's pg_trgm), so suggestions never scan the full name list.
+"""
+
+import heapq
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Names and queries are padded so that leading and trailing characters get
+# trigrams of their own: "bwa" -> "  b", " bw", "bwa", "wa "
+_PAD_START = "  "
+_PAD_END = " "
+
+# Minimum similarity for a suggestion (pg_trgm's default threshold)
+DEFAULT_MIN_SIMILARITY = 0.3
+
+
+def trigrams(text: str) -> Set[str]:
+    """Set of character trigrams of a lowercased, padded name."""
+    padded = f"{_PAD_START}{text.lower()}{_PAD_END}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from character trigrams to tool names."""
+
+    def __init__(self):
+        self.names: List[str] = []                 # name ID -> name as shown to users
+        self.trigram_counts = array('H')           # name ID -> number of distinct trigrams
+        self.postings: Dict[str, array] = {}       # trigram -> name IDs
+
+    @classmethod
+    def build(cls, names: Iterable[str]) -> "TrigramIndex":
+        """
+        Index names, keeping the first spelling of names that differ only in
+        case or '-', '_' and ' '.
+        """
+        index = cls()
+        seen: Set[str] = set()
+        for name in names:
+            if not name:
+                continue
+            key = name.lower().replace('_', '-').replace(' ', '-')
+            if key in seen:
+                continue
+            seen.add(key)
+
+            name_id = len(index.names)
+            name_trigrams = trigrams(key)
+            index.names.append(name)
+            index.trigram_counts.append(len(name_trigrams))
+            for trigram in name_trigrams:
+                postings = index.postings.get(trigram)
+                if postings is None:
+                    postings = index.postings[trigram] = array('I')
+                postings.append(name_id)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def suggest(self, query: str, limit: int = 5,
+                min_similarity: float = DEFAULT_MIN_SIMILARITY) -> List[Tuple[str, float]]:
+        """
+        Names most similar to query.
+
+        Similarity is |shared trigrams| / |trigrams in either|. Ties are broken by
+        closeness in length, then alphabetically.
+
+        Returns:
+            Up to limit (name, similarity) pairs, best first
+        """
+        query_trigrams = trigrams(query.strip().replace('_', '-'))
+        if not query_trigrams or limit <= 0:
+            return []
+
+        shared: Counter = Counter()
+        for trigram in query_trigrams:
+            postings = self.postings.get(trigram)
+            if postings is not None:
+                shared.update(postings)
+
+        query_count = len(query_trigrams)
+        query_length = len(query)
+        counts = self.trigram_counts
+        scored = []
+        for name_id, overlap in shared.items():
+            similarity = overlap / (query_count + counts[name_id] - overlap)
+            if similarity >= min_similarity:
+                name = self.names[name_id]
+                scored.append((-similarity, abs(len(name) - query_length), name))
+
+        return [(name, -negative) for negative, _, name in heapq.nsmallest(limit, scored)]
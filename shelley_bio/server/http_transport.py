@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Shelley Bio HTTP Transport
+
+Serves the MCP server over MCP streamable HTTP, so any number of AI assistants
+and other MCP clients on a machine can share one loaded BioFinderIndex instead
+of each starting a stdio server with its own copy.
+
+    python3 shelley_bio/server/mcp_server.py --http                 # http://127.0.0.1:8765/mcp
+    python3 shelley_bio/server/mcp_server.py --http --port 9000
+    python3 shelley_bio/server/mcp_server.py --http --http-socket /run/shelley-bio/http.sock
+
+The server binds to localhost (or a Unix socket) only; it has no
+authentication, so put a reverse proxy in front of it before exposing it more
+widely. Requires mcp>=1.8, which brings in starlette and uvicorn.
+"""
+
+import contextlib
+import logging
+from pathlib import Path
+from typing import Optional
+
+from mcp.server import Server
+
+log = logging.getLogger("shelley-bio")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MCP_PATH = "/mcp"
+
+
+def create_http_app(app: Server, stateless: bool = False):
+    """
+    Build the ASGI application serving app at MCP_PATH.
+
+    Args:
+        app: The MCP server
+        stateless: Start a fresh session for every request instead of tracking
+            sessions by their mcp-session-id header
+    """
+    try:
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.routing import Mount
+    except ImportError as e:
+        raise RuntimeError(
+            "The HTTP transport needs mcp>=1.8 (with starlette and uvicorn): "
+            "pip install 'mcp>=1.8'"
+        ) from e
+
+    session_manager = StreamableHTTPSessionManager(app=app, stateless=stateless)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with session_manager.run():
+            yield
+
+    return Starlette(
+        routes=[Mount(MCP_PATH, app=session_manager.handle_request)],
+        lifespan=lifespan,
+    )
+
+
+async def serve_http(
+    app: Server,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    uds: Optional[Path] = None,
+    stateless: bool = False,
+):
+    """
+    Serve app over streamable HTTP until interrupted.
+
+    Args:
+        app: The MCP server
+        host: Interface to bind (ignored when uds is given)
+        port: TCP port (ignored when uds is given)
+        uds: Unix domain socket path to listen on instead of TCP
+        stateless: See create_http_app()
+    """
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise RuntimeError("The HTTP transport needs uvicorn: pip install 'mcp>=1.8'") from e
+
+    http_app = create_http_app(app, stateless=stateless)
+    if uds is not None:
+        uds.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        config = uvicorn.Config(http_app, uds=str(uds), log_level="warning")
+        log.info(f"shelley-bio MCP server listening on unix:{uds} (path {MCP_PATH})")
+    else:
+        config = uvicorn.Config(http_app, host=host, port=port, log_level="warning")
+        log.info(f"shelley-bio MCP server listening on http://{host}:{port}{MCP_PATH}")
+
+    await uvicorn.Server(config).serve()
@@ -0,0 +1,885 @@
+#!/usr/bin/env python3
+"""
+Shelley Bio Index
+
+In-memory index over the tool metadata and the CVMFS Singularity container
+cache. Used by the MCP server and by the CLI.
+"""
+
+import json
+import gzip
+import os
+from array import array
+import yaml
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+import heapq
+import math
+import re
+import logging
+
+from .containers import ContainerList, ContainerTable
+from .facets import AVAILABILITY_FIELDS, FacetIndex, Filters, bitset, filters_key, iter_bits
+from .fuzzy import TrigramIndex
+from .query_cache import QueryCache, default_cache_size
+from .snapshot import check_snapshot, fingerprint_sources, foreign_owner, load_snapshot, save_snapshot
+from ..utils.constants import STOP_WORD_SET
+from ..utils.versions import TagKey, parse_tag
+
+# Data paths
+DATA_DIR = Path(__file__).resolve().parent.parent.parent
+METADATA_FILE = DATA_DIR / "toolfinder_meta.yaml"
+SINGULARITY_CACHE_FILE = DATA_DIR / "galaxy_singularity_cache.json.gz"
+
+# Compiled index snapshot, see snapshot.py. When unset, snapshot_file() reads
+# SHELLEY_BIO_INDEX at the time of use.
+SNAPSHOT_FILE: Optional[Path] = None
+
+# Use the libyaml loader when PyYAML was built with it (~7x faster)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+log = logging.getLogger("shelley-bio")
+
+
+def snapshot_file() -> Path:
+    """Snapshot path: SNAPSHOT_FILE, SHELLEY_BIO_INDEX, or the user cache directory."""
+    if SNAPSHOT_FILE is not None:
+        return SNAPSHOT_FILE
+    if os.environ.get("SHELLEY_BIO_INDEX"):
+        return Path(os.environ["SHELLEY_BIO_INDEX"])
+    cache_home = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return cache_home / "shelley-bio" / "index.pickle"
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to default."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        log.warning(f"Ignoring {name}={value!r}: not a number")
+        return default
+
+
+class BioFinderIndex:
+    """Index of container metadata and singularity images."""
+
+    # Bump whenever the structure built by _build_indexes() changes, so that
+    # snapshots written by an older version are rebuilt rather than loaded.
+    SNAPSHOT_VERSION = 15
+
+    # BM25 parameters for search_by_description
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+
+    # Weight of a container-only tool name match relative to a metadata match
+    # (0 leaves container-only tools out of search). Override with
+    # SHELLEY_BIO_CONTAINER_WEIGHT, read when the index is created.
+    CONTAINER_NAME_WEIGHT = 0.5
+
+    # Per-process settings, never written to the snapshot
+    RUNTIME_ATTRIBUTES = ("query_cache", "container_name_weight")
+
+    # Characters separating the words of a tool id ("trim_galore", "bwa-meth");
+    # a change between letters and digits also does ("gatk4")
+    ID_SEPARATORS = frozenset("-_. \n")
+
+    # Packaging prefixes stripped from container tool names before they are
+    # tokenised, so "bioconductor-deseq2" is found as "deseq2"
+    CONTAINER_FAMILY_PREFIXES = ("bioconductor-", "r-", "perl-", "ucsc-")
+    
+    def __init__(self):
+        self.metadata: List[Dict[str, Any]] = []
+        self.singularity_entries: ContainerTable = ContainerTable("")
+        self.tool_to_containers: Dict[str, List[Dict]] = defaultdict(list)
+        self.container_index: Dict[str, ContainerList] = defaultdict(list)
+        self.cache_info: Dict[str, Any] = {}
+        self.alias_index: Dict[str, int] = {}
+        self.id_positions: Dict[str, int] = {}
+        self.id_text: str = ""
+        self.id_text_offsets: List[int] = []
+        self.id_text_positions: List[int] = []
+        self.max_id_length: int = 0
+        self.search_postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.search_idf: Dict[str, float] = {}
+        self.doc_names: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.avg_doc_length: float = 0.0
+        self.container_aliases: Dict[str, str] = {}
+        self.metadata_containers: List[Optional[str]] = []
+        self.name_postings: Dict[str, array] = {}
+        self.name_idf: Dict[str, float] = {}
+        self.name_doc_offset: int = 0
+        self.avg_name_length: float = 0.0
+        self.search_vocabulary: List[str] = []
+        self.search_vocabulary_reversed: List[str] = []
+        self.search_vocabulary_text: str = ""
+        self.name_trigrams: TrigramIndex = TrigramIndex()
+        self.facets: FacetIndex = FacetIndex()
+        # Fingerprints of the data files, taken before they were parsed
+        self.source_fingerprints: Dict[str, Dict[str, Any]] = {}
+        # Results of repeated queries
+        self.query_cache: QueryCache = QueryCache(default_cache_size())
+        self.container_name_weight: float = _env_float("SHELLEY_BIO_CONTAINER_WEIGHT", self.CONTAINER_NAME_WEIGHT)
+        
+    def load_data(self, use_snapshot: bool = True):
+        """
+        Load metadata and singularity cache.
+
+        A valid compiled snapshot (see snapshot.py) is loaded directly. Otherwise
+        the raw data files are parsed, the indexes are built and a fresh
+        snapshot is written for the next start, unless running as root in
+        another user's cache directory (see foreign_owner()).
+        """
+        if use_snapshot:
+            log.info(f"Loading index snapshot from {snapshot_file()}...")
+            state = load_snapshot(snapshot_file(), self.source_files(), self.SNAPSHOT_VERSION)
+            if state is not None:
+                self.__dict__.update(state)
+                self.query_cache.clear()
+                log.info(
+                    f"Loaded {len(self.metadata)} tool metadata entries and "
+                    f"{len(self.singularity_entries)} singularity entries from snapshot"
+                )
+                return
+
+        self._load_sources()
+
+        if use_snapshot:
+            owner = foreign_owner(snapshot_file())
+            if owner is not None:
+                log.info(f"Not writing index snapshot {snapshot_file()}: running as root in a directory of uid {owner}")
+                return
+            try:
+                self.save_snapshot()
+            except OSError as e:
+                log.warning(f"Could not write index snapshot {snapshot_file()}: {e}")
+
+    def _load_sources(self):
+        """Parse the raw data files and build indexes."""
+        # Fingerprint first: a file replaced while it is parsed then no longer
+        # matches the snapshot, which is rebuilt on the next start
+        self.source_fingerprints = fingerprint_sources(self.source_files())
+
+        # Load metadata YAML
+        log.info(f"Loading metadata from {METADATA_FILE}...")
+        with open(METADATA_FILE, 'r') as f:
+            self.metadata = yaml.load(f, Loader=_YAML_LOADER)
+        log.info(f"Loaded {len(self.metadata)} tool metadata entries")
+        
+        # Load singularity cache
+        log.info(f"Loading singularity cache from {SINGULARITY_CACHE_FILE}...")
+        with gzip.open(SINGULARITY_CACHE_FILE, 'rt') as f:
+            cache_data = json.load(f)
+            self.cache_info = {
+                'generated_at': cache_data['generated_at'],
+                'cvmfs_root': cache_data['cvmfs_root'],
+                'entry_count': cache_data['entry_count']
+            }
+            self.singularity_entries = ContainerTable.from_entries(
+                cache_data['entries'], cache_data['cvmfs_root']
+            )
+        log.info(f"Loaded {len(self.singularity_entries)} singularity entries")
+        
+        # Build indexes
+        self._build_indexes()
+
+    @staticmethod
+    def source_files() -> List[Path]:
+        """Data files the index is built from."""
+        return [METADATA_FILE, SINGULARITY_CACHE_FILE]
+
+    def snapshot_status(self) -> Tuple[bool, str]:
+        """Check whether the on-disk snapshot matches the current data files."""
+        return check_snapshot(snapshot_file(), self.source_files(), self.SNAPSHOT_VERSION)
+
+    def save_snapshot(self) -> Path:
+        """Write the loaded index to the snapshot file."""
+        path = snapshot_file()
+        state = {name: value for name, value in self.__dict__.items() if name not in self.RUNTIME_ATTRIBUTES}
+        save_snapshot(path, state, self.source_fingerprints, self.SNAPSHOT_VERSION)
+        log.info(f"Wrote index snapshot to {path}")
+        return path
+        
+    def _build_indexes(self):
+        """Build search indexes."""
+        self.query_cache.clear()
+
+        # Index containers by tool name
+        table = self.singularity_entries
+        rows_by_tool: Dict[str, List[int]] = defaultdict(list)
+        for row, tool_id in enumerate(table.tool_ids):
+            rows_by_tool[table.tool_names[tool_id].lower()].append(row)
+
+        # Sort each tool's containers newest-first once, here, so version
+        # queries only slice. parse_tag() is memoised per distinct tag.
+        tags, tag_ids = table.tags, table.tag_ids
+        for tool_name, rows in rows_by_tool.items():
+            rows.sort(key=lambda row: self._parse_version(tags[tag_ids[row]]), reverse=True)
+            self.container_index[tool_name] = ContainerList(table, array('I', rows))
+
+        # Exact tool lookup: folded id/name/biotools/biocontainers alias ->
+        # position in self.metadata. The first entry wins, as in a linear scan.
+        # The aliases with their separators removed follow, as for containers.
+        self.alias_index = {}
+        aliases = [
+            (position, entry.get(field)) for position, entry in enumerate(self.metadata)
+            for field in ('id', 'name', 'biotools', 'biocontainers') if entry.get(field)
+        ]
+        for position, value in aliases:
+            self.alias_index.setdefault(self._fold_alias(value), position)
+        for position, value in aliases:
+            self.alias_index.setdefault(self._compact_alias(value), position)
+
+        # Container tool names by folded name, so a lookup matches whichever
+        # of '-' or '_' the container uses, then by name with the separators
+        # removed ("IQ-TREE" -> iqtree). Folded names are added first, so they
+        # win over a separator-free one that happens to equal them.
+        self.container_aliases = {}
+        for tool_name in self.container_index:
+            self.container_aliases.setdefault(self._fold_alias(tool_name), tool_name)
+        for tool_name in self.container_index:
+            self.container_aliases.setdefault(self._compact_alias(tool_name), tool_name)
+
+        # Metadata -> containers join: the container tool name of each entry
+        # (or None), from its biocontainers field, which is the container's
+        # actual name, then its id, name and biotools ID, then those with a
+        # packaging prefix ("goseq" -> bioconductor-goseq)
+        self.metadata_containers = []
+        for entry in self.metadata:
+            names = [entry.get(field) for field in ('biocontainers', 'id', 'name', 'biotools')]
+            names = [str(name) for name in names if name]
+            candidates = names + [
+                prefix + name for name in names[1:] for prefix in self.CONTAINER_FAMILY_PREFIXES
+            ]
+            self.metadata_containers.append(
+                next(filter(None, map(self._find_container_name, candidates)), None)
+            )
+
+        # Partial id lookup (see _find_partial_id): lowercased ids joined with
+        # newlines plus the offset where each one starts, and id -> position
+        self.id_positions = {}
+        id_parts = []
+        self.id_text_offsets = []
+        self.id_text_positions = []
+        offset = 0
+        for position, entry in enumerate(self.metadata):
+            entry_id = str(entry.get('id') or '').lower()
+            if not entry_id:
+                continue
+            self.id_positions.setdefault(entry_id, position)
+            id_parts.append(entry_id)
+            self.id_text_offsets.append(offset)
+            self.id_text_positions.append(position)
+            offset += len(entry_id) + 1
+        self.id_text = "\n".join(id_parts)
+        self.max_id_length = max((len(entry_id) for entry_id in id_parts), default=0)
+
+        # "Did you mean" suggestions: trigram index over every name a lookup
+        # can match, metadata aliases first so their spelling is kept
+        self.name_trigrams = TrigramIndex.build(
+            [entry.get(field) for entry in self.metadata
+             for field in ('id', 'name', 'biotools', 'biocontainers')
+             if isinstance(entry.get(field), str)]
+            + list(self.container_index)
+        )
+
+        # Inverted index over the searchable metadata text: expanded token ->
+        # ascending list of (doc ID, term frequency), doc IDs being positions
+        # in self.metadata. Document lengths and IDF are precomputed for BM25.
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_names = []
+        self.doc_lengths = []
+        for doc_id, entry in enumerate(self.metadata):
+            term_counts = Counter(self._iter_expanded(self._normalise(self._searchable_text(entry))))
+            for token, tf in term_counts.items():
+                postings[token].append((doc_id, tf))
+            self.doc_names.append(str(entry.get("name") or "") or str(entry.get("id") or ""))
+            self.doc_lengths.append(sum(term_counts.values()))
+        self.search_postings = dict(postings)
+
+        doc_count = len(self.doc_lengths)
+        self.avg_doc_length = sum(self.doc_lengths) / doc_count if doc_count else 0.0
+        self.search_idf = {
+            token: math.log(1 + (doc_count - len(plist) + 0.5) / (len(plist) + 0.5))
+            for token, plist in self.search_postings.items()
+        }
+
+        # Container-only tools: container tool names that no metadata alias
+        # covers, indexed by their name alone ("hmftools-sage" -> hmftools,
+        # sage, ...). They take the doc IDs after the metadata entries, with
+        # their own postings (doc IDs only; a name has each token once) and
+        # BM25 statistics, since names are far shorter than metadata text.
+        self.name_doc_offset = len(self.doc_names)
+        name_postings: Dict[str, array] = defaultdict(lambda: array('I'))
+        joined = set(self.metadata_containers)
+        for tool_name in sorted(self.container_index):
+            if tool_name in joined or self._fold_alias(tool_name) in self.alias_index:
+                continue
+            tokens = set(self._iter_expanded(self._name_tokens(tool_name)))
+            if not tokens:
+                continue
+            doc_id = len(self.doc_names)
+            for token in tokens:
+                name_postings[token].append(doc_id)
+            self.doc_names.append(tool_name)
+            self.doc_lengths.append(len(tokens))
+        self.name_postings = dict(name_postings)
+
+        name_count = len(self.doc_names) - self.name_doc_offset
+        name_lengths = self.doc_lengths[self.name_doc_offset:]
+        self.avg_name_length = sum(name_lengths) / name_count if name_count else 0.0
+        self.name_idf = {
+            token: math.log(1 + (name_count - len(ids) + 0.5) / (len(ids) + 0.5))
+            for token, ids in self.name_postings.items()
+        }
+
+        # Facet bitsets over the same doc IDs (see facets.py). Container-only
+        # tools have a container and no known license or availability.
+        doc_facets = [
+            {
+                'available_on': [field for field in AVAILABILITY_FIELDS if entry.get(field)],
+                'license': [str(entry['license'])] if entry.get('license') else [],
+                'has_container': ['true' if container_name else 'false'],
+            }
+            for entry, container_name in zip(self.metadata, self.metadata_containers)
+        ]
+        doc_facets.extend({'has_container': ['true']} for _ in range(name_count))
+        self.facets = FacetIndex.build(doc_facets)
+
+        # Wildcard search (see _expand_wildcard): the indexed tokens sorted, for
+        # "align*" by binary search; each token reversed and sorted, for
+        # "*ment"; and all tokens joined with newlines, for "*lign*"
+        self.search_vocabulary = sorted(self.search_postings.keys() | self.name_postings.keys())
+        self.search_vocabulary_reversed = sorted(token[::-1] for token in self.search_vocabulary)
+        self.search_vocabulary_text = "\n".join(self.search_vocabulary)
+            
+    @staticmethod
+    def _fold_alias(value: Any) -> str:
+        """Normalise a tool name for exact lookup: lowercase, '_' folded to '-'."""
+        return str(value).strip().lower().replace('_', '-')
+
+    @staticmethod
+    def _compact_alias(value: Any) -> str:
+        """Normalise a tool name with its separators removed: "IQ-TREE" -> "iqtree"."""
+        return re.sub(r"[-_\s]", "", str(value).lower())
+
+    def _find_container_name(self, name: str) -> Optional[str]:
+        """
+        Container tool name for a tool name: an exact (lowercased) match, else
+        one equal up to '-', '_' and ' ' ("Trim Galore" -> trim-galore), else
+        one equal once those are removed ("IQ-TREE" -> iqtree).
+        """
+        name_lower = name.strip().lower()
+        if name_lower in self.container_index:
+            return name_lower
+        return (
+            self.container_aliases.get(self._fold_alias(name_lower).replace(' ', '-'))
+            or self.container_aliases.get(self._compact_alias(name_lower))
+        )
+
+    def _find_alias(self, name: str) -> Optional[int]:
+        """Position in self.metadata of an exact alias match (see alias_index), or None."""
+        position = self.alias_index.get(self._fold_alias(name))
+        if position is None:
+            position = self.alias_index.get(self._compact_alias(name))
+        return position
+
+    def _word_boundary(self, text: str, index: int) -> bool:
+        """Whether a word of a tool id starts or ends at text[index] (see ID_SEPARATORS)."""
+        if index == 0 or index == len(text):
+            return True
+        before, after = text[index - 1], text[index]
+        return before in self.ID_SEPARATORS or after in self.ID_SEPARATORS or before.isdigit() != after.isdigit()
+
+    def _find_partial_id(self, query_lower: str) -> Optional[int]:
+        """
+        Find the first metadata entry whose id starts with the query or holds
+        it as whole words, or whose id is whole words of the query: "fastq"
+        finds fastqc, "galore" trim_galore and "gatk4" gatk, but "iqtree" does
+        not find the id "r".
+
+        Uses the structures built in _build_indexes() instead of walking every
+        entry: str.find() over all ids for "query in id", and dict lookups of
+        the query's word-aligned substrings for "id in query".
+
+        Returns:
+            Position in self.metadata, or None
+        """
+        if not query_lower or "\n" in query_lower:
+            return None
+
+        candidates = []
+        boundary = self._word_boundary
+
+        # query in id: the first occurrence in the joined ids that starts an
+        # id, or is whole words of one, is in the earliest matching entry
+        text = self.id_text
+        offset = text.find(query_lower)
+        while offset >= 0:
+            if text[offset - 1:offset] in ("", "\n") or (
+                boundary(text, offset) and boundary(text, offset + len(query_lower))
+            ):
+                candidates.append(self.id_text_positions[bisect_right(self.id_text_offsets, offset) - 1])
+                break
+            offset = text.find(query_lower, offset + 1)
+
+        # id in query, as whole words
+        length = len(query_lower)
+        max_length = min(length, self.max_id_length)
+        for start in range(length):
+            if not boundary(query_lower, start):
+                continue
+            for end in range(start + 1, min(start + max_length, length) + 1):
+                if not boundary(query_lower, end):
+                    continue
+                position = self.id_positions.get(query_lower[start:end])
+                if position is not None:
+                    candidates.append(position)
+
+        return min(candidates) if candidates else None
+
+    def _parse_version(self, tag: str) -> TagKey:
+        """Parse version from tag for sorting (see shelley_bio.utils.versions)."""
+        return parse_tag(tag)
+        
+    def search_tool(self, query: str) -> Dict[str, Any]:
+        """
+        Search for a tool and return metadata + available containers.
+        
+        Returns structured data about the tool including:
+        - Tool metadata (description, homepage, publications)
+        - Available containers with versions
+        - Most recent version
+        - Usage examples
+        """
+        query_lower = query.lower()
+        
+        # Find in metadata
+        tool_meta = None
+        position = self._find_alias(query)
+        
+        # Search for partial matches if exact match not found
+        if position is None:
+            position = self._find_partial_id(query_lower)
+        
+        if position is not None:
+            tool_meta = self.metadata[position]
+        
+        # Get containers - the container named by the query, else the one
+        # joined to its metadata entry in _build_indexes()
+        container_name = self._find_container_name(query)
+        if container_name is None and position is not None:
+            container_name = self.metadata_containers[position]
+        containers = self.container_index.get(container_name, []) if container_name else []
+        
+        # Containers are stored sorted by version (newest first)
+        containers_sorted = containers
+        
+        return {
+            'query': query,
+            'metadata': tool_meta,
+            'containers': containers_sorted,
+            'container_count': len(containers_sorted)
+        }
+
+    def _container_name_for(self, name: str) -> Optional[str]:
+        """Container tool name for a tool name or exact metadata alias (no partial matching)."""
+        container_name = self._find_container_name(name)
+        if container_name is None:
+            position = self._find_alias(name)
+            if position is not None:
+                container_name = self.metadata_containers[position]
+        return container_name
+
+    def resolve_tools(self, specs: List[str]) -> List[Dict[str, Any]]:
+        """
+        Resolve many tool names or "tool/version" specs to containers at once.
+
+        A version matches a tag exactly or as its upstream version ("1.21"
+        matches "1.21--h50ea8bc_0"); the newest match wins. Without a version
+        the newest container is used. Each distinct tool is looked up once.
+
+        Returns, per spec and in order, a dict with 'spec', 'tool', 'version'
+        (as requested, or None) and 'status':
+        - "found": 'container' is the chosen container entry
+        - "no_tool": no containers for the tool
+        - "no_version": no container with that version; 'latest' is the newest tag
+        """
+        containers_by_tool: Dict[str, Any] = {}
+        resolved = []
+        for spec in specs:
+            tool_name, _, version = spec.strip().partition("/")
+            tool_name, version = tool_name.strip(), version.strip() or None
+            result = {'spec': spec, 'tool': tool_name, 'version': version}
+            resolved.append(result)
+
+            key = tool_name.lower()
+            if key not in containers_by_tool:
+                container_name = self._container_name_for(tool_name) if tool_name else None
+                containers_by_tool[key] = self.container_index.get(container_name) if container_name else None
+            containers = containers_by_tool[key]
+            if not containers:
+                result['status'] = 'no_tool'
+                continue
+
+            if version is None:
+                result.update(status='found', container=containers[0])
+                continue
+
+            # Containers are sorted newest-first, so the first match is the newest
+            table, rows = containers.table, containers.rows
+            upstream = version + "--"
+            for i, row in enumerate(rows):
+                tag = table.tag(row)
+                if tag is not None and (tag == version or tag.startswith(upstream)):
+                    result.update(status='found', container=containers[i])
+                    break
+            else:
+                result.update(status='no_version', latest=containers[0]['tag'])
+        return resolved
+
+    def suggest_tools(self, query: str, limit: int = 5) -> List[str]:
+        """
+        Tool names similar to a query that matched nothing, best first.
+
+        Uses the trigram index, so it only looks at names sharing a trigram
+        with the query.
+        """
+        return [name for name, _ in self.name_trigrams.suggest(query, limit)]
+
+    def _normalise(self, text: str) -> List[str]:
+        text = text.lower()
+        text = re.sub(r"[^\w\s\-]", " ", text)
+        return text.split()
+
+    def _flatten_edam(self, value):
+        """Flatten EDAM fields safely."""
+        results = []
+        if not value:
+            return results
+
+        if isinstance(value, list):
+            for v in value:
+                if isinstance(v, dict):
+                    if "term" in v and v["term"]:
+                        results.append(str(v["term"]))
+                    if "formats" in v and v["formats"]:
+                        if isinstance(v["formats"], list):
+                            results.extend(map(str, v["formats"]))
+                        else:
+                            results.append(str(v["formats"]))
+                else:
+                    results.append(str(v))
+        else:
+            results.append(str(value))
+
+        return results
+
+    @staticmethod
+    def _normalise_query(query: str) -> List[str]:
+        """Like _normalise(), but keeps '*' wildcards."""
+        return re.sub(r"[^\w\s\-*]", " ", query.lower()).split()
+
+    @staticmethod
+    def _prefix_range(vocabulary: List[str], prefix: str) -> List[str]:
+        """Entries of a sorted list that start with prefix, by binary search."""
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_left(vocabulary, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        return vocabulary[start:end]
+
+    def _expand_wildcard(self, pattern: str) -> List[str]:
+        """
+        Indexed tokens matching a wildcard pattern, where '*' matches any run of
+        characters: "align*", "*ment", "*lign*", "rna*seq".
+
+        A literal prefix is looked up by binary search in search_vocabulary, and
+        a literal suffix in search_vocabulary_reversed. A pattern with neither
+        ("*lign*") falls back to str.find() over search_vocabulary_text. Patterns
+        with more than one literal part are then filtered with a regex.
+        """
+        parts = pattern.split("*")
+        prefix, suffix = parts[0], parts[-1]
+        if prefix:
+            candidates = self._prefix_range(self.search_vocabulary, prefix)
+        elif suffix:
+            candidates = [
+                token[::-1]
+                for token in self._prefix_range(self.search_vocabulary_reversed, suffix[::-1])
+            ]
+        else:
+            literal = max(parts, key=len)
+            if not literal:
+                return []
+            candidates = []
+            text = self.search_vocabulary_text
+            found = text.find(literal)
+            while found != -1:
+                start = text.rfind("\n", 0, found) + 1
+                end = text.find("\n", found)
+                if end == -1:
+                    end = len(text)
+                candidates.append(text[start:end])
+                found = text.find(literal, end)
+
+        if sum(1 for part in parts if part) > 1:
+            matcher = re.compile(".*".join(map(re.escape, parts)), re.DOTALL)
+            candidates = [token for token in candidates if matcher.fullmatch(token)]
+        return candidates
+
+    def _bm25_term(self, token: str):
+        """
+        Yield (doc ID, BM25 score) for every document containing token:
+        metadata entries, then container-only tool names, whose scores are
+        scaled by container_name_weight.
+        """
+        k1, b = self.BM25_K1, self.BM25_B
+        plist = self.search_postings.get(token)
+        if plist:
+            avg_doc_length = self.avg_doc_length or 1.0
+            idf = self.search_idf[token]
+            for doc_id, tf in plist:
+                doc_length = self.doc_lengths[doc_id]
+                yield doc_id, idf * tf * (k1 + 1) / (
+                    tf + k1 * (1 - b + b * doc_length / avg_doc_length)
+                )
+
+        weight = self.container_name_weight
+        doc_ids = self.name_postings.get(token)
+        if doc_ids and weight > 0:
+            avg_name_length = self.avg_name_length or 1.0
+            idf = weight * self.name_idf[token] * (k1 + 1)
+            for doc_id in doc_ids:
+                yield doc_id, idf / (
+                    1 + k1 * (1 - b + b * self.doc_lengths[doc_id] / avg_name_length)
+                )
+
+    def _name_tokens(self, tool_name: str) -> List[str]:
+        """Tokens of a container tool name, without its packaging prefix."""
+        name = tool_name.lower()
+        for prefix in self.CONTAINER_FAMILY_PREFIXES:
+            if name.startswith(prefix) and len(name) > len(prefix):
+                name = name[len(prefix):]
+                break
+        return self._normalise(name.replace('_', '-'))
+
+    @staticmethod
+    def _iter_expanded(tokens: List[str]):
+        """
+        Yield each token's expansions, once per occurrence of the token:
+          - Keep original token
+          - Remove hyphens (rna-seq → rnaseq)
+          - Split hyphenated terms (rna-seq → rna, seq)
+
+        Stop words (STOP_WORD_SET) are dropped after expansion, so "data" is
+        never indexed or searched but "data-driven" and "driven" still are.
+        """
+        for token in tokens:
+            if not token:
+                continue
+            expanded = {token, token.replace("-", "")}
+            if "-" in token:
+                expanded.update(part for part in token.split("-") if part)
+            yield from expanded - STOP_WORD_SET
+
+    def _expand_tokens(self, tokens: List[str]) -> set:
+        """Expand tokens to improve matching (see _iter_expanded)."""
+        return set(self._iter_expanded(tokens))
+
+    def _searchable_text(self, entry: Dict[str, Any]) -> str:
+        """Text of a metadata entry that search_by_description matches against."""
+        entry_id = str(entry.get("id") or "")
+        entry_name = str(entry.get("name") or "")
+        entry_description = str(entry.get("description") or "")
+
+        text_parts = [entry_id, entry_name, entry_description]
+
+        for field in (
+            "edam-operations",
+            "edam-topics",
+            "edam-inputs",
+            "edam-outputs",
+        ):
+            text_parts.extend(self._flatten_edam(entry.get(field)))
+
+        return " ".join(text_parts)
+
+    def _parse_query(self, query: str) -> Tuple[set, List[str]]:
+        """
+        Split a search query into its expanded, stop-word-free token set and
+        its distinct wildcard patterns (in query order).
+        """
+        terms = self._normalise_query(query)
+        words = [term for term in terms if "*" not in term]
+        patterns = list(dict.fromkeys(term for term in terms if "*" in term and term.strip("*")))
+        return self._expand_tokens(words), patterns
+
+    def canonical_query(self, query: str) -> Tuple[str, ...]:
+        """
+        Canonical form of a search query, for cache keys: its sorted expanded
+        tokens and wildcard patterns. Queries differing only in case,
+        punctuation, word order, repeats or stop words ("Quality control?",
+        "control the quality") share a form and always rank the same.
+        """
+        tokens, patterns = self._parse_query(query)
+        return tuple(sorted(tokens.union(patterns)))
+
+    def _search_metadata(
+        self, query: str, limit: Optional[int] = None, filters: Optional[Filters] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Search tool metadata using BM25-ranked token matching.
+
+        HOW IT WORKS
+        ------------
+        1. The query is normalised (lowercased, cleaned with _normalise(), split into tokens).
+        2. Tokens are expanded with _expand_tokens() to improve matching:
+             - Keep original token
+             - Remove hyphens (rna-seq → rnaseq)
+             - Split hyphenated terms (rna-seq → rna, seq)
+             - Drop stop words (STOP_WORD_SET: "the", "use", "data", ...)
+            
+        3. Each tools searchable text is built from:
+             - id, name, description
+             - edam-operations, edam-topics, edam-inputs, edam-outputs
+           (EDAM fields are flattened to plain strings.)
+           This text is tokenised and expanded the same way once, in
+           _build_indexes(), into the inverted index self.search_postings,
+           along with document lengths and IDF for every token.
+           Container tool names with no metadata entry are indexed by name
+           alone (self.name_postings) and ranked alongside, their scores
+           scaled by container_name_weight.
+        4. A tool matches if ANY expanded query token overlaps with
+           ANY expanded metadata token. Each match is scored with BM25 over
+           the posting lists of the query tokens, and only the top `limit`
+           are selected, with a heap.
+        
+        EXAMPLE
+        -------
+        "RNA-seq alignment" -> tokens: ["rna-seq", "alignment"] + expansions ["rnaseq", "rna", "seq", "alignment"]
+        "What can I use to generate count data?" -> tokens: ["count"]
+
+        NOTES
+        -----
+        - Matching is case-insensitive.
+        - OR-based (at least one token match returns the tool); tools matching
+          more, and rarer, query tokens rank higher.
+        - Ties are broken by metadata order.
+        - Partial words (e.g. "align") do not match "alignment" unless written
+          as a wildcard: "align*", "*ment", "*lign*" (see _expand_wildcard()).
+          Each wildcard scores as its best-matching token per tool.
+        - Cost is proportional to the query's posting lists, not the corpus.
+        - filters ({facet: [values]}, see facets.py) keep only matches having
+          one of the values of every filtered facet. With filters and no
+          query words, every tool passing the filters matches, scored 0.
+
+        Returns a tuple of (results, match_count): the top `limit` matches as
+        {'name', 'score'} dicts, best first, and the number of unique matching
+        tool names.
+        """
+        best = self._match_tools(query, filters)
+        return self._rank_matches(best, limit), len(best)
+
+    def _match_tools(self, query: str, filters: Optional[Filters] = None) -> Dict[str, Tuple[float, int]]:
+        """Matching tool names -> (score, doc ID) of their best entry (see _search_metadata)."""
+        tokens, patterns = self._parse_query(query)
+
+        scores: Dict[int, float] = defaultdict(float)
+        for token in tokens:
+            for doc_id, score in self._bm25_term(token):
+                scores[doc_id] += score
+
+        # A wildcard counts once per document, with its best-scoring expansion,
+        # so "align*" does not outrank "alignment" just by matching
+        # align, aligner and alignment together
+        for pattern in patterns:
+            best_term_scores: Dict[int, float] = {}
+            for token in self._expand_wildcard(pattern):
+                for doc_id, score in self._bm25_term(token):
+                    if score > best_term_scores.get(doc_id, 0.0):
+                        best_term_scores[doc_id] = score
+            for doc_id, score in best_term_scores.items():
+                scores[doc_id] += score
+
+        if filters:
+            selected = self.facets.select(filters)
+            if tokens or patterns:
+                # One AND of the candidates' bitset, not a test per candidate
+                scores = {doc_id: scores[doc_id] for doc_id in iter_bits(selected & bitset(scores))}
+            else:
+                scores = dict.fromkeys(iter_bits(selected), 0.0)
+
+        # One result per tool name, keeping its best-scoring entry
+        best: Dict[str, Tuple[float, int]] = {}
+        for doc_id, score in scores.items():
+            tool_name = self.doc_names[doc_id]
+            if not tool_name:
+                continue
+            current = best.get(tool_name)
+            if current is None or (score, -doc_id) > (current[0], -current[1]):
+                best[tool_name] = (score, doc_id)
+        return best
+
+    @staticmethod
+    def _rank_matches(best: Dict[str, Tuple[float, int]], limit: Optional[int]) -> List[Dict[str, Any]]:
+        """The top `limit` of _match_tools() as {'name', 'score'} dicts, best first."""
+        ranked = (
+            (score, -doc_id, tool_name) for tool_name, (score, doc_id) in best.items()
+        )
+        if limit is not None and limit < len(best):
+            top = heapq.nlargest(limit, ranked)
+        else:
+            top = sorted(ranked, reverse=True)
+
+        return [{'name': tool_name, 'score': score} for score, _, tool_name in top]
+ 
+    def search_by_description(
+        self, query: str, limit: Optional[int] = 10, filters: Optional[Filters] = None
+    ) -> Dict[str, Any]:
+        """
+        Search tools by description or functionality.
+        Useful for queries like "What can I use to generate count data?"
+
+        Returns the top `limit` matches ranked by relevance (all matches if
+        limit is None), the total number of matching tools, and facet counts
+        over all of them ({facet: {value: count}}) for narrowing the search
+        with filters. Results are cached under canonical_query(query).
+
+        Raises:
+            ValueError: For a filter on an unknown facet
+        """
+        log.info(query)
+
+        def search():
+            best = self._match_tools(query, filters)
+            facet_counts = self.facets.counts(bitset(doc_id for _, doc_id in best.values()))
+            return self._rank_matches(best, limit), len(best), facet_counts
+
+        results, match_count, facet_counts = self.query_cache.get_or_compute(
+            ('search', self.canonical_query(query), limit, filters_key(filters)), search
+        )
+        return {
+            'query': query,
+            'results': results,
+            'match_count': match_count,
+            'facet_counts': facet_counts,
+        }
+    
+    def list_all_tools(self, limit: int = 10) -> List[str]:
+        """List all available tool names."""
+        tools = set()
+        
+        # From metadata
+        for entry in self.metadata:
+            if entry.get('id'):
+                tools.add(entry['id'])
+        
+        # From containers
+        for tool_name in self.container_index.keys():
+            tools.add(tool_name)
+        
+        return sorted(list(tools))[:limit]
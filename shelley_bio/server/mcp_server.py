@@ -7,23 +7,26 @@ Singularity containers, helping users find and use containerized tools.
 """
 
 import json
-import gzip
-import yaml
 import asyncio
+import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-from collections import defaultdict
-import re
+from typing import Any, Optional
 import logging
 import sys
-from difflib import get_close_matches
 
 # Add the parent directory to Python path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from shelley_bio.utils.constants import STOP_WORDS
 from shelley_bio.utils.style import console, ShelleyStyle, print_error
+from shelley_bio.server.facets import AVAILABILITY_FIELDS, FACETS, filters_key, split_facet_filters
+from shelley_bio.server.index import BioFinderIndex
+from shelley_bio.server.daemon import serve_daemon
+from shelley_bio.server.executor import (
+    EXECUTOR_KINDS, SessionLimits, ToolExecutor, default_session_limit, default_timeout
+)
+from shelley_bio.server.http_transport import DEFAULT_HOST, DEFAULT_PORT, serve_http
+from shelley_bio.server.reload import IndexReloader
 
 # MCP SDK imports
 # The MCP server exposes "tools" (callable functions) and "resources" (readable
@@ -34,11 +37,6 @@ from mcp.types import (Resource, Tool, TextContent)
 
 import mcp.server.stdio
 
-# Data paths
-DATA_DIR = Path(__file__).resolve().parent.parent.parent
-METADATA_FILE = DATA_DIR / "toolfinder_meta.yaml"
-SINGULARITY_CACHE_FILE = DATA_DIR / "galaxy_singularity_cache.json.gz"
-
 
 # Logging
 # We log to stderr only. stdout is reserved exclusively for MCP JSON-RPC
@@ -53,265 +51,34 @@ logging.basicConfig(
 
 log = logging.getLogger("shelley-bio")
 
-class BioFinderIndex:
-    """Index of container metadata and singularity images."""
-    
-    def __init__(self):
-        self.metadata: List[Dict[str, Any]] = []
-        self.singularity_entries: List[Dict[str, Any]] = []
-        self.tool_to_containers: Dict[str, List[Dict]] = defaultdict(list)
-        self.container_index: Dict[str, List[Dict]] = defaultdict(list)
-        self.cache_info: Dict[str, Any] = {}
-        
-    def load_data(self):
-        """Load metadata and singularity cache."""
-        # Load metadata YAML
-        log.info(f"Loading metadata from {METADATA_FILE}...")
-        with open(METADATA_FILE, 'r') as f:
-            self.metadata = yaml.safe_load(f)
-        log.info(f"Loaded {len(self.metadata)} tool metadata entries")
-        
-        # Load singularity cache
-        log.info(f"Loading singularity cache from {SINGULARITY_CACHE_FILE}...")
-        with gzip.open(SINGULARITY_CACHE_FILE, 'rt') as f:
-            cache_data = json.load(f)
-            self.cache_info = {
-                'generated_at': cache_data['generated_at'],
-                'cvmfs_root': cache_data['cvmfs_root'],
-                'entry_count': cache_data['entry_count']
-            }
-            self.singularity_entries = cache_data['entries']
-        log.info(f"Loaded {len(self.singularity_entries)} singularity entries")
-        
-        # Build indexes
-        self._build_indexes()
-        
-    def _build_indexes(self):
-        """Build search indexes."""
-        # Index containers by tool name
-        for entry in self.singularity_entries:
-            tool_name = entry['tool_name'].lower()
-            self.container_index[tool_name].append(entry)
-            
-    def _parse_version(self, tag: str) -> Tuple[List[int], str]:
-        """Parse version from tag for sorting."""
-        # Extract version number (e.g., "0.12.1" from "0.12.1--hdfd78af_1")
-        match = re.match(r'^(\d+(?:\.\d+)*)', tag)
-        if match:
-            version_str = match.group(1)
-            version_parts = [int(x) for x in version_str.split('.')]
-            return (version_parts, tag)
-        return ([0], tag)
-        
-    def search_tool(self, query: str) -> Dict[str, Any]:
-        """
-        Search for a tool and return metadata + available containers.
-        
-        Returns structured data about the tool including:
-        - Tool metadata (description, homepage, publications)
-        - Available containers with versions
-        - Most recent version
-        - Usage examples
-        """
-        query_lower = query.lower()
-        
-        # Find in metadata
-        tool_meta = None
-        for entry in self.metadata:
-            entry_id = entry.get('id', '') or ''
-            entry_name = entry.get('name', '') or ''
-            entry_biotools = entry.get('biotools', '') or ''
-            entry_biocontainers = entry.get('biocontainers', '') or ''
-            
-            if (entry_id.lower() == query_lower or 
-                entry_name.lower() == query_lower or
-                entry_biotools.lower() == query_lower or
-                entry_biocontainers.lower() == query_lower):
-                tool_meta = entry
-                break
-        
-        # Search for partial matches if exact match not found
-        if not tool_meta:
-            for entry in self.metadata:
-                entry_id = entry.get('id', '').lower()
-                if query_lower in entry_id or entry_id in query_lower:
-                    tool_meta = entry
-                    break
-        
-        # Get containers - try exact match first, then variations
-        containers = []
-        search_variations = [
-            query_lower,
-            query_lower.replace('-', '_'),
-            query_lower.replace('_', '-'),
-        ]
-        
-        # Add name if available
-        if tool_meta and tool_meta.get('id'):
-            search_variations.append(tool_meta['id'].lower())
-        
-        for variation in search_variations:
-            if variation in self.container_index:
-                containers = self.container_index[variation]
-                break
-        
-        # Sort containers by version (newest first)
-        if containers:
-            containers_sorted = sorted(
-                containers,
-                key=lambda x: self._parse_version(x['tag']),
-                reverse=True
-            )
-        else:
-            containers_sorted = []
-        
-        return {
-            'query': query,
-            'metadata': tool_meta,
-            'containers': containers_sorted,
-            'container_count': len(containers_sorted)
-        }
-
-    def _normalise(self, text: str) -> List[str]:
-        text = text.lower()
-        text = re.sub(r"[^\w\s\-]", " ", text)
-        return text.split()
-
-    def _flatten_edam(self, value):
-        """Flatten EDAM fields safely."""
-        results = []
-        if not value:
-            return results
-
-        if isinstance(value, list):
-            for v in value:
-                if isinstance(v, dict):
-                    if "term" in v and v["term"]:
-                        results.append(str(v["term"]))
-                    if "formats" in v and v["formats"]:
-                        if isinstance(v["formats"], list):
-                            results.extend(map(str, v["formats"]))
-                        else:
-                            results.append(str(v["formats"]))
-                else:
-                    results.append(str(v))
-        else:
-            results.append(str(value))
-
-        return results
-
-    def _search_metadata(self, query: str) -> List[str]:
-        """
-        Search tool metadata using token-based OR matching.
-
-        HOW IT WORKS
-        ------------
-        1. The query is normalised (lowercased, cleaned with _normalise(), split into tokens).
-        2. Tokens are expanded to improve matching:
-             - Keep original token
-             - Remove hyphens (rna-seq → rnaseq)
-             - Split hyphenated terms (rna-seq → rna, seq)
-            
-        3. Each tools searchable text is built from:
-             - id, name, description
-             - edam-operations, edam-topics, edam-inputs, edam-outputs
-           (EDAM fields are flattened to plain strings.)
-        4. A tool matches if ANY expanded query token overlaps with
-           ANY expanded metadata token.
-        
-        EXAMPLE
-        -------
-        "RNA-seq alignment" -> tokens: ["rna-seq", "alignment"] + expansions ["rnaseq", "rna", "seq", "alignment"]
-
-        NOTES
-        -----
-        - Matching is case-insensitive.
-        - OR-based (at least one token match returns the tool).
-        - No ranking or fuzzy matching.
-        - Partial substrings (e.g. "align") do not match "alignment".
-
-        Returns a list of unique matching tool names.
-        """
-        class SearchResults(list):
-            def __contains__(self, item):
-                if isinstance(item, list):
-                    return all(list.__contains__(self, token) for token in item)
-                return list.__contains__(self, item)
-
-        def expand_tokens(tokens):
-            expanded = set()
-            for token in tokens:
-                if not token:
-                    continue
-                expanded.add(token)
-                compact = token.replace("-", "")
-                expanded.add(compact)
-                if "-" in token:
-                    expanded.update(part for part in token.split("-") if part)
-            return expanded
-
-        query_tokens = expand_tokens(self._normalise(query))
-        results = SearchResults()
-        seen = set()
-
-        for entry in self.metadata:
-            entry_id = str(entry.get("id") or "")
-            entry_name = str(entry.get("name") or "")
-            entry_description = str(entry.get("description") or "")
-
-            text_parts = [entry_id, entry_name, entry_description]
-
-            for field in (
-                "edam-operations",
-                "edam-topics",
-                "edam-inputs",
-                "edam-outputs",
-            ):
-                text_parts.extend(self._flatten_edam(entry.get(field)))
-
-            searchable_tokens = expand_tokens(self._normalise(" ".join(text_parts)))
-
-            if not searchable_tokens:
-                continue
-
-            # Token intersection instead of substring matching
-            overlap = query_tokens.intersection(searchable_tokens)
-
-            if overlap:
-                tool_name = entry_name or entry_id
-                if tool_name and tool_name not in seen:
-                    results.append(tool_name)
-                    seen.add(tool_name)
-
-        return results
- 
-    def search_by_description(self, query: str) -> List[str]:
-        """
-        Search tools by description or functionality.
-        Useful for queries like "What can I use to generate count data?"
-        """
-        log.info(query)
-        return self._search_metadata(query)
-    
-    def list_all_tools(self, limit: int = 10) -> List[str]:
-        """List all available tool names."""
-        tools = set()
-        
-        # From metadata
-        for entry in self.metadata:
-            if entry.get('id'):
-                tools.add(entry['id'])
-        
-        # From containers
-        for tool_name in self.container_index.keys():
-            tools.add(tool_name)
-        
-        return sorted(list(tools))[:limit]
-
 
-# Initialize the index
+# Initialize the index. Handlers read this global once per call, so
+# install_index() can replace it while the server is running.
 index = BioFinderIndex()
 
+
+# Most tools one find_tools_batch call may resolve
+MAX_BATCH_TOOLS = 500
+
+
+# Runs tool calls off the event loop; configured in main()
+executor = ToolExecutor.from_env()
+session_limits = SessionLimits(default_session_limit())
+
+
+def install_index(new_index: BioFinderIndex):
+    """Replace the index served by the handlers (used by hot reload)."""
+    global index
+    index = new_index
+    executor.reset()
+
+
+def configure_executor(kind: str, workers: Optional[int] = None, timeout: Optional[float] = None):
+    """Replace the tool executor (e.g. "inline" for in-process CLI calls)."""
+    global executor
+    executor.shutdown()
+    executor = ToolExecutor(kind, workers, timeout)
+
 # Create MCP server
 app = Server("shelley-bio")
 
@@ -331,6 +98,12 @@ async def list_resources() -> list[Resource]:
             name="Tool metadata",
             mimeType="text/plain",
             description="Bio.tools metadata from https://github.com/AustralianBioCommons/finder-service-metadata/blob/main/data/data.yaml"
+        ),
+        Resource(
+            uri="shelley-bio://query-cache",
+            name="Query cache statistics",
+            mimeType="application/json",
+            description="Hits, misses and size of the server's query result cache"
         )
     ]
 
@@ -338,11 +111,14 @@ async def list_resources() -> list[Resource]:
 @app.read_resource()
 async def read_resource(uri: str) -> str:
     """Read resource content."""
+    idx = index
     if uri == "shelley-bio://cvmfs-galaxy-containers":
-        return json.dumps(index.cache_info, indent=2)
+        return json.dumps(idx.cache_info, indent=2)
     elif uri == "shelley-bio://metadata":
-        tools = index.list_all_tools(limit=999999)
+        tools = idx.list_all_tools(limit=999999)
         return "\n".join(tools)
+    elif uri == "shelley-bio://query-cache":
+        return json.dumps(idx.query_cache.stats(), indent=2)
     else:
         raise ValueError(f"Unknown resource: {uri}")
 
@@ -374,7 +150,10 @@ async def list_tools() -> list[Tool]:
             description=(
                 "Search for tools by their function or description. "
                 "Use this when the user asks 'What can I use to do X?' or describes a task. "
-                "Examples: 'count data', 'quality control', 'alignment', 'assembly'."
+                "Examples: 'count data', 'quality control', 'alignment', 'assembly'. "
+                "Words match whole words; use '*' for partial words, e.g. 'align*'. "
+                "Results come with counts per facet value; narrow a search with the facet "
+                "arguments, or key=value words in the description (e.g. 'alignment available_on=pawsey')."
             ),
             inputSchema={
                 "type": "object",
@@ -387,6 +166,20 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Maximum number of results to return",
                         "default": 10
+                    },
+                    "available_on": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(AVAILABILITY_FIELDS)},
+                        "description": "Only tools available on any of these systems"
+                    },
+                    "license": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Only tools under any of these licenses (e.g. MIT, GPL-3.0)"
+                    },
+                    "has_container": {
+                        "type": "boolean",
+                        "description": "Only tools with (true) or without (false) a CVMFS container"
                     }
                 },
                 "required": ["description"]
@@ -409,6 +202,30 @@ async def list_tools() -> list[Tool]:
                 "required": ["tool_name"]
             }
         ),
+        Tool(
+            name="find_tools_batch",
+            description=(
+                "Find the containers for many tools in one call. "
+                "Use this instead of repeated find_tool calls when the user lists several tools, "
+                "e.g. for a pipeline. Returns a table of the chosen version, size and CVMFS path "
+                "of each tool, and the tools or versions that were not found."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "tools": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "maxItems": MAX_BATCH_TOOLS,
+                        "description": (
+                            "Tool names, optionally with a version as tool/version "
+                            "(e.g. 'fastqc', 'samtools/1.21'); the latest version is used if none is given"
+                        )
+                    }
+                },
+                "required": ["tools"]
+            }
+        ),
         Tool(
             name="list_available_tools",
             description=(
@@ -433,129 +250,261 @@ async def list_tools() -> list[Tool]:
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """
-    Handle tool calls based on the tool name and arguments. 
+    Handle tool calls based on the tool name and arguments.
 
-    Piece together responses based on available metadata and container information, formatted for user readability.
+    The work runs on the tool executor, off the event loop, with at most
+    session_limits.limit calls running at once per client session.
     """
+    async with session_limits.hold(_current_session()):
+        if executor.kind == "process":
+            return await executor.run(_run_tool_in_worker, name, arguments)
+        # Use one index for the whole call, even if a reload swaps in a new one
+        return await executor.run(run_tool, index, name, arguments)
+
+
+def _current_session():
+    """The MCP session of the request being handled, or None outside MCP (daemon, in-process)."""
+    try:
+        return app.request_context.session
+    except LookupError:
+        return None
+
+
+def _run_tool_in_worker(name: str, arguments: Any) -> list[TextContent]:
+    """Process pool entry point: run a tool call against the worker's index."""
+    if not index.metadata:
+        # Only needed where workers are spawned rather than forked
+        index.load_data()
+    return run_tool(index, name, arguments)
+
+
+def _did_you_mean(idx: BioFinderIndex, tool_name: str) -> str:
+    """Suggestion line for a lookup that found nothing, or "" if nothing is close."""
+    suggestions = idx.suggest_tools(tool_name)
+    if not suggestions:
+        return ""
+    return f"\n\nDid you mean: {', '.join(suggestions)}?"
+
+
+def _format_find_tool(idx: BioFinderIndex, tool_name: str) -> str:
+    """Response text for find_tool."""
+    result = idx.search_tool(tool_name)
+
+    # Format response
+    response_parts = []
+
+    # Tool information
+    if result['metadata']:
+        meta = result['metadata']
+        response_parts.append(f"\n{'='*70}\n")
+        response_parts.append(f"🧬 {meta.get('name', tool_name.upper())}\n")
+        response_parts.append(f"{'='*70}\n\n")
+
+        if meta.get('description'):
+            response_parts.append(f"📝 Description:\n")
+            response_parts.append(f"   {meta['description']}\n\n")  
+
+        if meta.get('homepage'):
+            response_parts.append(f"🌐 Homepage: {meta['homepage']}\n")
+
+        # Operations
+        if meta.get('edam-operations'):
+            response_parts.append(f"⚙️  Operations: {', '.join(meta['edam-operations'])}\n")
+    else:
+        response_parts.append(f"\n{'='*70}\n")
+        response_parts.append(f"🧬 {tool_name.upper()}\n")
+        response_parts.append(f"{'='*70}\n\n")
+        response_parts.append("ℹ️  No metadata available for this tool\n")
+
+    # Container information
+    if result['containers']:
+        response_parts.append(f"\n{'─'*70}\n")
+        response_parts.append(f"📦 AVAILABLE CONTAINERS ({result['container_count']} versions)\n")
+        response_parts.append(f"{'─'*70}\n\n")
+
+        # Most recent version
+        latest = result['containers'][0]
+        response_parts.append(f"✨ Most Recent Version: {latest['tag']}\n\n")
+        response_parts.append(f"   Path: {latest['path']}\n")
+        response_parts.append(f"   Size: {latest['size_bytes'] / (1024**2):.1f} MB\n\n")
+
+        # Usage example
+        response_parts.append(f"{'─'*70}\n")
+        response_parts.append(f"💡 USAGE EXAMPLES\n")
+        response_parts.append(f"{'─'*70}\n\n")
+        response_parts.append(f"# Execute a command in the container\n")
+        response_parts.append(f"singularity exec {latest['path']} \\\n")
+        response_parts.append(f"  {tool_name} --help\n\n")
+        response_parts.append(f"# Run interactively\n")
+        response_parts.append(f"singularity shell {latest['path']}\n")
+
+        # Show all versions
+        if len(result['containers']) > 1:
+            response_parts.append(f"\n{'─'*70}\n")
+            response_parts.append(f"📚 OTHER VERSIONS\n")
+            response_parts.append(f"{'─'*70}\n\n")
+            for i, container in enumerate(result['containers'][:3], 1):  # Show top 3
+                response_parts.append(
+                    f"  {i:2}. {container['tag']}\n"
+                    f"      {container['path']}\n"
+                )
+            if len(result['containers']) > 3:
+                response_parts.append(f"   ... and {len(result['containers']) - 3} more versions\n")
+    else:
+        response_parts.append(f"\n⚠️  WARNING: No containers found in CVMFS for this tool\n")
+        response_parts.append(f"   The tool may be available through other means or under a different name.\n")
+        if not result['metadata']:
+            response_parts.append(_did_you_mean(idx, tool_name))
+
+    response_parts.append(f"\n{'='*70}\n")
+    return "".join(response_parts)
+
+
+def _format_search_listing(idx: BioFinderIndex, description: str, limit: int, filters) -> Optional[str]:
+    """Ranked list and facet counts for search_by_function, below its heading; None if nothing matched."""
+    result = idx.search_by_description(description, limit, filters)
+    results = result['results']
+    if not results:
+        return None
+
+    response_parts = []
+    if result['match_count'] > len(results):
+        response_parts.append(
+            f"Found {result['match_count']} matching tools, showing the top {len(results)} by relevance.\n"
+        )
+    else:
+        response_parts.append(f"Found {result['match_count']} matching tools.\n")
+    
+    for i, match in enumerate(results, 1):
+        response_parts.append(f"{i:2}. {match['name']}\n")
+
+    # Counts of all matches per facet value, top 5, so the client can narrow the search
+    response_parts.append("\nRefine with facet=value (matching tools):\n")
+    for facet, counts in result['facet_counts'].items():
+        if counts:
+            shown = ", ".join(f"{value} ({count})" for value, count in list(counts.items())[:5])
+            more = f", +{len(counts) - 5} more" if len(counts) > 5 else ""
+            response_parts.append(f"   {facet}: {shown}{more}\n")
+    return "".join(response_parts)
+
+
+def _search_filters(arguments: Any):
+    """The search query and facet filters of a search_by_function call."""
+    description, filters = split_facet_filters(arguments["description"])
+    for facet in FACETS:
+        value = arguments.get(facet)
+        if value is None:
+            continue
+        for item in value if isinstance(value, list) else [value]:
+            filters.setdefault(facet, []).append(str(item).lower() if isinstance(item, bool) else str(item))
+    return description, filters
+
+
+def _format_container_versions(idx: BioFinderIndex, tool_name: str) -> str:
+    """Response text for get_container_versions."""
+    result = idx.search_tool(tool_name)
+    
+    if not result['containers']:
+        return f"No containers found for '{tool_name}'" + _did_you_mean(idx, tool_name)
     
+    response_parts = [f"# Container Versions for {tool_name}\n\n"]
+    response_parts.append(f"Total versions: {len(result['containers'])}\n\n")
+    
+    for container in result['containers']:
+        response_parts.append(f"## Version {container['tag']}\n")
+        response_parts.append(f"- Path: `{container['path']}`\n")
+        response_parts.append(f"- Size: {container['size_bytes'] / (10242):.1f} MB\n")
+        response_parts.append(f"- Modified: {datetime.fromtimestamp(container['mtime']).strftime('%Y-%m-%d')}\n\n")
+    return "".join(response_parts)
+
+
+def _format_tools_batch(idx: BioFinderIndex, specs: list[str]) -> str:
+    """Response text for find_tools_batch: one table row per found tool, then the misses."""
+    resolved = idx.resolve_tools(specs)
+    found = [result for result in resolved if result['status'] == 'found']
+    missing = [result for result in resolved if result['status'] != 'found']
+
+    response_parts = [f"# Containers for {len(resolved)} tools ({len(found)} found, {len(missing)} missing)\n\n"]
+    if found:
+        response_parts.append("| Tool | Version | Size | Path |\n|---|---|---|---|\n")
+        for result in found:
+            container = result['container']
+            response_parts.append(
+                f"| {result['tool']} | {container['tag']} | "
+                f"{container['size_bytes'] / (1024**2):.1f} MB | {container['path']} |\n"
+            )
+
+    if missing:
+        response_parts.append("\nNot found:\n")
+        for result in missing:
+            if result['status'] == 'no_version':
+                response_parts.append(
+                    f"- {result['spec']}: no version {result['version']} (latest is {result['latest']})\n"
+                )
+            else:
+                suggestions = idx.suggest_tools(result['tool'], limit=3)
+                hint = f" (did you mean: {', '.join(suggestions)}?)" if suggestions else ""
+                response_parts.append(f"- {result['spec']}: no containers{hint}\n")
+    return "".join(response_parts)
+
+
+def run_tool(idx: BioFinderIndex, name: str, arguments: Any) -> list[TextContent]:
+    """
+    Run a tool call against an index. Blocking; called through the executor.
+
+    Piece together responses based on available metadata and container information, formatted for user readability.
+
+    Response text is cached in idx.query_cache. Search listings are keyed by
+    the canonical query, so rephrasings of a search share one entry; only the
+    heading echoing the caller's wording is rebuilt on a hit.
+    """
+    cache = idx.query_cache
+
     if name == "find_tool":
         tool_name = arguments["tool_name"]
-        result = index.search_tool(tool_name)
-        
-        # Format response
-        response_parts = []
-        
-        # Tool information
-        if result['metadata']:
-            meta = result['metadata']
-            response_parts.append(f"\n{'='*70}\n")
-            response_parts.append(f"🧬 {meta.get('name', tool_name.upper())}\n")
-            response_parts.append(f"{'='*70}\n\n")
-
-            if meta.get('description'):
-                response_parts.append(f"📝 Description:\n")
-                response_parts.append(f"   {meta['description']}\n\n")  
-            
-            if meta.get('homepage'):
-                response_parts.append(f"🌐 Homepage: {meta['homepage']}\n")
-            
-            # Operations
-            if meta.get('edam-operations'):
-                response_parts.append(f"⚙️  Operations: {', '.join(meta['edam-operations'])}\n")
-        else:
-            response_parts.append(f"\n{'='*70}\n")
-            response_parts.append(f"🧬 {tool_name.upper()}\n")
-            response_parts.append(f"{'='*70}\n\n")
-            response_parts.append("ℹ️  No metadata available for this tool\n")
-        
-        # Container information
-        if result['containers']:
-            response_parts.append(f"\n{'─'*70}\n")
-            response_parts.append(f"📦 AVAILABLE CONTAINERS ({result['container_count']} versions)\n")
-            response_parts.append(f"{'─'*70}\n\n")
-            
-            # Most recent version
-            latest = result['containers'][0]
-            response_parts.append(f"✨ Most Recent Version: {latest['tag']}\n\n")
-            response_parts.append(f"   Path: {latest['path']}\n")
-            response_parts.append(f"   Size: {latest['size_bytes'] / (1024**2):.1f} MB\n\n")
-            
-            # Usage example
-            response_parts.append(f"{'─'*70}\n")
-            response_parts.append(f"💡 USAGE EXAMPLES\n")
-            response_parts.append(f"{'─'*70}\n\n")
-            response_parts.append(f"# Execute a command in the container\n")
-            response_parts.append(f"singularity exec {latest['path']} \\\n")
-            response_parts.append(f"  {tool_name} --help\n\n")
-            response_parts.append(f"# Run interactively\n")
-            response_parts.append(f"singularity shell {latest['path']}\n")
-            
-            # Show all versions
-            if len(result['containers']) > 1:
-                response_parts.append(f"\n{'─'*70}\n")
-                response_parts.append(f"📚 OTHER VERSIONS\n")
-                response_parts.append(f"{'─'*70}\n\n")
-                for i, container in enumerate(result['containers'][:3], 1):  # Show top 3
-                    response_parts.append(
-                        f"  {i:2}. {container['tag']}\n"
-                        f"      {container['path']}\n"
-                    )
-                if len(result['containers']) > 3:
-                    response_parts.append(f"   ... and {len(result['containers']) - 3} more versions\n")
-        else:
-            response_parts.append(f"\n⚠️  WARNING: No containers found in CVMFS for this tool\n")
-            response_parts.append(f"   The tool may be available through other means or under a different name.\n")
-        
-        response_parts.append(f"\n{'='*70}\n")
-        return [TextContent(type="text", text="".join(response_parts))]
+        text = cache.get_or_compute(
+            ('response', name, tool_name), lambda: _format_find_tool(idx, tool_name)
+        )
+        return [TextContent(type="text", text=text)]
     
     elif name == "search_by_function":
         description = arguments["description"]
         limit = arguments.get("limit", 10)
+        if not isinstance(limit, int) or limit < 1:
+            limit = 10
+        query, filters = _search_filters(arguments)
         
-        results = index.search_by_description(description)
-        
-        if not results:
+        listing = cache.get_or_compute(
+            ('response', name, idx.canonical_query(query), limit, filters_key(filters)),
+            lambda: _format_search_listing(idx, query, limit, filters),
+        )
+        if listing is None:
             return [TextContent(
                 type="text",
                 text=f"No tools found matching '{description}'. Try different keywords or browse available tools."
             )]
         
-        response_parts = []
-        response_parts.append(f"\n{'='*70}\n")
-        response_parts.append(f"🔎 TOOLS MATCHING: {description}\n")
-        response_parts.append(f"{'='*70}\n\n")
-        response_parts.append(f"Found {len(results)} matching tools.\n")
-        
-        for i, tool_name in enumerate(results, 1):
-            response_parts.append(f"{i:2}. {tool_name}\n")
-        
-        return [TextContent(type="text", text="".join(response_parts))]
+        heading = f"\n{'='*70}\n🔎 TOOLS MATCHING: {description}\n{'='*70}\n\n"
+        return [TextContent(type="text", text=heading + listing)]
     
     elif name == "get_container_versions":
         tool_name = arguments["tool_name"]
-        result = index.search_tool(tool_name)
-        
-        if not result['containers']:
-            return [TextContent(
-                type="text",
-                text=f"No containers found for '{tool_name}'"
-            )]
-        
-        response_parts = [f"# Container Versions for {tool_name}\n\n"]
-        response_parts.append(f"Total versions: {len(result['containers'])}\n\n")
-        
-        for container in result['containers']:
-            response_parts.append(f"## Version {container['tag']}\n")
-            response_parts.append(f"- Path: `{container['path']}`\n")
-            response_parts.append(f"- Size: {container['size_bytes'] / (10242):.1f} MB\n")
-            response_parts.append(f"- Modified: {datetime.fromtimestamp(container['mtime']).strftime('%Y-%m-%d')}\n\n")
-        
-        return [TextContent(type="text", text="".join(response_parts))]
+        text = cache.get_or_compute(
+            ('response', name, tool_name), lambda: _format_container_versions(idx, tool_name)
+        )
+        return [TextContent(type="text", text=text)]
+    
+    elif name == "find_tools_batch":
+        specs = arguments["tools"]
+        if isinstance(specs, str):
+            specs = specs.replace(",", " ").split()
+        if len(specs) > MAX_BATCH_TOOLS:
+            raise ValueError(f"find_tools_batch takes at most {MAX_BATCH_TOOLS} tools, got {len(specs)}")
+        return [TextContent(type="text", text=_format_tools_batch(idx, [str(spec) for spec in specs]))]
     
     elif name == "list_available_tools":
         limit = arguments.get("limit", 50)
-        tools = index.list_all_tools(limit)
+        tools = idx.list_all_tools(limit)
         
         response = f"# Available Bioinformatics Tools ({len(tools)} shown)\n\n"
         response += "\n".join(f"- {tool}" for tool in tools)
@@ -566,21 +515,118 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         raise ValueError(f"Unknown tool: {name}")
 
 
-async def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse server command-line options."""
+    parser = argparse.ArgumentParser(description="Shelley Bio MCP server")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run as a long-lived daemon on a per-user Unix socket instead of stdio"
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Daemon socket path (default: $SHELLEY_BIO_SOCKET or $XDG_RUNTIME_DIR/shelley-bio.sock)"
+    )
+    parser.add_argument(
+        "--http",
+        action="store_true",
+        help="Serve MCP streamable HTTP (shared by many clients) instead of stdio"
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"HTTP bind address (default: {DEFAULT_HOST})"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"HTTP port (default: {DEFAULT_PORT})"
+    )
+    parser.add_argument(
+        "--http-socket",
+        type=Path,
+        default=None,
+        help="Serve HTTP on this Unix domain socket instead of a TCP port"
+    )
+    parser.add_argument(
+        "--session-limit",
+        type=int,
+        default=None,
+        help="Concurrent tool calls allowed per client session; 0 for no limit "
+             "(default: $SHELLEY_BIO_SESSION_LIMIT or 4)"
+    )
+    parser.add_argument(
+        "--executor",
+        choices=EXECUTOR_KINDS,
+        default=None,
+        help="Where tool calls run: thread pool, process pool or inline on the "
+             "event loop (default: $SHELLEY_BIO_EXECUTOR or thread)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Executor pool size (default: $SHELLEY_BIO_WORKERS or CPUs, max 4)"
+    )
+    parser.add_argument(
+        "--call-timeout",
+        type=float,
+        default=None,
+        help="Seconds before a tool call fails; 0 for no limit "
+             "(default: $SHELLEY_BIO_CALL_TIMEOUT or 30)"
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=None,
+        help="Seconds between data file checks for hot reload; 0 disables "
+             "(default: $SHELLEY_BIO_RELOAD_INTERVAL or 30)"
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
     """Run the MCP server."""
+    args = parse_args(argv)
+    
     # Load data
     #print("Initializing Shelley Bio MCP Server...")
     index.load_data()
     #print("Ready to serve requests!")
     
-    # Run server
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    if args.executor or args.workers or args.call_timeout is not None:
+        timeout = default_timeout() if args.call_timeout is None else (args.call_timeout or None)
+        configure_executor(args.executor or executor.kind, args.workers, timeout)
+    if args.session_limit is not None:
+        session_limits.limit = args.session_limit
+    
+    # Watch the data files and swap in a rebuilt index when they change
+    reloader = IndexReloader(install_index, interval=args.reload_interval)
+    reload_task = asyncio.create_task(reloader.run())
+    
+    try:
+        if args.daemon:
+            await serve_daemon(call_tool, args.socket)
+            return
+        
+        if args.http or args.http_socket:
+            await serve_http(app, args.host, args.port, args.http_socket)
+            return
+        
+        # Run server
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        reload_task.cancel()
+        executor.shutdown()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
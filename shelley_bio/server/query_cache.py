@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Shelley Bio Query Cache
+
+Bounded LRU cache for search results and rendered tool responses. Interactive
+and AI sessions repeat the same lookups constantly; a hit skips both the search
+and the formatting of its response.
+
+Each BioFinderIndex owns one cache, so a hot-reloaded index starts with an
+empty cache and stale results go away with the old index. Callers build the
+keys: BioFinderIndex.canonical_query() turns a search query into a key that
+near-identical phrasings share.
+
+The size is set with SHELLEY_BIO_QUERY_CACHE (entries; 0 disables caching).
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+log = logging.getLogger("shelley-bio")
+
+DEFAULT_QUERY_CACHE_SIZE = 512
+
+
+def default_cache_size() -> int:
+    """Cache size from SHELLEY_BIO_QUERY_CACHE (0 disables caching; not a number: the default)."""
+    value = os.environ.get("SHELLEY_BIO_QUERY_CACHE")
+    if not value:
+        return DEFAULT_QUERY_CACHE_SIZE
+    try:
+        return max(0, int(value))
+    except ValueError:
+        log.warning(f"Ignoring SHELLEY_BIO_QUERY_CACHE={value!r}: not a number")
+        return DEFAULT_QUERY_CACHE_SIZE
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with hit and miss counters.
+
+    Args:
+        maxsize: Entries kept before the least recently used is evicted;
+            0 disables caching
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, or compute, store and return it.
+
+        compute() runs outside the lock, so two threads missing on the same key
+        may both compute it; the later result is kept.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Shelley Bio Hot Reload
+
+Watches the index's data files from a running server and swaps in a freshly
+built BioFinderIndex when they change, so a long-lived stdio or daemon server
+picks up a new toolfinder_meta.yaml or container cache without restarting and
+dropping its client sessions.
+
+The files are polled with stat() (no inotify dependency, and it works on
+network filesystems). A change is only acted on once the files have stopped
+changing for one poll interval, so a file being copied into place is not read
+half-written. The replacement index is built in a worker thread while the old
+one keeps answering requests, and is then installed with a single assignment.
+Tool calls take a reference to the current index when they start, so calls
+already in flight finish against the index they started with.
+"""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from shelley_bio.server.index import BioFinderIndex
+
+log = logging.getLogger("shelley-bio")
+
+# Seconds between data file checks
+DEFAULT_RELOAD_INTERVAL = 30.0
+
+# (size, mtime_ns) per source file; None for a missing file
+Signature = Tuple[Optional[Tuple[int, int]], ...]
+
+
+def reload_interval() -> float:
+    """Poll interval from SHELLEY_BIO_RELOAD_INTERVAL (seconds; 0 disables reloading)."""
+    value = os.environ.get("SHELLEY_BIO_RELOAD_INTERVAL")
+    if not value:
+        return DEFAULT_RELOAD_INTERVAL
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        log.warning(f"Ignoring invalid SHELLEY_BIO_RELOAD_INTERVAL={value!r}")
+        return DEFAULT_RELOAD_INTERVAL
+
+
+def source_signature(sources: List[Path]) -> Signature:
+    """Cheap change detector for the data files."""
+    signature = []
+    for source in sources:
+        try:
+            stat = source.stat()
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def build_index() -> BioFinderIndex:
+    """Build a new index from the current data files (refreshing the snapshot)."""
+    new_index = BioFinderIndex()
+    new_index.load_data()
+    return new_index
+
+
+class IndexReloader:
+    """
+    Polls the data files and installs a rebuilt index when they change.
+
+    Args:
+        install: Called with the new index once it is fully built
+        interval: Seconds between checks
+        build: Builds a new index; runs in a worker thread
+    """
+
+    def __init__(
+        self,
+        install: Callable[[BioFinderIndex], None],
+        interval: Optional[float] = None,
+        build: Callable[[], BioFinderIndex] = build_index,
+    ):
+        self.install = install
+        self.interval = reload_interval() if interval is None else interval
+        self.build = build
+        self.sources = BioFinderIndex.source_files()
+        self.reload_count = 0
+        self._loaded = source_signature(self.sources)
+
+    async def check(self, pending: Optional[Signature] = None) -> Optional[Signature]:
+        """
+        Run one poll.
+
+        Args:
+            pending: Signature seen changed on the previous poll, if any
+
+        Returns:
+            The new signature if the files changed but are not settled yet
+        """
+        current = source_signature(self.sources)
+        if current == self._loaded:
+            return None
+        if current != pending or None in current:
+            # Still being written (or temporarily missing): wait for it to settle
+            return current
+
+        log.info("Data files changed; rebuilding index in the background...")
+        try:
+            new_index = await asyncio.to_thread(self.build)
+        except Exception as e:
+            log.warning(f"Index reload failed, keeping the current index: {e}")
+            return None
+        finally:
+            # Don't retry the same files in a loop if they fail to load; the
+            # next change will trigger another attempt
+            self._loaded = current
+
+        self.install(new_index)
+        self.reload_count += 1
+        log.info(
+            f"Reloaded index: {len(new_index.metadata)} tools, "
+            f"{len(new_index.singularity_entries)} containers"
+        )
+        return None
+
+    async def run(self):
+        """Poll until cancelled."""
+        if self.interval <= 0:
+            return
+        pending = None
+        while True:
+            await asyncio.sleep(self.interval)
+            pending = await self.check(pending)
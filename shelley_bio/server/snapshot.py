@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Shelley Bio Index Snapshots
+
+Reads and writes the compiled on-disk form of BioFinderIndex, so a server start
+does not have to re-parse toolfinder_meta.yaml and the gzipped container cache.
+
+A snapshot file holds two pickled objects written back to back:
+
+1. A small header recording the snapshot format, the index version and a
+   fingerprint (size, mtime, sha256) of every source data file.
+2. The index state itself (metadata, container entries and built indexes).
+
+Only the header is read to decide whether a snapshot is still valid, so a stale
+snapshot costs a stat() per source file rather than a full load.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+log = logging.getLogger("shelley-bio")
+
+# Bump when the header layout changes. Changes to the index structure itself
+# are tracked separately through BioFinderIndex.SNAPSHOT_VERSION.
+SNAPSHOT_FORMAT = 1
+
+
+def _sha256(path: Path) -> str:
+    """Return the hex sha256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(path: Path) -> Dict[str, Any]:
+    """Fingerprint a source data file for snapshot invalidation."""
+    stat = path.stat()
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _sha256(path),
+    }
+
+
+def fingerprint_sources(sources: List[Path]) -> Dict[str, Dict[str, Any]]:
+    """Fingerprint every source file, keyed by file name."""
+    return {source.name: fingerprint(source) for source in sources}
+
+
+def _source_matches(path: Path, recorded: Dict[str, Any]) -> bool:
+    """
+    Check a source file against its recorded fingerprint.
+
+    Size and mtime are compared first; the file is only hashed when they
+    differ, so a touched or re-copied but identical file keeps the snapshot.
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if stat.st_size != recorded.get('size'):
+        return False
+    if stat.st_mtime_ns == recorded.get('mtime_ns'):
+        return True
+    return _sha256(path) == recorded.get('sha256')
+
+
+def _read_header(snapshot_path: Path) -> Optional[Dict[str, Any]]:
+    """Read only the header of a snapshot file."""
+    try:
+        with open(snapshot_path, 'rb') as f:
+            header = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning(f"Ignoring unreadable index snapshot {snapshot_path}: {e}")
+        return None
+    return header if isinstance(header, dict) else None
+
+
+def foreign_owner(snapshot_path: Path) -> Optional[int]:
+    """
+    The owner of the snapshot's directory, if this process runs as root and
+    the directory belongs to another user, else None.
+
+    A build under `sudo -E` keeps the user's HOME, so a snapshot written there
+    would be root-owned and could not be replaced by the user's own runs. The
+    nearest existing ancestor counts for a directory not created yet.
+    """
+    if os.geteuid() != 0:
+        return None
+    directory = snapshot_path.parent
+    while not directory.exists() and directory != directory.parent:
+        directory = directory.parent
+    try:
+        owner = directory.stat().st_uid
+    except OSError:
+        return None
+    return owner if owner != 0 else None
+
+
+def check_snapshot(snapshot_path: Path, sources: List[Path], version: int) -> Tuple[bool, str]:
+    """
+    Check whether a snapshot is usable for the given sources.
+
+    Returns:
+        Tuple of (valid, reason)
+    """
+    header = _read_header(snapshot_path)
+    if header is None:
+        return False, "no snapshot"
+    if header.get('format') != SNAPSHOT_FORMAT or header.get('version') != version:
+        return False, "snapshot was built by a different version of shelley-bio"
+
+    recorded = header.get('sources', {})
+    for source in sources:
+        entry = recorded.get(source.name)
+        if entry is None or not _source_matches(source, entry):
+            return False, f"{source.name} has changed"
+    return True, f"up to date (built {header.get('built_at', 'unknown')})"
+
+
+def load_snapshot(snapshot_path: Path, sources: List[Path], version: int) -> Optional[Dict[str, Any]]:
+    """
+    Load the index state from a snapshot if it is still valid.
+
+    Returns:
+        The pickled index state, or None if the snapshot is missing or stale
+    """
+    valid, reason = check_snapshot(snapshot_path, sources, version)
+    if not valid:
+        log.info(f"Index snapshot not used: {reason}")
+        return None
+
+    try:
+        with open(snapshot_path, 'rb') as f:
+            pickle.load(f)  # header, already checked
+            return pickle.load(f)
+    except Exception as e:
+        log.warning(f"Failed to load index snapshot {snapshot_path}: {e}")
+        return None
+
+
+def save_snapshot(snapshot_path: Path, state: Dict[str, Any], sources: Dict[str, Dict[str, Any]],
+                  version: int):
+    """
+    Write the index state to a snapshot file.
+
+    sources are the fingerprint_sources() of the data files, taken before they
+    were parsed, so a file changed since then invalidates the snapshot. The file is written to a temporary name and renamed into place, so a
+    concurrent reader never sees a partially written snapshot.
+    """
+    from datetime import datetime, timezone
+
+    header = {
+        'format': SNAPSHOT_FORMAT,
+        'version': version,
+        'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sources': sources,
+    }
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".index-", dir=snapshot_path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, snapshot_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
@@ -21,7 +21,8 @@ from .style import (
     SHELLEY_THEME
 )
 
-from .constants import STOP_WORDS
+from .constants import STOP_WORDS, STOP_WORD_SET
+from .versions import TagKey, parse_tag, sort_tags, latest_tag
 
 __all__ = [
     'console',
@@ -38,5 +39,10 @@ __all__ = [
     'print_about',
     'BIOCOMMONS_COLORS',
     'SHELLEY_THEME',
-    'STOP_WORDS'
+    'STOP_WORDS',
+    'STOP_WORD_SET',
+    'TagKey',
+    'parse_tag',
+    'sort_tags',
+    'latest_tag'
 ]
\ No newline at end of file
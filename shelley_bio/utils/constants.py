@@ -124,4 +124,7 @@ STOP_WORDS = {
         "robust",
         "robustly",
     }
-}
\ No newline at end of file
+}
+
+# Every group above in one set, for filtering search tokens (index and query)
+STOP_WORD_SET = frozenset().union(*STOP_WORDS.values())
@@ -0,0 +1,109 @@
+"""
+Bioconda container tag parsing and version comparison.
+
+Galaxy's CVMFS Singularity images are tagged `<version>--<build_string>`, e.g.
+"0.12.1--hdfd78af_0" or "1.0rc1--py_2". parse_tag() turns a tag into a key that
+sorts in version order, so the MCP server and the module builder agree on what
+the latest version of a tool is.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Tuple
+
+# Runs of digits or letters; every other character is a separator
+_TOKEN_RE = re.compile(r"\d+|[a-z]+")
+
+# Trailing build number of a build string ("hdfd78af_1", "py_0", "0")
+_BUILD_NUMBER_RE = re.compile(r"(?:^|_)(\d+)$")
+
+# Rank of a version's phase, lowest first. Anything not listed (e.g. "post",
+# "p", "r") counts as a post-release. A version that starts with a letter
+# other than "v" ("r93", seqtk's old revision tags) has no release parts, so it
+# ranks below every numbered release.
+_PHASES = {
+    "dev": 0,
+    "a": 1, "alpha": 1,
+    "b": 2, "beta": 2,
+    "c": 3, "rc": 3, "pre": 3, "preview": 3,
+}
+_FINAL = 4
+_POST = 5
+
+
+class TagKey(NamedTuple):
+    """Sortable form of a container tag. Compares as a plain tuple."""
+    release: Tuple[Tuple[int, int], ...]  # (number, -leading zeros) per release part
+    phase: int                  # dev < alpha < beta < rc < final < post
+    phase_number: Tuple[int, ...]  # numbers after the phase marker ("rc2" -> (2,))
+    unprefixed: bool            # False for "v1.2", so "1.2--h1_0" ranks above it
+    build: int                  # build number from the build string
+    tag: str                    # full tag, as a final tiebreaker
+
+
+def split_tag(tag: str) -> Tuple[str, str]:
+    """Split a tag into (version, build_string). The build string may be empty."""
+    version, _, build_string = tag.partition("--")
+    return version, build_string
+
+
+@lru_cache(maxsize=None)
+def parse_tag(tag: str) -> TagKey:
+    """
+    Parse a container tag into a comparable key.
+
+    Memoised per distinct tag: many tags repeat across tools (e.g. "1.0--0").
+
+    Examples:
+        "0.12.1--hdfd78af_0"  -> release (0, 12, 1), final, build 0
+        "1.0rc1--py_2"        -> release (1, 0), rc 1, build 2
+        "2.7.10b--h6b7c446_1" -> release (2, 7, 10), post "b", build 1
+        "v2.1"                -> release (2, 1), final, prefixed, build 0
+        "r93--0"              -> no release, post "r" 93, build 0
+
+    (Release parts are shown as numbers; each is stored as (number, -leading
+    zeros), so a zero-padded part ranks below the plain one: "2.01" < "2.1".
+    Trailing zeros count: "1.0" > "1".)
+    """
+    tag = tag or ""
+    version, build_string = split_tag(tag)
+
+    tokens = _TOKEN_RE.findall(version.lower())
+    # Drop a "v1.2" style prefix
+    unprefixed = not (len(tokens) > 1 and tokens[0] == "v" and tokens[1].isdigit())
+    if not unprefixed:
+        tokens = tokens[1:]
+
+    release: List[Tuple[int, int]] = []
+    position = 0
+    while position < len(tokens) and tokens[position].isdigit():
+        token = tokens[position]
+        release.append((int(token), len(token.lstrip("0") or "0") - len(token)))
+        position += 1
+
+    phase = _FINAL
+    phase_number: Tuple[int, ...] = ()
+    if position < len(tokens):
+        marker = tokens[position]
+        if len(marker) == 1 and position == len(tokens) - 1:
+            # A trailing letter is a patch revision, not a pre-release:
+            # STAR 2.7.10a < 2.7.10b
+            phase, phase_number = _POST, (ord(marker),)
+        else:
+            phase = _PHASES.get(marker, _POST)
+            phase_number = tuple(int(token) for token in tokens[position + 1:] if token.isdigit())
+
+    match = _BUILD_NUMBER_RE.search(build_string)
+    build = int(match.group(1)) if match else 0
+
+    return TagKey(tuple(release), phase, phase_number, unprefixed, build, tag)
+
+
+def sort_tags(tags: Iterable[str], newest_first: bool = True) -> List[str]:
+    """Sort tags by version."""
+    return sorted(tags, key=parse_tag, reverse=newest_first)
+
+
+def latest_tag(tags: Iterable[str]) -> str:
+    """Return the newest tag. Raises ValueError if there are none."""
+    return max(tags, key=parse_tag)
@@ -0,0 +1,72 @@
+"""Shared pytest setup: import shelley_bio from this checkout and build small indexes."""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shelley_bio.builder.cvmfs_builder import CVMFSModuleBuilder  # noqa: E402
+from shelley_bio.server import index as index_module  # noqa: E402
+from shelley_bio.server.index import BioFinderIndex  # noqa: E402
+
+CVMFS_ROOT = "/cvmfs/singularity.galaxyproject.org/all"
+
+
+def container_entry(tool, tag="1.0--0"):
+    """A galaxy_singularity_cache.json.gz entry."""
+    return {"entry_name": f"{tool}:{tag}", "tool_name": tool, "tag": tag,
+            "path": f"{CVMFS_ROOT}/{tool}:{tag}", "size_bytes": 1, "mtime": 0.0}
+
+
+def write_data_files(directory, metadata, containers=()):
+    """
+    Write toolfinder_meta.yaml and galaxy_singularity_cache.json.gz.
+
+    containers are tool names (tagged "1.0--0") or (tool, tag) pairs.
+    """
+    (directory / "toolfinder_meta.yaml").write_text(yaml.safe_dump(list(metadata)))
+    entries = [container_entry(*([c] if isinstance(c, str) else c)) for c in containers]
+    cache = {"generated_at": "now", "cvmfs_root": CVMFS_ROOT, "entry_count": len(entries), "entries": entries}
+    with gzip.open(directory / "galaxy_singularity_cache.json.gz", "wt") as f:
+        json.dump(cache, f)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the index's data files and snapshot at tmp_path, with default settings."""
+    monkeypatch.setattr(index_module, "METADATA_FILE", tmp_path / "toolfinder_meta.yaml")
+    monkeypatch.setattr(index_module, "SINGULARITY_CACHE_FILE", tmp_path / "galaxy_singularity_cache.json.gz")
+    monkeypatch.setattr(index_module, "SNAPSHOT_FILE", tmp_path / "index.pickle")
+    for name in ("SHELLEY_BIO_CONTAINER_WEIGHT", "SHELLEY_BIO_QUERY_CACHE"):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def make_index(data_dir):
+    """Build a BioFinderIndex from the given metadata and containers, as the server does."""
+    def make(metadata, containers=()):
+        write_data_files(data_dir, metadata, containers)
+        index = BioFinderIndex()
+        index.load_data(use_snapshot=False)
+        return index
+    return make
+
+
+@pytest.fixture
+def module_tree(tmp_path, monkeypatch):
+    """
+    Point the module builder at a stand-in CVMFS directory (tmp_path / "cvmfs"),
+    modulefile tree (tmp_path / "modulefiles") and Lmod cache directory.
+    """
+    cvmfs = tmp_path / "cvmfs"
+    cvmfs.mkdir()
+    monkeypatch.setattr(CVMFSModuleBuilder, "CVMFS_SINGULARITY_PATH", cvmfs)
+    monkeypatch.setattr(CVMFSModuleBuilder, "LMOD_MODULES_PATH", tmp_path / "modulefiles")
+    monkeypatch.setattr(CVMFSModuleBuilder, "LMOD_CACHE_PATH", tmp_path / "cacheDir")
+    return tmp_path
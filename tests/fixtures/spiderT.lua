@@ -0,0 +1,25 @@
+-- Layout of spiderT.lua as written by Lmod 8's update_lmod_system_cache_files
+-- for one modulefile; tests compare structure, not the pV/wV values.
+timestampFn = {
+  "/apps/Modules/cacheDir/timestamp",
+}
+mrcT = {}
+mrcMpathT = {}
+spiderT = {
+  ["/apps/Modules/modulefiles"] = {
+    samtools = {
+      fileT = {
+        ["samtools/1.21--h50ea8bc_0"] = {
+          Version = "1.21--h50ea8bc_0",
+          canonical = "1.21--h50ea8bc_0",
+          fn = "/apps/Modules/modulefiles/samtools/1.21--h50ea8bc_0.lua",
+          help = "samtools 1.21",
+          mpath = "/apps/Modules/modulefiles",
+          pV = "000000001.000000021.*h.000000050.*ea.000000008.*bc.*zfinal-000000000",
+          wV = "000000001.000000021.*h.000000050.*ea.000000008.*bc.*zfinal-000000000",
+        },
+      },
+    },
+  },
+}
+mpathMapT = {}
@@ -0,0 +1,148 @@
+"""Test batch module builds: one elevation, one pass, concurrent workers."""
+
+import errno
+
+import pytest
+
+from shelley_bio.builder.cvmfs_builder import CVMFSModuleBuilder
+from shelley_bio.builder.manifest import BuildManifest
+from shelley_bio.builder.spider_cache import SpiderCache
+from shelley_bio.scripts import batch_builder
+
+TOOLS = ["samtools", "fastqc", "bwa"]
+IMAGES = ["samtools:1.22--h96c455f_0", "fastqc:0.12.1--hdfd78af_0", "bwa:0.7.17--h5bf99c6_8"]
+
+
+def add_images(module_tree, names=IMAGES):
+    for name in names:
+        (module_tree / "cvmfs" / name).touch()
+
+
+def test_batch_elevates_once(module_tree, monkeypatch):
+    commands = []
+
+    class Completed:
+        returncode = 0
+
+    monkeypatch.setattr(batch_builder.subprocess, "run", lambda cmd, check: commands.append(cmd) or Completed())
+    monkeypatch.setattr(batch_builder.os, "geteuid", lambda: 1000)
+
+    # The modulefile tree is not writable, so the whole batch re-runs under sudo
+    assert not CVMFSModuleBuilder().can_write_modules()
+    assert batch_builder.batch_build_modules(TOOLS, live_scan=True, workers=2) == 0
+    assert len(commands) == 1
+    command = commands[0]
+    assert command[:3] == ["sudo", "-E", "env"]
+    assert command[4].endswith("shelley-bio-batch")
+    assert command[5:] == TOOLS + ["--live-scan", "--workers", "2"]
+    assert not (module_tree / "modulefiles").exists()
+
+
+def test_batch_builds_in_one_pass(module_tree, monkeypatch):
+    add_images(module_tree, IMAGES[:2])
+    updates = []
+    original_update = SpiderCache.update
+    monkeypatch.setattr(SpiderCache, "update", lambda cache, modules: updates.append(list(modules))
+                        or original_update(cache, modules))
+
+    builder = CVMFSModuleBuilder(live_scan=True)
+    results, refresh = builder.build_modules(TOOLS + ["samtools/9.9"])
+    assert refresh == (True, "Updated Lmod spider cache (2 modules)")
+    assert [(spec, built is not None) for spec, built, _ in results] == [
+        ("samtools", True), ("fastqc", True), ("bwa", False), ("samtools/9.9", False),
+    ]
+    assert "not found" in str(results[2][2])
+    # The Lmod cache is updated once, with every module written
+    assert [[name for name, _, _ in modules] for modules in updates] == [["samtools", "fastqc"]]
+    assert (module_tree / "cacheDir" / "spiderT.lua").exists()
+
+
+def test_concurrent_builds_keep_order(module_tree, monkeypatch):
+    tools = [f"tool{i}" for i in range(12)]
+    add_images(module_tree, [f"{tool}:1.0--0" for tool in tools])
+    listings = []
+    original_listing = CVMFSModuleBuilder._read_cvmfs_listing
+    monkeypatch.setattr(CVMFSModuleBuilder, "_read_cvmfs_listing",
+                        lambda builder: listings.append(1) or original_listing(builder))
+
+    started, finished = [], []
+    results, _ = CVMFSModuleBuilder(live_scan=True).build_modules(
+        tools + ["missing"], workers=4, on_start=started.append,
+        on_result=lambda spec, built, error: finished.append((spec, built is not None)),
+    )
+    assert [spec for spec, _, _ in results] == tools + ["missing"]
+    assert all(built[1] == "1.0--0" for _, built, _ in results[:-1])
+    assert sorted(started) == sorted(tools + ["missing"])
+    assert sorted(finished) == sorted([(tool, True) for tool in tools] + [("missing", False)])
+    # Workers share one CVMFS listing
+    assert listings == [1]
+    assert len(list((module_tree / "modulefiles").glob("*/*.lua"))) == 12
+
+
+def test_worker_options(monkeypatch):
+    assert batch_builder.parse_args(["samtools", "-j", "4", "--live-scan", "fastqc"]) == (
+        ["samtools", "fastqc"], True, 4,
+    )
+    assert batch_builder.parse_args(["--workers=2", "bwa"]) == (["bwa"], False, 2)
+    monkeypatch.setenv("SHELLEY_BIO_BUILD_WORKERS", "0")
+    assert batch_builder.default_workers() == 1
+    monkeypatch.setenv("SHELLEY_BIO_BUILD_WORKERS", "3")
+    assert batch_builder.default_workers() == 3
+    monkeypatch.setenv("SHELLEY_BIO_BUILD_WORKERS", "lots")
+    monkeypatch.setattr(batch_builder.os, "cpu_count", lambda: 2)
+    assert batch_builder.default_workers() == 2
+
+
+def test_write_errors_do_not_stop_the_batch(module_tree, monkeypatch):
+    add_images(module_tree)
+    original_write = type(module_tree).write_text
+
+    def write_text(path, content, *args, **kwargs):
+        if path.parent.name == "fastqc":
+            raise OSError(errno.ENOSPC, "No space left on device", str(path))
+        return original_write(path, content, *args, **kwargs)
+
+    monkeypatch.setattr(type(module_tree), "write_text", write_text)
+    results, _ = CVMFSModuleBuilder(live_scan=True).build_modules(TOOLS, workers=2)
+    assert [(spec, built is not None) for spec, built, _ in results] == [
+        ("samtools", True), ("fastqc", False), ("bwa", True),
+    ]
+    assert "No space left" in str(results[1][2])
+
+    # Modules written before and after the failure are still recorded
+    spider = (module_tree / "cacheDir" / "spiderT.lua").read_text()
+    assert '["samtools/1.22--h96c455f_0"]' in spider and '["bwa/0.7.17--h5bf99c6_8"]' in spider
+    manifest = (module_tree / "modulefiles" / BuildManifest.FILE_NAME).read_text()
+    assert "bwa/0.7.17--h5bf99c6_8" in manifest and "fastqc" not in manifest
+
+
+def test_interrupted_batch_still_records_written_modules(module_tree, monkeypatch):
+    add_images(module_tree)
+    original_build = CVMFSModuleBuilder.build_module
+
+    def build_module(builder, tool_spec, *args, **kwargs):
+        if tool_spec == "bwa":
+            raise KeyboardInterrupt
+        return original_build(builder, tool_spec, *args, **kwargs)
+
+    monkeypatch.setattr(CVMFSModuleBuilder, "build_module", build_module)
+    with pytest.raises(KeyboardInterrupt):
+        CVMFSModuleBuilder(live_scan=True).build_modules(TOOLS)
+    spider = (module_tree / "cacheDir" / "spiderT.lua").read_text()
+    assert '["fastqc/0.12.1--hdfd78af_0"]' in spider
+
+
+def test_batch_fails_when_the_module_cache_is_not_updated(module_tree, monkeypatch):
+    add_images(module_tree)
+
+    def failing_update(cache, modules):
+        raise OSError(errno.EROFS, "Read-only file system", str(cache.spider_file))
+
+    monkeypatch.setattr(SpiderCache, "update", failing_update)
+    (module_tree / "modulefiles").mkdir()
+    monkeypatch.setattr(batch_builder.console, "clear", lambda: None)
+    assert batch_builder.batch_build_modules(["fastqc"], live_scan=True, workers=1) == 1
+
+    results, (updated, output) = CVMFSModuleBuilder(live_scan=True).build_modules(TOOLS)
+    assert all(built is not None for _, built, _ in results)
+    assert not updated and "Read-only file system" in output
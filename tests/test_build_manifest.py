@@ -0,0 +1,54 @@
+"""Test that repeat module builds skip unchanged modulefiles."""
+
+import json
+import time
+
+from shelley_bio.builder.cvmfs_builder import CVMFSModuleBuilder
+from shelley_bio.builder.manifest import BuildManifest
+
+from conftest import CVMFS_ROOT
+
+
+def test_repeat_builds_are_idempotent(module_tree):
+    for name in ("samtools:1.22--h96c455f_0", "fastqc:0.12.1--hdfd78af_0"):
+        (module_tree / "cvmfs" / name).touch()
+    modules_path = module_tree / "modulefiles"
+
+    def build():
+        results, _ = CVMFSModuleBuilder(live_scan=True).build_modules(["samtools", "fastqc"])
+        return {spec: built[3] for spec, built, _ in results}
+
+    assert build() == {"samtools": "built", "fastqc": "built"}
+    samtools_file = modules_path / "samtools" / "1.22--h96c455f_0.lua"
+    mtime_ns = samtools_file.stat().st_mtime_ns
+
+    manifest = json.loads((modules_path / BuildManifest.FILE_NAME).read_text())["modules"]
+    entry = manifest["samtools/1.22--h96c455f_0"]
+    assert entry["container"] == f"{CVMFS_ROOT}/samtools:1.22--h96c455f_0"
+    assert set(entry) >= {"tool", "version", "template_hash", "content_hash"}
+
+    assert build() == {"samtools": "unchanged", "fastqc": "unchanged"}
+    assert samtools_file.stat().st_mtime_ns == mtime_ns
+
+    # A hand-edited module is rewritten and reported as stale
+    fastqc_file = modules_path / "fastqc" / "0.12.1--hdfd78af_0.lua"
+    fastqc_file.write_text(fastqc_file.read_text() + "-- edited\n")
+    assert build() == {"samtools": "unchanged", "fastqc": "stale"}
+    assert "-- edited" not in fastqc_file.read_text()
+
+
+def test_concurrent_builds_share_one_manifest(module_tree, monkeypatch):
+    tools = [f"tool{i}" for i in range(16)]
+    for tool in tools:
+        (module_tree / "cvmfs" / f"{tool}:1.0--0").touch()
+    original_load = BuildManifest.load
+
+    def slow_load(manifest):
+        time.sleep(0.01)
+        original_load(manifest)
+
+    monkeypatch.setattr(BuildManifest, "load", slow_load)
+    results, _ = CVMFSModuleBuilder(live_scan=True).build_modules(tools, workers=8)
+    assert all(built is not None for _, built, _ in results)
+    manifest = json.loads((module_tree / "modulefiles" / BuildManifest.FILE_NAME).read_text())["modules"]
+    assert sorted(manifest) == sorted(f"{tool}/1.0--0" for tool in tools)
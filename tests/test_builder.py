@@ -0,0 +1,57 @@
+"""Test how the module builder resolves versions and containers."""
+
+import pytest
+
+from shelley_bio.builder.cvmfs_builder import CVMFSModuleBuilder
+
+from conftest import write_data_files
+
+SAMTOOLS_TAGS = ["1.21--h50ea8bc_0", "1.22--h96c455f_0", "1.9--h91753b0_8"]
+
+
+def add_images(module_tree, *names):
+    for name in names:
+        (module_tree / "cvmfs" / name).touch()
+
+
+def test_versions_come_from_the_index(make_index, module_tree):
+    index = make_index([], [("samtools", tag) for tag in SAMTOOLS_TAGS])
+    add_images(module_tree, "samtools:1.22--h96c455f_0", "samtools:1.21--h50ea8bc_0")
+    # An image on CVMFS but not in the index is not seen without a live scan
+    add_images(module_tree, "samtools:1.23--h96c455f_0")
+    builder = CVMFSModuleBuilder(live_scan=False, index=index)
+
+    assert builder.list_versions("samtools") == ["1.22--h96c455f_0", "1.21--h50ea8bc_0", "1.9--h91753b0_8"]
+    tool, version, module_file, status = builder.build_module("samtools")
+    assert (tool, version, status) == ("samtools", "1.22--h96c455f_0", "built")
+    assert module_file == module_tree / "modulefiles" / "samtools" / "1.22--h96c455f_0.lua"
+    assert "samtools:1.22--h96c455f_0" in module_file.read_text()
+
+    assert builder.build_module("samtools/1.21--h50ea8bc_0")[1] == "1.21--h50ea8bc_0"
+    with pytest.raises(ValueError, match="Version '1.23--h96c455f_0' not found"):
+        builder.build_module("samtools/1.23--h96c455f_0")
+    with pytest.raises(ValueError, match="Tool 'bwa' not found"):
+        builder.build_module("bwa")
+
+    assert CVMFSModuleBuilder(live_scan=True).list_versions("samtools")[0] == "1.23--h96c455f_0"
+
+
+def test_chosen_container_is_verified_on_cvmfs(make_index, module_tree):
+    index = make_index([], [("samtools", tag) for tag in SAMTOOLS_TAGS])
+    builder = CVMFSModuleBuilder(live_scan=False, index=index)
+    # In the index, but gone from CVMFS
+    with pytest.raises(ValueError, match="retry with --live-scan"):
+        builder.build_module("samtools/1.9--h91753b0_8")
+    assert not (module_tree / "modulefiles" / "samtools").exists()
+
+    (module_tree / "cvmfs").rmdir()
+    with pytest.raises(RuntimeError, match="CVMFS not available"):
+        builder.build_module("samtools")
+
+
+def test_index_is_loaded_on_first_use(data_dir, module_tree):
+    write_data_files(data_dir, [], [("fastqc", "0.12.1--hdfd78af_0")])
+    add_images(module_tree, "fastqc:0.12.1--hdfd78af_0")
+    builder = CVMFSModuleBuilder(live_scan=False)
+    assert builder.build_module("fastqc")[1] == "0.12.1--hdfd78af_0"
+    assert builder.list_versions("FastQC") == ["0.12.1--hdfd78af_0"]
@@ -0,0 +1,37 @@
+"""Test that container-only tool names are searchable."""
+
+METADATA = [
+    {"id": "fastqc", "name": "FastQC", "description": "Quality control for sequencing data"},
+    {"id": "prokka", "name": "Prokka", "description": "Annotate prokaryotic genomes with pyrodigal"},
+]
+CONTAINER_TOOLS = ["fastqc", "pyrodigal", "bioconductor-deseq2", "hmftools-sage", "perl_io_zlib"]
+
+
+def search_names(index, query):
+    return [entry["name"] for entry in index.search_by_description(query, None)["results"]]
+
+
+def test_container_only_names_are_indexed_without_family_prefix(make_index):
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    # fastqc has a metadata entry, so its container is not listed again
+    assert search_names(index, "fastqc") == ["FastQC"]
+    assert search_names(index, "bioconductor") == []
+    for query in ("hmftools", "sage", "hmftools-sage"):
+        assert search_names(index, query) == ["hmftools-sage"], query
+    assert search_names(index, "io") == search_names(index, "zlib") == ["perl_io_zlib"]
+
+
+def test_container_names_are_searched_with_metadata(make_index):
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    assert search_names(index, "deseq2") == ["bioconductor-deseq2"]
+    assert search_names(index, "sage") == ["hmftools-sage"]
+    assert search_names(index, "zlib") == ["perl_io_zlib"]
+    assert search_names(index, "quality") == ["FastQC"]
+    assert sorted(search_names(index, "pyrodigal")) == ["Prokka", "pyrodigal"]
+    assert search_names(index, "hmf*") == ["hmftools-sage"]
+
+
+def test_zero_weight_disables_container_names(make_index, monkeypatch):
+    monkeypatch.setenv("SHELLEY_BIO_CONTAINER_WEIGHT", "0")
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    assert search_names(index, "deseq2") == []
@@ -0,0 +1,57 @@
+"""Test container storage: the columnar table and per-tool lists sorted newest-first."""
+
+import pickle
+
+from shelley_bio.server.containers import ContainerList, ContainerTable
+
+from conftest import CVMFS_ROOT, container_entry
+
+SAMTOOLS_TAGS = ["1.9--h91753b0_8", "1.21--h50ea8bc_0", "1.10--h2e538c0_3", "1.21--h96c455f_1", "1.3.1--0"]
+
+
+def test_containers_are_stored_newest_first(make_index):
+    index = make_index([], [("samtools", tag) for tag in SAMTOOLS_TAGS] + ["fastqc"])
+    containers = index.search_tool("samtools")["containers"]
+    assert isinstance(containers, ContainerList)
+    assert [entry["tag"] for entry in containers] == [
+        "1.21--h96c455f_1", "1.21--h50ea8bc_0", "1.10--h2e538c0_3", "1.9--h91753b0_8", "1.3.1--0",
+    ]
+    assert containers[0]["path"] == f"{CVMFS_ROOT}/samtools:1.21--h96c455f_1"
+    assert containers[-1]["tag"] == "1.3.1--0"
+
+
+def test_slices_share_the_table(make_index):
+    index = make_index([], [("samtools", tag) for tag in SAMTOOLS_TAGS])
+    containers = index.search_tool("samtools")["containers"]
+    newest = containers[:2]
+    assert isinstance(newest, ContainerList)
+    assert newest.table is containers.table
+    assert [entry["tag"] for entry in newest] == ["1.21--h96c455f_1", "1.21--h50ea8bc_0"]
+    assert newest == list(containers)[:2]
+    assert len(containers[10:]) == 0
+
+
+def test_table_rebuilds_entries_from_columns():
+    entries = [container_entry("samtools", "1.21--h50ea8bc_0"), container_entry("fastqc", "0.12.1--hdfd78af_0"),
+               container_entry("samtools", "1.22--h96c455f_1")]
+    entries[1].update(size_bytes=2048, mtime=1700000000.5)
+    # A non-image entry (a bare directory) has no tag
+    entries.append({"entry_name": "fastqc", "tool_name": "fastqc", "tag": None,
+                    "path": f"{CVMFS_ROOT}/fastqc", "size_bytes": None, "mtime": None})
+
+    table = ContainerTable.from_entries(entries, CVMFS_ROOT + "/")
+    assert len(table) == 4
+    assert list(table[:3]) == entries[:3]
+    assert table[3] == dict(entries[3], size_bytes=0, mtime=0.0)
+    assert table[-1] == table[3]
+    assert table.path(1) == f"{CVMFS_ROOT}/fastqc:0.12.1--hdfd78af_0"
+    # Names and tags are stored once
+    assert table.tool_names == ["samtools", "fastqc"]
+    assert len(table.tags) == 4
+
+    restored = pickle.loads(pickle.dumps(table))
+    assert list(restored) == list(table)
+    # Appending after a round trip reuses the interned names
+    restored.append("samtools", "1.21--h50ea8bc_0", 1, 0.0)
+    assert restored.tool_names == ["samtools", "fastqc"]
+    assert len(restored.tags) == 4
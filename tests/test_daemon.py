@@ -0,0 +1,73 @@
+"""Test the Unix socket daemon protocol."""
+
+import asyncio
+import os
+import socket
+
+import pytest
+from mcp.types import TextContent
+
+from shelley_bio.server.daemon import connect_daemon, ping, serve_daemon, shutdown
+
+
+async def echo_handler(name, arguments):
+    if name == "fail":
+        raise KeyError("no such tool")
+    return [TextContent(type="text", text=f"{name}: {arguments}")]
+
+
+async def start_daemon(path):
+    task = asyncio.create_task(serve_daemon(echo_handler, path))
+    while await ping(path) is None:
+        assert not task.done(), task.exception()
+        await asyncio.sleep(0.01)
+    return task
+
+
+def test_requests_and_shutdown(tmp_path):
+    path = tmp_path / "d.sock"
+
+    async def run():
+        task = await start_daemon(path)
+        assert await ping(path) == os.getpid()
+        assert oct(path.stat().st_mode & 0o777) == oct(0o600)
+
+        async with await connect_daemon(path) as session:
+            result = await session.call_tool("find_tool", {"tool_name": "fastqc"})
+            assert result.content[0].text == "find_tool: {'tool_name': 'fastqc'}"
+            # Errors are returned on the same connection, which stays usable
+            with pytest.raises(RuntimeError, match="no such tool"):
+                await session.call_tool("fail")
+            with pytest.raises(RuntimeError, match="Unknown method: bogus"):
+                await session.request("bogus")
+            assert (await session.request("ping"))["pid"] == os.getpid()
+
+        # A second daemon refuses to take over a live socket
+        with pytest.raises(RuntimeError, match="already listening"):
+            await serve_daemon(echo_handler, path)
+
+        assert await shutdown(path)
+        await asyncio.wait_for(task, 5)
+        assert not path.exists()
+        assert await ping(path) is None
+        assert not await shutdown(path)
+
+    asyncio.run(run())
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    path = tmp_path / "d.sock"
+    # A socket file left behind by a daemon that was killed
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(str(path))
+    stale.close()
+    assert path.exists()
+
+    async def run():
+        assert await ping(path) is None
+        task = await start_daemon(path)
+        assert await ping(path) == os.getpid()
+        await shutdown(path)
+        await asyncio.wait_for(task, 5)
+
+    asyncio.run(run())
@@ -0,0 +1,124 @@
+"""Test the tool executor: inline, thread and process pools, timeouts and settings."""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from shelley_bio.server import executor as executor_module
+from shelley_bio.server.executor import (
+    DEFAULT_CALL_TIMEOUT, DEFAULT_SESSION_LIMIT, SessionLimits, ToolExecutor, default_session_limit,
+)
+
+
+def run(executor, func, *args):
+    return asyncio.run(executor.run(func, *args))
+
+
+def test_inline_runs_on_the_calling_thread():
+    executor = ToolExecutor("inline")
+    assert run(executor, threading.current_thread) is threading.current_thread()
+    assert executor._pool is None
+
+
+def test_thread_executor_runs_on_its_pool():
+    executor = ToolExecutor("thread", workers=2)
+    try:
+        worker = run(executor, threading.current_thread)
+        assert worker is not threading.current_thread()
+        assert worker.name.startswith("shelley-bio-tool")
+        # Thread pools share the index, so reset() keeps them
+        pool = executor._pool
+        executor.reset()
+        assert executor._pool is pool
+    finally:
+        executor.shutdown()
+
+
+def test_slow_calls_time_out():
+    executor = ToolExecutor("thread", workers=1, timeout=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(TimeoutError, match="timed out after 0.05s"):
+            run(executor, release.wait, 5)
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_reset_replaces_the_process_pool():
+    executor = ToolExecutor("process", workers=1)
+    try:
+        first = run(executor, os.getpid)
+        assert first != os.getpid()
+        old_pool = executor._pool
+        executor.reset()
+        assert executor._pool is None
+        second = run(executor, os.getpid)
+        assert executor._pool is not old_pool
+        assert second not in (first, os.getpid())
+    finally:
+        executor.shutdown()
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError, match="Unknown executor"):
+        ToolExecutor("procss")
+
+
+def test_invalid_settings_fall_back_to_defaults(monkeypatch):
+    monkeypatch.setattr(executor_module.os, "cpu_count", lambda: 2)
+    monkeypatch.setenv("SHELLEY_BIO_WORKERS", "abc")
+    monkeypatch.setenv("SHELLEY_BIO_CALL_TIMEOUT", "x")
+    monkeypatch.setenv("SHELLEY_BIO_EXECUTOR", "procss")
+    executor = ToolExecutor.from_env()
+    assert (executor.kind, executor.workers, executor.timeout) == ("thread", 2, DEFAULT_CALL_TIMEOUT)
+
+    monkeypatch.setenv("SHELLEY_BIO_WORKERS", "3")
+    monkeypatch.setenv("SHELLEY_BIO_CALL_TIMEOUT", "0")
+    monkeypatch.setenv("SHELLEY_BIO_EXECUTOR", "inline")
+    executor = ToolExecutor.from_env()
+    assert (executor.kind, executor.workers, executor.timeout) == ("inline", 3, None)
+
+
+class Session:
+    """Stand-in for an MCP session (only needs to be weakly referenceable)."""
+
+
+def peak_concurrency(limits, sessions):
+    """Run one call per entry of sessions under limits; return the most running at once per session."""
+    running, peaks = {}, {}
+
+    async def call(session):
+        async with limits.hold(session):
+            running[id(session)] = running.get(id(session), 0) + 1
+            peaks[id(session)] = max(peaks.get(id(session), 0), running[id(session)])
+            await asyncio.sleep(0.01)
+            running[id(session)] -= 1
+
+    async def main():
+        await asyncio.gather(*(call(session) for session in sessions))
+
+    asyncio.run(main())
+    return [peaks[id(session)] for session in dict.fromkeys(sessions)]
+
+
+def test_session_limit_caps_each_session():
+    first, second = Session(), Session()
+    assert peak_concurrency(SessionLimits(2), [first] * 5 + [second] * 3) == [2, 2]
+    assert peak_concurrency(SessionLimits(1), [first] * 3) == [1]
+
+
+def test_no_session_or_zero_limit_is_unbounded():
+    assert peak_concurrency(SessionLimits(2), [None] * 4) == [4]
+    assert peak_concurrency(SessionLimits(0), [Session()] * 4) == [4]
+
+
+def test_invalid_session_limit_falls_back(monkeypatch):
+    monkeypatch.setenv("SHELLEY_BIO_SESSION_LIMIT", "many")
+    assert default_session_limit() == DEFAULT_SESSION_LIMIT
+    monkeypatch.setenv("SHELLEY_BIO_SESSION_LIMIT", "-1")
+    assert default_session_limit() == 0
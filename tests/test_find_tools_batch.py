@@ -0,0 +1,75 @@
+"""Test resolving many tool specs in one call."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from shelley_bio.client import cli
+from shelley_bio.server import mcp_server
+
+from conftest import CVMFS_ROOT
+
+METADATA = [{"id": "goseq", "name": "GOseq", "description": "Gene ontology analysis"}]
+CONTAINERS = [("samtools", "1.21--h50ea8bc_0"), ("samtools", "1.22--h96c455f_1"),
+              ("samtools", "1.21--h96c455f_1"), ("bioconductor-goseq", "1.58.0--r44hdfd78af_0")]
+
+
+def test_resolve_tools(make_index):
+    index = make_index(METADATA, CONTAINERS)
+    resolved = index.resolve_tools([
+        "samtools", "samtools/1.21", "samtools/1.21--h50ea8bc_0", "GOseq", "samtools/9.9", "nosuchtool",
+    ])
+    assert [result["status"] for result in resolved] == [
+        "found", "found", "found", "found", "no_version", "no_tool",
+    ]
+    tags = [result["container"]["tag"] for result in resolved[:4]]
+    # Newest overall, newest 1.21 build, exact tag, container joined via metadata
+    assert tags == ["1.22--h96c455f_1", "1.21--h96c455f_1", "1.21--h50ea8bc_0", "1.58.0--r44hdfd78af_0"]
+    assert resolved[4]["latest"] == "1.22--h96c455f_1"
+    assert resolved[5] == {"spec": "nosuchtool", "tool": "nosuchtool", "version": None, "status": "no_tool"}
+
+
+def call(index, **arguments):
+    return mcp_server.run_tool(index, "find_tools_batch", arguments)[0].text
+
+
+def test_batch_response_lists_found_and_missing_tools(make_index):
+    index = make_index(METADATA, CONTAINERS)
+    text = call(index, tools=["samtools", "GOseq", "samtools/9.9", "smtools", "zzzzzz"])
+    assert text.startswith("# Containers for 5 tools (2 found, 3 missing)\n")
+    assert "| Tool | Version | Size | Path |" in text
+    assert f"| samtools | 1.22--h96c455f_1 | 0.0 MB | {CVMFS_ROOT}/samtools:1.22--h96c455f_1 |" in text
+    assert f"| GOseq | 1.58.0--r44hdfd78af_0 | 0.0 MB | {CVMFS_ROOT}/bioconductor-goseq:1.58.0--r44hdfd78af_0 |" in text
+    missing = text[text.index("\nNot found:\n"):].splitlines()[2:]
+    assert missing == [
+        "- samtools/9.9: no version 9.9 (latest is 1.22--h96c455f_1)",
+        "- smtools: no containers (did you mean: samtools?)",
+        "- zzzzzz: no containers",
+    ]
+
+
+def test_batch_accepts_a_string_of_tools(make_index):
+    index = make_index(METADATA, CONTAINERS)
+    assert call(index, tools="samtools, GOseq samtools/9.9") == call(index, tools=["samtools", "GOseq", "samtools/9.9"])
+
+
+def test_batch_size_is_limited(make_index, monkeypatch):
+    index = make_index(METADATA, CONTAINERS)
+    monkeypatch.setattr(mcp_server, "MAX_BATCH_TOOLS", 2)
+    assert "2 found" in call(index, tools=["samtools", "GOseq"])
+    with pytest.raises(ValueError, match="at most 2 tools, got 3"):
+        call(index, tools=["samtools", "GOseq", "bwa"])
+
+
+def test_cli_splits_specs_on_commas_and_spaces(monkeypatch):
+    calls = []
+
+    class Session:
+        async def call_tool(self, name, arguments):
+            calls.append((name, arguments))
+            return SimpleNamespace(content=[SimpleNamespace(text="# Containers")])
+
+    monkeypatch.setattr(cli.console, "print", lambda *args, **kwargs: None)
+    asyncio.run(cli.find_batch(Session(), ["fastqc,bwa", "samtools/1.21  gatk4,", "multiqc"]))
+    assert calls == [("find_tools_batch", {"tools": ["fastqc", "bwa", "samtools/1.21", "gatk4", "multiqc"]})]
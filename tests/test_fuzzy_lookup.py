@@ -0,0 +1,29 @@
+"""Test trigram "did you mean" suggestions for misspelled tool names."""
+
+from shelley_bio.server.fuzzy import TrigramIndex, trigrams
+
+NAMES = ["samtools", "SAMtools", "bcftools", "fastqc", "FastQC", "trim_galore", "Trim Galore", "snakemake", "bowtie2"]
+
+
+def test_trigrams_are_padded():
+    assert trigrams("bwa") == {"  b", " bw", "bwa", "wa "}
+
+
+def test_suggestions_are_ranked_and_deduplicated():
+    index = TrigramIndex.build(NAMES)
+    # Case and separator variants are indexed once, under their first spelling
+    assert index.names == ["samtools", "bcftools", "fastqc", "trim_galore", "snakemake", "bowtie2"]
+
+    assert [name for name, _ in index.suggest("smtools")][0] == "samtools"
+    assert [name for name, _ in index.suggest("snakmake")] == ["snakemake"]
+    assert [name for name, _ in index.suggest("trim-galore")] == ["trim_galore"]
+
+    name, similarity = index.suggest("fastqc")[0]
+    assert (name, similarity) == ("fastqc", 1.0)
+
+
+def test_unrelated_queries_get_no_suggestions():
+    index = TrigramIndex.build(NAMES)
+    assert index.suggest("zzznotatool") == []
+    assert index.suggest("") == []
+    assert index.suggest("samtools", limit=0) == []
@@ -0,0 +1,64 @@
+"""Test that a changed data file is rebuilt in the background and swapped in."""
+
+import asyncio
+import os
+
+from shelley_bio.server.index import BioFinderIndex
+from shelley_bio.server.reload import IndexReloader
+
+from conftest import write_data_files
+
+
+def write_data(directory, tool_ids):
+    metadata = [
+        {"id": tool_id, "name": tool_id, "description": f"{tool_id} does things",
+         "biotools": tool_id, "biocontainers": tool_id}
+        for tool_id in tool_ids
+    ]
+    write_data_files(directory, metadata, tool_ids)
+
+
+def test_reload_swaps_in_new_index(data_dir):
+    write_data(data_dir, ["fastqc"])
+    current = BioFinderIndex()
+    current.load_data()
+
+    installed = []
+    reloader = IndexReloader(installed.append, interval=0)
+
+    async def poll():
+        # Unchanged files: nothing to do
+        assert await reloader.check() is None
+
+        write_data(data_dir, ["fastqc", "samtools"])
+        os.utime(data_dir / "toolfinder_meta.yaml", ns=(1, 1))
+        # First sighting of the change only records it; the rebuild waits
+        # until the files have stopped changing
+        pending = await reloader.check()
+        assert pending is not None and not installed
+        assert await reloader.check(pending) is None
+
+    asyncio.run(poll())
+
+    assert len(installed) == 1
+    new_index = installed[0]
+    assert new_index is not current
+    assert new_index.search_tool("samtools")["metadata"]["id"] == "samtools"
+    # The old index is untouched, so calls that started on it can finish
+    assert current.search_tool("samtools")["metadata"] is None
+
+
+def test_failed_reload_keeps_current_index(data_dir):
+    write_data(data_dir, ["fastqc"])
+    installed = []
+    reloader = IndexReloader(installed.append, interval=0)
+
+    async def poll():
+        (data_dir / "galaxy_singularity_cache.json.gz").write_bytes(b"truncated")
+        pending = await reloader.check()
+        assert await reloader.check(pending) is None
+        # The broken files are not retried until they change again
+        assert await reloader.check() is None
+
+    asyncio.run(poll())
+    assert installed == []
@@ -0,0 +1,78 @@
+"""Test the streamable HTTP transport with real MCP client sessions."""
+
+import asyncio
+import socket
+
+import pytest
+
+uvicorn = pytest.importorskip("uvicorn")
+from mcp import ClientSession  # noqa: E402
+from mcp.client.streamable_http import streamablehttp_client  # noqa: E402
+
+from shelley_bio.server import mcp_server  # noqa: E402
+from shelley_bio.server.executor import SessionLimits, ToolExecutor  # noqa: E402
+from shelley_bio.server.http_transport import MCP_PATH, create_http_app  # noqa: E402
+
+METADATA = [{"id": "fastqc", "name": "FastQC", "description": "Quality control for sequencing data"}]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def http_server(make_index, monkeypatch):
+    """Serve mcp_server.app over HTTP for the duration of a coroutine: run(client_coroutine(url))."""
+    monkeypatch.setattr(mcp_server, "index", make_index(METADATA, ["fastqc"]))
+    monkeypatch.setattr(mcp_server, "executor", ToolExecutor("thread", workers=2))
+
+    def run(client, stateless=False):
+        port = free_port()
+        config = uvicorn.Config(create_http_app(mcp_server.app, stateless=stateless),
+                                host="127.0.0.1", port=port, log_level="warning")
+        server = uvicorn.Server(config)
+
+        async def main():
+            serving = asyncio.create_task(server.serve())
+            try:
+                while not server.started:
+                    await asyncio.sleep(0.01)
+                return await client(f"http://127.0.0.1:{port}{MCP_PATH}")
+            finally:
+                server.should_exit = True
+                await serving
+
+        try:
+            return asyncio.run(main())
+        finally:
+            mcp_server.executor.shutdown()
+    return run
+
+
+async def find_fastqc(url):
+    async with streamablehttp_client(url) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            tools = await session.list_tools()
+            result = await session.call_tool("find_tool", {"tool_name": "fastqc"})
+            return [tool.name for tool in tools.tools], result.content[0].text
+
+
+@pytest.mark.parametrize("stateless", [False, True])
+def test_clients_call_tools_over_http(http_server, stateless):
+    names, text = http_server(find_fastqc, stateless=stateless)
+    assert {"find_tool", "search_by_function", "find_tools_batch"} <= set(names)
+    assert "fastqc:1.0--0" in text
+
+
+def test_concurrent_sessions_share_the_server(http_server, monkeypatch):
+    monkeypatch.setattr(mcp_server, "session_limits", SessionLimits(1))
+
+    async def clients(url):
+        return await asyncio.gather(*(find_fastqc(url) for _ in range(4)))
+
+    results = http_server(clients)
+    assert len(results) == 4
+    assert all("fastqc:1.0--0" in text for _, text in results)
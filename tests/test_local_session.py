@@ -0,0 +1,36 @@
+"""Test running CLI tool calls in-process."""
+
+import asyncio
+
+from shelley_bio.client.local import LocalSession
+from shelley_bio.server import mcp_server
+from shelley_bio.server.index import BioFinderIndex
+
+from conftest import write_data_files
+
+
+def test_calls_run_against_a_lazily_loaded_index(data_dir, monkeypatch):
+    write_data_files(data_dir, [{"id": "fastqc", "name": "FastQC", "description": "Quality control"}], ["fastqc"])
+    monkeypatch.setattr(mcp_server, "index", BioFinderIndex())
+    monkeypatch.setattr(mcp_server, "executor", mcp_server.executor)
+    loads = []
+    original_load = BioFinderIndex.load_data
+    monkeypatch.setattr(BioFinderIndex, "load_data", lambda index: loads.append(1) or original_load(index))
+
+    async def run():
+        async with LocalSession() as session:
+            assert mcp_server.executor.kind == "inline"
+            result = await session.call_tool("find_tool", {"tool_name": "fastqc"})
+            text = result.content[0].text
+            assert "FastQC" in text
+            assert "/cvmfs/singularity.galaxyproject.org/all/fastqc:1.0--0" in text
+            # Same formatting as the server handler
+            assert text == mcp_server.run_tool(mcp_server.index, "find_tool", {"tool_name": "fastqc"})[0].text
+
+        async with LocalSession() as session:
+            await session.call_tool("search_by_function", {"description": "quality"})
+        # The index is loaded once per process
+        assert loads == [1]
+
+    asyncio.run(run())
+    assert (data_dir / "index.pickle").exists()
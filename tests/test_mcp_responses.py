@@ -0,0 +1,14 @@
+"""Test tool responses of the MCP server."""
+
+from shelley_bio.server import mcp_server
+
+
+def call(index, name, **arguments):
+    return mcp_server.run_tool(index, name, arguments)[0].text
+
+
+def test_lookups_that_find_nothing_suggest_names(make_index):
+    index = make_index([{"id": "snakemake", "name": "Snakemake", "description": "Workflows"}], ["samtools"])
+    assert "Did you mean: snakemake?" in call(index, "find_tool", tool_name="snakmake")
+    assert "Did you mean: samtools?" in call(index, "get_container_versions", tool_name="smtools")
+    assert "Did you mean" not in call(index, "find_tool", tool_name="zzzzzz")
@@ -0,0 +1,56 @@
+"""Test the metadata -> container join used by find."""
+
+from conftest import CVMFS_ROOT
+
+METADATA = [
+    {"id": "abricate", "name": "ABRicate", "description": "Mass screening of contigs"},
+    {"id": "freec", "name": "FREEC", "description": "Copy number", "biocontainers": "control-freec"},
+    {"id": "goseq", "name": "GOseq", "description": "Gene ontology analysis"},
+    {"id": "trim_galore", "name": "Trim Galore", "description": "Adapter trimming"},
+    {"id": "dastool", "name": "DAS Tool", "description": "Binning"},
+    {"id": "nocontainer", "name": "No Container", "description": "Web service only"},
+    {"id": "iq-tree", "name": "IQ-TREE", "description": "Phylogenomic inference"},
+    {"id": "r", "name": "R", "description": "Statistical computing"},
+]
+CONTAINER_TOOLS = ["abricate", "control-freec", "bioconductor-goseq", "trim-galore", "das_tool", "iqtree"]
+
+
+def container_tool(result):
+    """Tool name of the first container of a search_tool() result, or None."""
+    containers = result["containers"]
+    return containers[0]["path"][len(CVMFS_ROOT) + 1:].partition(":")[0] if containers else None
+
+
+def test_join_uses_biocontainers_id_name_and_prefixes(make_index):
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    assert [container_tool(index.search_tool(entry["id"])) for entry in METADATA] == [
+        "abricate", "control-freec", "bioconductor-goseq", "trim-galore", "das_tool", None, "iqtree", None,
+    ]
+    # Joined containers are not listed again as container-only names
+    with_containers = index.search_by_description("", None, {"has_container": ["true"]})["results"]
+    assert sorted(entry["name"] for entry in with_containers) == [
+        "ABRicate", "DAS Tool", "FREEC", "GOseq", "IQ-TREE", "Trim Galore",
+    ]
+
+
+def test_find_uses_the_join(make_index):
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    for query, container in [("freec", "control-freec"), ("GOseq", "bioconductor-goseq"),
+                             ("Trim Galore", "trim-galore"), ("dastool", "das_tool"),
+                             ("das-tool", "das_tool"), ("IQ-TREE", "iqtree"), ("IQ TREE", "iqtree")]:
+        result = index.search_tool(query)
+        assert result["container_count"] == 1, query
+        assert container_tool(result) == container, query
+
+    result = index.search_tool("nocontainer")
+    assert result["metadata"]["id"] == "nocontainer"
+    assert result["containers"] == []
+
+
+def test_partial_lookup_matches_whole_words(make_index):
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    # "iqtree" holds "r", but not as a word
+    assert index.search_tool("iqtree")["metadata"]["id"] == "iq-tree"
+    assert index.search_tool("freec2")["metadata"]["id"] == "freec"
+    assert index.search_tool("galore")["metadata"]["id"] == "trim_galore"
+    assert index.search_tool("rnaspades")["metadata"] is None
@@ -0,0 +1,68 @@
+"""Test the LRU query cache and canonical search keys."""
+
+from shelley_bio.server.query_cache import DEFAULT_QUERY_CACHE_SIZE, QueryCache, default_cache_size
+
+from conftest import write_data_files
+
+METADATA = [
+    {"id": "fastqc", "name": "FastQC", "description": "Quality control for sequencing data"},
+    {"id": "multiqc", "name": "MultiQC", "description": "Aggregate quality control reports"},
+]
+
+
+def test_lru_eviction_and_counters():
+    cache = QueryCache(maxsize=2)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key.upper()
+
+    assert cache.get_or_compute("a", lambda: compute("a")) == "A"
+    assert cache.get_or_compute("b", lambda: compute("b")) == "B"
+    assert cache.get_or_compute("a", lambda: compute("a")) == "A"
+    # "b" is now least recently used and is evicted by "c"
+    cache.get_or_compute("c", lambda: compute("c"))
+    cache.get_or_compute("b", lambda: compute("b"))
+
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.stats() == {"hits": 1, "misses": 4, "hit_rate": 0.2, "size": 2, "maxsize": 2}
+
+
+def test_size_from_environment(monkeypatch):
+    monkeypatch.setenv("SHELLEY_BIO_QUERY_CACHE", "0")
+    assert default_cache_size() == 0
+    monkeypatch.setenv("SHELLEY_BIO_QUERY_CACHE", "lots")
+    assert default_cache_size() == DEFAULT_QUERY_CACHE_SIZE
+
+
+def test_disabled_cache_stores_nothing():
+    cache = QueryCache(maxsize=0)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("a", lambda: 1)
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+
+def test_rephrased_searches_share_an_entry(make_index):
+    index = make_index(METADATA)
+    assert index.canonical_query("Quality control?") == index.canonical_query("control the QUALITY quality")
+    assert index.canonical_query("qual*") != index.canonical_query("qual")
+
+    first = index.search_by_description("Quality control?")
+    second = index.search_by_description("control the quality")
+    assert first["results"] == second["results"]
+    assert (index.query_cache.hits, index.query_cache.misses) == (1, 1)
+
+
+def test_reload_clears_cache(make_index, data_dir):
+    index = make_index(METADATA)
+    index.search_by_description("quality")
+    assert len(index.query_cache) == 1
+
+    write_data_files(data_dir, METADATA + [
+        {"id": "qualimap", "name": "Qualimap", "description": "Quality control of alignment data"},
+    ])
+    index.load_data(use_snapshot=False)
+    assert len(index.query_cache) == 0
+    assert index.search_by_description("quality")["match_count"] == 3
@@ -0,0 +1,87 @@
+"""Test search_by_description: the inverted index and BM25 ranking."""
+
+METADATA = [
+    {"id": "salmon", "name": "Salmon", "description": "Transcript quantification from RNA-seq reads"},
+    {"id": "hisat2", "name": "HISAT2", "description": "Spliced alignment of reads",
+     "edam-operations": [{"term": "Read mapping"}],
+     "edam-inputs": [{"term": "Sequence", "formats": ["FASTQ", "FASTA"]}]},
+    {"id": "featurecounts", "name": "featureCounts", "description": "Count reads per gene",
+     "edam-topics": ["RNA-Seq"]},
+]
+
+
+def names(result):
+    return [entry["name"] for entry in result["results"]]
+
+
+def test_tokens_are_expanded_when_indexed(make_index):
+    index = make_index(METADATA)
+    # rna-seq is indexed as rna-seq, rnaseq, rna and seq, so every form finds it
+    for query in ("RNA-seq", "rnaseq", "rna", "seq"):
+        assert sorted(names(index.search_by_description(query))) == ["Salmon", "featureCounts"], query
+    assert names(index.search_by_description("rna_seq")) == []
+
+
+def test_edam_fields_are_searchable(make_index):
+    index = make_index(METADATA)
+    assert names(index.search_by_description("mapping")) == ["HISAT2"]
+    assert names(index.search_by_description("fastq")) == ["HISAT2"]
+    assert names(index.search_by_description("sequence")) == ["HISAT2"]
+
+
+def test_postings_record_term_frequency(make_index):
+    index = make_index(METADATA + [{"id": "qualimap", "name": "Qualimap", "description": "Quality of quality"}])
+    assert index.search_postings["quality"] == [(3, 2)]
+    assert index.search_postings["reads"] == [(0, 1), (1, 1), (2, 1)]
+    assert index.doc_names == ["Salmon", "HISAT2", "featureCounts", "Qualimap"]
+
+
+def test_whole_words_only(make_index):
+    index = make_index(METADATA)
+    assert names(index.search_by_description("quant")) == []
+    assert index.search_by_description("quant")["match_count"] == 0
+    assert names(index.search_by_description("quantification")) == ["Salmon"]
+
+
+RANKING_METADATA = [
+    {"id": "bwa", "name": "BWA", "description": "Short read alignment against a large reference genome"},
+    {"id": "minimap2", "name": "minimap2", "description": "Long read alignment"},
+    {"id": "blast", "name": "BLAST", "description": "Sequence alignment search"},
+    {"id": "mafft", "name": "MAFFT", "description": "Multiple sequence alignment"},
+    {"id": "blast2", "name": "BLAST", "description": "Protein sequence alignment search"},
+]
+
+
+def test_bm25_ordering(make_index):
+    index = make_index(RANKING_METADATA)
+    result = index.search_by_description("long read alignment")
+    # More matching terms rank higher, and entries sharing a name collapse to
+    # their best one
+    assert names(result) == ["minimap2", "BWA", "BLAST", "MAFFT"]
+    assert result["match_count"] == 4
+    scores = [entry["score"] for entry in result["results"]]
+    assert scores == sorted(scores, reverse=True)
+
+    # Same terms: the shorter entry ranks higher
+    assert names(index.search_by_description("read alignment"))[:2] == ["minimap2", "BWA"]
+    # A rare term outweighs a common one
+    assert names(index.search_by_description("genome alignment"))[0] == "BWA"
+    assert names(index.search_by_description("sequence search")) == ["BLAST", "MAFFT"]
+
+
+def test_ties_keep_metadata_order(make_index):
+    index = make_index([
+        {"id": "callerb", "name": "CallerB", "description": "variant calling"},
+        {"id": "callera", "name": "CallerA", "description": "variant calling"},
+    ])
+    assert names(index.search_by_description("calling")) == ["CallerB", "CallerA"]
+
+
+def test_limit(make_index):
+    index = make_index(RANKING_METADATA)
+    everything = index.search_by_description("alignment", limit=None)
+    assert len(everything["results"]) == everything["match_count"] == 4
+    top = index.search_by_description("alignment", limit=2)
+    assert top["results"] == everything["results"][:2]
+    assert top["match_count"] == 4
+    assert index.search_by_description("alignment", limit=0)["results"] == []
@@ -0,0 +1,56 @@
+"""Test facet filters and facet counts in search."""
+
+import pytest
+
+from shelley_bio.server.facets import bitset, iter_bits, split_facet_filters
+
+METADATA = [
+    {"id": "bwa", "name": "BWA", "description": "Short read alignment", "license": "GPL-3.0",
+     "bunya": ["0.7.17"], "pawsey": ["0.7.17--h5bf99c6_8"]},
+    {"id": "minimap2", "name": "minimap2", "description": "Long read alignment", "license": "MIT",
+     "bunya": ["2.26"], "galaxy": [{"title": "Map with minimap2"}]},
+    {"id": "blat", "name": "BLAT", "description": "Alignment web service", "license": None},
+]
+CONTAINER_TOOLS = ["bwa", "minimap2", "pyalign"]
+
+
+def search_names(index, query, **filters):
+    result = index.search_by_description(query, None, filters)
+    return sorted(entry["name"] for entry in result["results"])
+
+
+def test_bitsets():
+    bits = bitset([0, 3, 9, 64])
+    assert bits == (1 << 0) | (1 << 3) | (1 << 9) | (1 << 64)
+    assert list(iter_bits(bits)) == [0, 3, 9, 64]
+    assert bitset([]) == 0
+
+
+def test_split_facet_filters():
+    assert split_facet_filters("alignment available_on=pawsey,bunya License=MIT k=v") == (
+        "alignment k=v", {"available_on": ["pawsey", "bunya"], "license": ["MIT"]},
+    )
+
+
+def test_filters_intersect_facets(make_index):
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    assert search_names(index, "alignment") == ["BLAT", "BWA", "minimap2"]
+    assert search_names(index, "alignment", available_on=["bunya"]) == ["BWA", "minimap2"]
+    assert search_names(index, "alignment", available_on=["bunya"], license=["mit"]) == ["minimap2"]
+    assert search_names(index, "alignment", available_on=["pawsey", "galaxy"]) == ["BWA", "minimap2"]
+    assert search_names(index, "alignment", has_container=["false"]) == ["BLAT"]
+    # Filters alone list every tool passing them, container-only tools included
+    assert search_names(index, "", has_container=["yes"]) == ["BWA", "minimap2", "pyalign"]
+    with pytest.raises(ValueError):
+        index.search_by_description("alignment", None, {"colour": ["blue"]})
+
+
+def test_facet_counts_cover_all_matches(make_index):
+    index = make_index(METADATA, CONTAINER_TOOLS)
+    result = index.search_by_description("alignment", limit=1)
+    assert len(result["results"]) == 1
+    assert result["facet_counts"] == {
+        "available_on": {"bunya": 2, "galaxy": 1, "pawsey": 1},
+        "license": {"GPL-3.0": 1, "MIT": 1},
+        "has_container": {"true": 2, "false": 1},
+    }
@@ -0,0 +1,32 @@
+"""Test that stop words are neither indexed nor searched."""
+
+from shelley_bio.utils.constants import STOP_WORDS, STOP_WORD_SET
+
+METADATA = [
+    {"id": "featurecounts", "name": "featureCounts", "description": "Count reads per gene from alignment data"},
+    {"id": "fastqc", "name": "FastQC", "description": "Quality control for sequencing data"},
+    {"id": "multiqc", "name": "MultiQC", "description": "Aggregate results from data-driven analysis"},
+]
+
+
+def test_stop_word_set_covers_every_group():
+    assert isinstance(STOP_WORD_SET, frozenset)
+    for group in STOP_WORDS.values():
+        assert group <= STOP_WORD_SET
+
+
+def test_stop_words_are_not_indexed(make_index):
+    index = make_index(METADATA)
+    assert not STOP_WORD_SET & index.search_postings.keys()
+    # Hyphenated tokens are kept whole even if a part is a stop word
+    assert "data-driven" in index.search_postings
+    assert "driven" in index.search_postings
+
+
+def test_stop_words_are_ignored_in_queries(make_index):
+    index = make_index(METADATA)
+    result = index.search_by_description("What can I use to generate count data?")
+    assert result["match_count"] == 1
+    assert result["results"][0]["name"] == "featureCounts"
+    result = index.search_by_description("the data")
+    assert (result["results"], result["match_count"]) == ([], 0)
@@ -0,0 +1,123 @@
+"""Test the compiled index snapshot and index settings."""
+
+import os
+
+from shelley_bio.server import index as index_module
+from shelley_bio.server.index import BioFinderIndex, snapshot_file
+
+from conftest import write_data_files
+
+METADATA = [{"id": "fastqc", "name": "FastQC", "description": "Quality control for sequencing data"}]
+
+
+def test_settings_are_read_when_used(monkeypatch, tmp_path):
+    monkeypatch.setattr(index_module, "SNAPSHOT_FILE", None)
+    monkeypatch.setenv("SHELLEY_BIO_INDEX", str(tmp_path / "custom.pickle"))
+    assert snapshot_file() == tmp_path / "custom.pickle"
+    monkeypatch.delenv("SHELLEY_BIO_INDEX")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert snapshot_file() == tmp_path / "shelley-bio" / "index.pickle"
+
+    monkeypatch.setenv("SHELLEY_BIO_CONTAINER_WEIGHT", "0.25")
+    assert BioFinderIndex().container_name_weight == 0.25
+    # A bad value falls back to the default instead of failing
+    monkeypatch.setenv("SHELLEY_BIO_CONTAINER_WEIGHT", "heavy")
+    assert BioFinderIndex().container_name_weight == BioFinderIndex.CONTAINER_NAME_WEIGHT
+
+
+def test_sources_are_fingerprinted_before_parsing(data_dir, monkeypatch):
+    write_data_files(data_dir, METADATA, ["fastqc"])
+    original_build = BioFinderIndex._build_indexes
+
+    def build_while_data_changes(index):
+        # The metadata file is replaced while the index is being built
+        write_data_files(data_dir, METADATA + [{"id": "bwa", "name": "BWA", "description": "Alignment"}])
+        os.utime(data_dir / "toolfinder_meta.yaml", ns=(1, 1))
+        original_build(index)
+
+    monkeypatch.setattr(BioFinderIndex, "_build_indexes", build_while_data_changes)
+    BioFinderIndex().load_data()
+    monkeypatch.setattr(BioFinderIndex, "_build_indexes", original_build)
+    valid, reason = BioFinderIndex().snapshot_status()
+    assert not valid
+    assert reason == "toolfinder_meta.yaml has changed"
+
+
+def test_snapshot_round_trip(data_dir):
+    write_data_files(data_dir, METADATA, ["fastqc"])
+    built = BioFinderIndex()
+    built.load_data()
+    assert (data_dir / "index.pickle").exists()
+    assert BioFinderIndex().snapshot_status()[0]
+
+    built.search_by_description("quality")
+    loaded = BioFinderIndex()
+    loaded.load_data()
+    # Cached results are not part of the snapshot
+    assert len(loaded.query_cache) == 0
+    assert list(loaded.search_tool("fastqc")["containers"]) == list(built.search_tool("fastqc")["containers"])
+    assert loaded.search_by_description("quality")["results"] == built.search_by_description("quality")["results"]
+
+
+def test_snapshot_is_used_until_a_source_changes(data_dir, monkeypatch):
+    write_data_files(data_dir, METADATA, ["fastqc"])
+    BioFinderIndex().load_data()
+
+    parsed = []
+    original_load = BioFinderIndex._load_sources
+    monkeypatch.setattr(BioFinderIndex, "_load_sources", lambda index: parsed.append(1) or original_load(index))
+
+    # Touched but identical: the hash still matches
+    os.utime(data_dir / "toolfinder_meta.yaml", ns=(1, 1))
+    BioFinderIndex().load_data()
+    assert parsed == []
+
+    write_data_files(data_dir, METADATA + [{"id": "bwa", "name": "BWA", "description": "Alignment"}], ["fastqc"])
+    assert BioFinderIndex().snapshot_status() == (False, "toolfinder_meta.yaml has changed")
+    index = BioFinderIndex()
+    index.load_data()
+    assert parsed == [1]
+    assert index.search_tool("bwa")["metadata"]["id"] == "bwa"
+    assert BioFinderIndex().snapshot_status()[0]
+
+
+def test_snapshot_from_another_version_is_rebuilt(data_dir, monkeypatch):
+    write_data_files(data_dir, METADATA, ["fastqc"])
+    BioFinderIndex().load_data()
+    monkeypatch.setattr(BioFinderIndex, "SNAPSHOT_VERSION", BioFinderIndex.SNAPSHOT_VERSION + 1)
+    assert BioFinderIndex().snapshot_status() == (False, "snapshot was built by a different version of shelley-bio")
+
+
+def test_unreadable_snapshot_is_ignored(data_dir):
+    write_data_files(data_dir, METADATA, ["fastqc"])
+    (data_dir / "index.pickle").write_bytes(b"not a pickle")
+    index = BioFinderIndex()
+    index.load_data()
+    assert index.search_tool("fastqc")["metadata"]["id"] == "fastqc"
+    assert BioFinderIndex().snapshot_status()[0]
+
+
+def test_root_does_not_write_into_another_users_cache(data_dir, monkeypatch):
+    write_data_files(data_dir, METADATA, ["fastqc"])
+    cache_dir = data_dir / "home" / ".cache"
+    cache_dir.mkdir(parents=True)
+    if os.geteuid() == 0:
+        os.chown(cache_dir, 12345, 12345)
+    monkeypatch.setattr(index_module, "SNAPSHOT_FILE", cache_dir / "shelley-bio" / "index.pickle")
+    # As under sudo -E, which keeps the user's HOME
+    monkeypatch.setattr(os, "geteuid", lambda: 0)
+
+    index = BioFinderIndex()
+    index.load_data()
+    assert index.search_tool("fastqc")["metadata"]["id"] == "fastqc"
+    assert not (cache_dir / "shelley-bio").exists()
+
+
+def test_index_command_builds_and_checks_the_snapshot(data_dir):
+    from shelley_bio.client.cli import manage_index
+
+    write_data_files(data_dir, METADATA, ["fastqc"])
+    assert manage_index("status") is False
+    assert manage_index("build") is True
+    assert (data_dir / "index.pickle").exists()
+    assert manage_index("status") is True
@@ -0,0 +1,195 @@
+"""Test incremental Lmod spider cache updates against a stand-in modulefile tree."""
+
+import json
+import re
+from pathlib import Path
+
+from shelley_bio.builder.cvmfs_builder import CVMFSModuleBuilder
+from shelley_bio.builder.spider_cache import SpiderCache, lmod_version_key
+from shelley_bio.utils.versions import parse_tag
+
+
+def write_module(modules_path, tool, version, help_text="stand-in"):
+    module_file = modules_path / tool / f"{version}.lua"
+    module_file.parent.mkdir(parents=True, exist_ok=True)
+    module_file.write_text(f'help([[{help_text}]])\nload("singularity")\n')
+    return module_file
+
+
+def test_lmod_version_key_order():
+    """pV strings sort in the same order as parse_tag()."""
+    tags = ["1.2--0", "1.10--h1_0", "1.2.1--0", "1.2rc1--0", "1.2--h1_3", "2.7.10b--h6_1", "2.7.10--h6_1",
+            "r93--0", "1.02--0", "v1.2--4", "1.2.0--0"]
+    expected = ["r93--0", "1.02--0", "1.2rc1--0", "v1.2--4", "1.2--0", "1.2--h1_3", "1.2.0--0", "1.2.1--0",
+                "1.10--h1_0", "2.7.10--h6_1", "2.7.10b--h6_1"]
+    assert sorted(tags, key=lmod_version_key) == expected
+
+
+def test_seed_then_update_only_touches_new_entries(tmp_path):
+    modules_path = tmp_path / "modulefiles"
+    cache_dir = tmp_path / "cacheDir"
+    write_module(modules_path, "samtools", "1.21--h50ea8bc_0", "samtools 1.21")
+    write_module(modules_path, "fastqc", "0.12.1--hdfd78af_0", "fastqc 0.12.1")
+
+    cache = SpiderCache(modules_path, cache_dir)
+    new_module = write_module(modules_path, "samtools", "1.22--h96c455f_0", "samtools 1.22")
+    assert cache.update([("samtools", "1.22--h96c455f_0", new_module)]) == 3
+
+    state = json.loads(cache.state_file.read_text())["modules"]
+    assert set(state) == {"samtools", "fastqc"}
+    assert set(state["samtools"]) == {"samtools/1.21--h50ea8bc_0", "samtools/1.22--h96c455f_0"}
+
+    spider = cache.spider_file.read_text()
+    assert spider.startswith("timestampFn = ")
+    assert f'["{modules_path}"] = {{' in spider
+    assert '["samtools/1.22--h96c455f_0"] = {' in spider
+    assert 'help = "samtools 1.22",' in spider
+    assert cache.timestamp_file.exists()
+    assert cache.spider_file.stat().st_mtime >= cache.timestamp_file.stat().st_mtime
+
+    # Later updates read only the sidecar: a module added to the tree by hand
+    # is not picked up, and a rewritten one is replaced in place
+    write_module(modules_path, "bwa", "0.7.17--h5bf99c6_8")
+    rebuilt = write_module(modules_path, "fastqc", "0.12.1--hdfd78af_0", "fastqc rebuilt")
+    assert cache.update([("fastqc", "0.12.1--hdfd78af_0", rebuilt)]) == 3
+    state = json.loads(cache.state_file.read_text())["modules"]
+    assert "bwa" not in state
+    assert state["fastqc"]["fastqc/0.12.1--hdfd78af_0"]["help"] == "fastqc rebuilt"
+
+    assert cache.rebuild() == 4
+
+
+def test_builder_updates_cache_once_per_batch(module_tree, monkeypatch):
+    for name in ("samtools:1.21--h50ea8bc_0", "samtools:1.22--h96c455f_0", "fastqc:0.12.1--hdfd78af_0"):
+        (module_tree / "cvmfs" / name).touch()
+
+    updates = []
+    original_update = SpiderCache.update
+
+    def counting_update(self, modules):
+        modules = list(modules)
+        updates.append(modules)
+        return original_update(self, modules)
+
+    monkeypatch.setattr(SpiderCache, "update", counting_update)
+
+    builder = CVMFSModuleBuilder(live_scan=True)
+    results, _ = builder.build_modules(["samtools", "fastqc", "missing"], workers=2)
+    assert [error is None for _, _, error in results] == [True, True, False]
+
+    assert len(updates) == 1
+    assert sorted(tool for tool, _, _ in updates[0]) == ["fastqc", "samtools"]
+    spider = (module_tree / "cacheDir" / "spiderT.lua").read_text()
+    assert '["samtools/1.22--h96c455f_0"] = {' in spider
+    assert "samtools/1.21--h50ea8bc_0" not in spider
+
+
+def test_lmod_version_key_orders_long_numbers():
+    tags = ["1.0.20240101123456--0", "1.0.20231231--0", "1.0.999999999--0", "1.0.1000000000--0", "1.0.2--0"]
+    assert sorted(tags, key=lmod_version_key) == [
+        "1.0.2--0", "1.0.20231231--0", "1.0.999999999--0", "1.0.1000000000--0", "1.0.20240101123456--0",
+    ]
+    assert sorted(tags, key=lmod_version_key) == sorted(tags, key=parse_tag)
+
+
+def test_update_drops_deleted_modulefiles(tmp_path):
+    modules_path = tmp_path / "modulefiles"
+    old_module = write_module(modules_path, "samtools", "1.21--h50ea8bc_0")
+    removed_tool = write_module(modules_path, "fastqc", "0.12.1--hdfd78af_0")
+    cache = SpiderCache(modules_path, tmp_path / "cacheDir")
+    assert cache.rebuild() == 2
+
+    old_module.unlink()
+    removed_tool.unlink()
+    new_module = write_module(modules_path, "samtools", "1.22--h96c455f_0")
+    assert cache.update([("samtools", "1.22--h96c455f_0", new_module)]) == 1
+
+    state = json.loads(cache.state_file.read_text())["modules"]
+    assert state == {"samtools": {"samtools/1.22--h96c455f_0": state["samtools"]["samtools/1.22--h96c455f_0"]}}
+    assert "1.21--h50ea8bc_0" not in cache.spider_file.read_text()
+
+
+_LUA_TOKEN_RE = re.compile(r'\s+|--[^\n]*|"(?:\\.|[^"\\])*"|[A-Za-z_]\w*|[{}\[\]=,]')
+
+
+def parse_lua_assignments(text):
+    """Parse the `name = {table}` statements of a spider cache file into dicts and lists."""
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _LUA_TOKEN_RE.match(text, position)
+        assert match, f"unexpected character at {text[position:position + 20]!r}"
+        if match.group().strip() and not match.group().startswith("--"):
+            tokens.append(match.group())
+        position = match.end()
+    position = 0
+
+    def take(expected=None):
+        nonlocal position
+        token = tokens[position]
+        assert expected is None or token == expected, (token, expected)
+        position += 1
+        return token
+
+    def value():
+        token = take()
+        if token.startswith('"'):
+            return json.loads(token)
+        if token in ("true", "false"):
+            return token == "true"
+        assert token == "{", token
+        fields, items = {}, []
+        while tokens[position] != "}":
+            if tokens[position] == "[":
+                take("[")
+                key = value()
+                take("]")
+                take("=")
+                fields[key] = value()
+            elif tokens[position + 1] == "=":
+                key = take()
+                take("=")
+                fields[key] = value()
+            else:
+                items.append(value())
+            if tokens[position] == ",":
+                take(",")
+        take("}")
+        return items if items and not fields else fields
+
+    assignments = {}
+    while position < len(tokens):
+        name = take()
+        take("=")
+        assignments[name] = value()
+    return assignments
+
+
+def shape(value):
+    """A parsed Lua value with strings replaced by their type, keeping the nesting and field names."""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [shape(item) for item in value]
+    return type(value).__name__
+
+
+def test_rendered_cache_matches_lmod_layout(tmp_path):
+    expected = parse_lua_assignments((Path(__file__).parent / "fixtures" / "spiderT.lua").read_text())
+    lmod_mpath = "/apps/Modules/modulefiles"
+
+    modules_path = tmp_path / "modulefiles"
+    write_module(modules_path, "samtools", "1.21--h50ea8bc_0", 'samtools "1.21"\nwith a second line')
+    cache = SpiderCache(modules_path, tmp_path / "cacheDir")
+    cache.rebuild()
+    rendered = parse_lua_assignments(cache.spider_file.read_text())
+
+    assert list(rendered) == list(expected)
+    # Compare the layout under the fixture's module path
+    rendered["spiderT"] = {lmod_mpath: rendered["spiderT"].pop(str(modules_path))}
+    assert shape(rendered) == shape(expected)
+
+    entry = rendered["spiderT"][lmod_mpath]["samtools"]["fileT"]["samtools/1.21--h50ea8bc_0"]
+    assert entry["help"] == 'samtools "1.21"\nwith a second line'
+    assert entry["mpath"] == str(modules_path)
+    assert entry["pV"] == entry["wV"] == lmod_version_key("1.21--h50ea8bc_0")
@@ -0,0 +1,37 @@
+"""Test find_tool lookups: the alias index and partial id matching."""
+
+METADATA = [
+    {"id": "trim_galore", "name": "Trim Galore", "biotools": "trim_galore", "description": "Adapter trimming"},
+    {"id": "samtools", "name": "SAMtools", "biotools": "samtools", "description": "SAM/BAM utilities"},
+    {"id": "fastqc", "name": "FastQC", "biocontainers": "fastqc", "description": "Quality control"},
+    {"id": "freec", "name": "FREEC", "biotools": "control-freec", "description": "Copy number"},
+    {"id": "samtools-legacy", "name": "SAMtools", "description": "Older packaging of SAMtools"},
+]
+
+
+def found_id(index, query):
+    metadata = index.search_tool(query)["metadata"]
+    return metadata["id"] if metadata else None
+
+
+def test_aliases_match_exactly_up_to_case_and_separators(make_index):
+    index = make_index(METADATA)
+    assert found_id(index, "trim_galore") == "trim_galore"
+    assert found_id(index, "TRIM-GALORE") == "trim_galore"
+    assert found_id(index, " Trim Galore ") == "trim_galore"
+    assert found_id(index, "control-freec") == "freec"
+    assert found_id(index, "control_freec") == "freec"
+    # A name shared by two entries resolves to the first
+    assert found_id(index, "samtools") == "samtools"
+    assert found_id(index, "SAMtools") == "samtools"
+    assert found_id(index, "samtools-legacy") == "samtools-legacy"
+
+
+def test_partial_id_lookup(make_index):
+    index = make_index(METADATA)
+    # The query starts an id
+    assert found_id(index, "fastq") == "fastqc"
+    # An id is part of the query; the earliest entry wins
+    assert found_id(index, "samtools-view") == "samtools"
+    assert found_id(index, "bwa") is None
+    assert found_id(index, "") is None
@@ -0,0 +1,37 @@
+"""Test container tag ordering with real Galaxy CVMFS tags."""
+
+from shelley_bio.utils.versions import latest_tag, parse_tag, sort_tags
+
+
+def test_revision_tags_rank_below_releases():
+    # seqtk moved from "r93" revision tags to numbered releases
+    assert latest_tag(["r93--0", "1.3--h5bf99c6_3", "1.5--h577a1d6_1"]) == "1.5--h577a1d6_1"
+    # ...while revision-only tools still order by revision number
+    assert latest_tag(["r9--0", "r11--h577a1d6_7"]) == "r11--h577a1d6_7"
+
+
+def test_zero_padding_is_significant():
+    # chorus2 publishes both "2.01" and "2.1"
+    assert latest_tag(["2.01--py39ha5a061d_2", "2.1--pyhdfd78af_0"]) == "2.1--pyhdfd78af_0"
+    assert parse_tag("0.04--pl526_0") < parse_tag("0.4--pl526_0")
+
+
+def test_trailing_zeros_count():
+    assert parse_tag("1.0--0") > parse_tag("1--0")
+    assert parse_tag("1.10--h1_0") > parse_tag("1.9--h1_0")
+
+
+def test_phases_and_build_numbers():
+    tags = ["0.6.8--py36_0", "0.6.8.dev0--py35_0", "0.6.8rc1--py36_0", "2.7.10b--h6b7c446_1",
+            "2.7.10--h6b7c446_1", "2.7.10--h6b7c446_2", "2.7.10a--h6b7c446_1"]
+    assert sort_tags(tags, newest_first=False) == [
+        "0.6.8.dev0--py35_0", "0.6.8rc1--py36_0", "0.6.8--py36_0",
+        "2.7.10--h6b7c446_1", "2.7.10--h6b7c446_2", "2.7.10a--h6b7c446_1", "2.7.10b--h6b7c446_1",
+    ]
+
+
+def test_v_prefix_is_the_same_version():
+    assert parse_tag("v2.0.2").release == parse_tag("2.0.2").release
+    # Same version: the current-style tag wins over the old "v" one
+    assert latest_tag(["v1.2.2--1", "1.2.2--hdfd78af_1"]) == "1.2.2--hdfd78af_1"
+    assert latest_tag(["v1.2.2--1", "1.2.3--hdfd78af_0"]) == "1.2.3--hdfd78af_0"
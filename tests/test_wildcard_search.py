@@ -0,0 +1,31 @@
+"""Test wildcard ("align*", "*ment", "*lign*") metadata search."""
+
+METADATA = [
+    {"id": "bwa", "name": "BWA", "description": "Short read aligner"},
+    {"id": "samtools", "name": "SAMtools", "description": "Manipulate alignments"},
+    {"id": "fastqc", "name": "FastQC", "description": "Quality control for sequencing data"},
+    {"id": "spades", "name": "SPAdes", "description": "Genome assembly"},
+]
+
+
+def search_names(index, query):
+    return sorted(entry["name"] for entry in index.search_by_description(query, None)["results"])
+
+
+def test_wildcards_match_anywhere_in_a_word(make_index):
+    index = make_index(METADATA)
+    assert index.search_vocabulary == sorted(index.search_vocabulary)
+    assert search_names(index, "align*") == ["BWA", "SAMtools"]
+    assert search_names(index, "*ment*") == ["SAMtools"]
+    assert search_names(index, "*bly") == ["SPAdes"]
+    assert search_names(index, "*lign*") == ["BWA", "SAMtools"]
+    assert search_names(index, "a*ly") == ["SPAdes"]
+    assert search_names(index, "*") == []
+
+
+def test_wildcard_queries_match_partial_words(make_index):
+    index = make_index(METADATA)
+    assert search_names(index, "align") == []
+    assert search_names(index, "align*") == ["BWA", "SAMtools"]
+    assert search_names(index, "qual* control") == ["FastQC"]
+    assert search_names(index, "zzz*") == []